@@ -0,0 +1,206 @@
+"""
+Offline micro-benchmarks for the game engine.
+
+Run with: python bench.py
+"""
+
+import logging
+import os
+import random
+import time
+import tracemalloc
+from array import array
+from types import SimpleNamespace
+
+from dedupe import DuplicateIndex
+from deck import Deck
+from events import Player, RoundState
+from game import GameManager
+from shard import ShardRouter, run_command
+
+HAND_SIZE = 7
+PLAYERS = 10
+
+
+def _make_cards(count):
+    return [{'text': f"Card number {i}", 'nsfw': False} for i in range(count)]
+
+
+def _time(fn, repeat=3):
+    """Best wall time of ``repeat`` runs, in milliseconds"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _deal_with_list(cards, rounds):
+    """The old draw path: random.choice followed by list.remove"""
+    rng = random.Random(1)
+    pile = list(cards)
+    for _ in range(rounds):
+        for _ in range(PLAYERS):
+            for _ in range(HAND_SIZE):
+                if not pile:
+                    return
+                card = rng.choice(pile)
+                pile.remove(card)
+
+
+def _deal_with_deck(cards, rounds):
+    """The permutation deck: shuffle once, then slice"""
+    deck = Deck(range(len(cards)), random.Random(1))
+    for _ in range(rounds):
+        for _ in range(PLAYERS):
+            if not deck.deal(HAND_SIZE):
+                return
+
+
+def bench_deck():
+    """Compare dealing 10 hands per round for 10 rounds at several catalog sizes"""
+    print("Deck dealing: 10 rounds x 10 players x 7 cards")
+    print(f"{'cards':>8} {'list.remove':>14} {'Deck':>10} {'speedup':>9}")
+    for size in (1_000, 10_000, 100_000):
+        cards = _make_cards(size)
+        old = _time(lambda: _deal_with_list(cards, 10))
+        new = _time(lambda: _deal_with_deck(cards, 10))
+        print(f"{size:>8} {old:>12.2f}ms {new:>8.2f}ms {old / new:>8.1f}x")
+
+
+def _dict_game(players):
+    """Player and round state as Game kept it before the slotted records"""
+    game = SimpleNamespace(players={}, current_black_card=None, played_cards={},
+                           round_in_progress=False, custom_answers={})
+    for player_id in range(players):
+        game.players[player_id] = {
+            'id': player_id,
+            'name': f"Player {player_id}",
+            'cards': array('I', range(HAND_SIZE)),
+            'score': 0,
+            'dm_mode': True,
+            'needs_prompt_notification': False
+        }
+    return game
+
+
+def _slotted_game(players):
+    """Player and round state as Player and RoundState records"""
+    game = SimpleNamespace(players={}, round=RoundState())
+    for player_id in range(players):
+        player = Player(player_id, f"Player {player_id}")
+        player.cards.extend(range(HAND_SIZE))
+        game.players[player_id] = player
+    return game
+
+
+def _traced_size(fn):
+    """Bytes still allocated by the value fn returns"""
+    tracemalloc.start()
+    value = fn()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del value
+    return size
+
+
+def bench_game_memory(games=10_000, players=PLAYERS):
+    """Compare per-game player and round memory across ``games`` resident games"""
+    print(f"Game state memory: {games} games x {players} players")
+    old = _traced_size(lambda: [_dict_game(players) for _ in range(games)])
+    new = _traced_size(lambda: [_slotted_game(players) for _ in range(games)])
+    print(f"{'dicts':>8} {old / games:>10.0f} bytes/game")
+    print(f"{'slots':>8} {new / games:>10.0f} bytes/game ({1 - new / old:.0%} smaller)")
+
+
+def _command_stream(channels, players, rounds):
+    """Commands for ``channels`` scripted games, interleaved across channels"""
+    games = []
+    for channel_id in range(1, channels + 1):
+        player_ids = [channel_id * 100 + i for i in range(players)]
+        commands = [(channel_id, 'create_game', ())]
+        commands += [(channel_id, 'add_player', (pid, f"Player {pid}")) for pid in player_ids]
+        commands += [(channel_id, 'draw_cards', (pid,)) for pid in player_ids]
+        for round_number in range(rounds):
+            # Nobody leaves, so the drawer rotates through players in join order
+            drawer = player_ids[round_number % players]
+            commands.append((channel_id, 'start_round', ()))
+            commands += [(channel_id, 'play_card', (pid, 0))
+                         for pid in player_ids if pid != drawer]
+            commands.append((channel_id, 'select_winner',
+                             (player_ids[(round_number + 1) % players],)))
+        commands.append((channel_id, 'get_scores', ()))
+        games.append(commands)
+    stream = []
+    for step in range(max(len(commands) for commands in games)):
+        stream += [commands[step] for commands in games if step < len(commands)]
+    return stream
+
+
+def bench_sharding(channels=400, players=6, rounds=10, workers=(1, 2, 4)):
+    """Commands per second through ShardRouter as worker processes are added"""
+    stream = _command_stream(channels, players, rounds)
+    print(f"Sharded games: {channels} games, {len(stream)} commands, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'commands/s':>12} {'speedup':>9}")
+
+    # The same commands without IPC, in this process, for reference
+    level = logging.getLogger().level
+    logging.getLogger().setLevel(logging.ERROR)
+    manager = GameManager()
+    start = time.perf_counter()
+    for channel_id, method, args in stream:
+        run_command(manager, channel_id, method, args)
+    in_process = len(stream) / (time.perf_counter() - start)
+    logging.getLogger().setLevel(level)
+    print(f"{'none':>8} {in_process:>12.0f} {'-':>9}")
+
+    baseline = None
+    for count in workers:
+        router = ShardRouter(count, log_level=logging.ERROR)
+        # Let every worker load the card catalog before timing
+        for shard in range(count * 4):
+            router.call(shard, 'is_game_active')
+        start = time.perf_counter()
+        futures = [router.submit(channel_id, method, *args)
+                   for channel_id, method, args in stream]
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - start
+        router.close()
+        rate = len(stream) / elapsed
+        baseline = baseline or rate
+        print(f"{count:>8} {rate:>12.0f} {rate / baseline:>8.1f}x")
+
+
+def bench_duplicates(size=100_000, lookups=1_000):
+    """Time duplicate lookups against an index of ``size`` generated cards"""
+    rng = random.Random(1)
+    words = [f"word{i}" for i in range(5_000)]
+    index = DuplicateIndex()
+    texts = []
+    start = time.perf_counter()
+    for _ in range(size):
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(2, 8)))
+        texts.append(text)
+        index.add('white', text)
+    build = time.perf_counter() - start
+
+    queries = [rng.choice(texts).upper() + "!" for _ in range(lookups // 2)]
+    queries += [rng.choice(texts) + " extra" for _ in range(lookups // 2)]
+    start = time.perf_counter()
+    hits = sum(1 for text in queries if index.find('white', text))
+    elapsed = (time.perf_counter() - start) * 1000
+
+    print(f"Duplicate index: {size} cards built in {build:.1f}s")
+    print(f"  {lookups} lookups, {hits} matched, "
+          f"{elapsed / lookups:.3f}ms per lookup")
+
+
+if __name__ == "__main__":
+    bench_deck()
+    bench_game_memory()
+    bench_sharding()
+    bench_duplicates()
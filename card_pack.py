@@ -0,0 +1,208 @@
+"""
+Compiled card pack: a packed binary catalog of data/cards/*.json.
+
+Build it offline with:
+
+    python card_pack.py [cards_dir] [output]
+
+and the bot memory-maps it at startup instead of parsing JSON, reading card
+text lazily. Any card file that changed since the pack was built is still
+read from JSON, so a stale or missing pack only costs startup time.
+
+Layout (little-endian):
+
+    magic               8 bytes, PACK_MAGIC
+    source count        u32
+    per source          u16 name length, name, i64 mtime_ns, i64 size,
+                        u32 first card, u32 card count
+    card count          u32
+    flags column        u8 per card (FLAG_BLACK | FLAG_NSFW)
+    pick column         u8 per card
+    key column          KEY_SIZE bytes per card, see card_key
+    offset index        u32 per card + 1, into the string table
+    string table        UTF-8 card text
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+PACK_FILE = "cards.pack"
+PACK_MAGIC = b"CASPACK\x01"
+KEY_SIZE = 8
+FLAG_BLACK = 1
+FLAG_NSFW = 2
+MAX_PICK = 3
+
+
+def card_key(text: str) -> bytes:
+    """Fixed-size fingerprint of a card's text, used to intern cards without reading their text"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=KEY_SIZE).digest()
+
+
+class CardPack:
+    """Read-only, memory-mapped view of a compiled card pack"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(PACK_MAGIC)] != PACK_MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a card pack")
+
+        pos = len(PACK_MAGIC)
+        (source_count,) = struct.unpack_from('<I', self._map, pos)
+        pos += 4
+        # name: ((mtime_ns, size), first card, card count)
+        self.sources: Dict[str, Tuple[Tuple[int, int], int, int]] = {}
+        for _ in range(source_count):
+            (name_len,) = struct.unpack_from('<H', self._map, pos)
+            pos += 2
+            name = self._map[pos:pos + name_len].decode('utf-8')
+            pos += name_len
+            mtime_ns, size, first, count = struct.unpack_from('<qqII', self._map, pos)
+            pos += 24
+            self.sources[name] = ((mtime_ns, size), first, count)
+
+        (self.card_count,) = struct.unpack_from('<I', self._map, pos)
+        pos += 4
+        self._flags_pos = pos
+        self._pick_pos = self._flags_pos + self.card_count
+        self._key_pos = self._pick_pos + self.card_count
+        self._offsets_pos = self._key_pos + self.card_count * KEY_SIZE
+        self._strings_pos = self._offsets_pos + (self.card_count + 1) * 4
+
+    def __len__(self) -> int:
+        return self.card_count
+
+    def flags(self, index: int) -> int:
+        return self._map[self._flags_pos + index]
+
+    def pick(self, index: int) -> int:
+        return self._map[self._pick_pos + index]
+
+    def key(self, index: int) -> bytes:
+        pos = self._key_pos + index * KEY_SIZE
+        return self._map[pos:pos + KEY_SIZE]
+
+    def text(self, index: int) -> str:
+        """Decode one card's text from the string table"""
+        start, end = struct.unpack_from('<II', self._map,
+                                        self._offsets_pos + index * 4)
+        return self._map[self._strings_pos + start:
+                         self._strings_pos + end].decode('utf-8')
+
+
+def _validate_cards(filename: str, data) -> List[Tuple[str, int]]:
+    """Check one card file's contents, returning (text, pick) for each valid card"""
+    if not isinstance(data, dict) or not isinstance(data.get('cards'), list):
+        raise ValueError(f"{filename}: expected an object with a 'cards' list")
+
+    cards = []
+    for i, card in enumerate(data['cards']):
+        text = card.get('text') if isinstance(card, dict) else None
+        if not isinstance(text, str) or not text.strip():
+            logger.warning(f"{filename}: card {i} has no text, skipping")
+            continue
+        pick = card.get('pick', 1)
+        if not isinstance(pick, int) or not 1 <= pick <= MAX_PICK:
+            logger.warning(f"{filename}: card {i} has invalid pick {pick!r}, using 1")
+            pick = 1
+        cards.append((text, pick))
+    return cards
+
+
+def compile_pack(cards_dir: str, output: str) -> Dict[str, int]:
+    """Validate, dedupe and pack the card files in cards_dir into output"""
+    # Imported here so the compiler has no import-time dependency on cards
+    from cards import CARD_FILES
+
+    sources = []  # (name, (mtime_ns, size), [(text, pick)])
+    seen = set()  # (is_black, text)
+    duplicates = 0
+    # SFW files come first in CARD_FILES, so a card in both files stays SFW
+    for filename in CARD_FILES:
+        path = os.path.join(cards_dir, filename)
+        if not os.path.exists(path):
+            continue
+        stat = os.stat(path)
+        with open(path, 'r') as f:
+            cards = _validate_cards(filename, json.load(f))
+
+        unique = []
+        is_black = 'black' in filename
+        for text, pick in cards:
+            if (is_black, text) in seen:
+                duplicates += 1
+                continue
+            seen.add((is_black, text))
+            unique.append((text, pick))
+        sources.append((filename, (stat.st_mtime_ns, stat.st_size), unique))
+
+    header = bytearray(PACK_MAGIC)
+    header += struct.pack('<I', len(sources))
+    flags = bytearray()
+    picks = bytearray()
+    keys = bytearray()
+    offsets = [0]
+    strings = bytearray()
+    for filename, (mtime_ns, size), cards in sources:
+        name = filename.encode('utf-8')
+        header += struct.pack('<H', len(name)) + name
+        header += struct.pack('<qqII', mtime_ns, size, len(picks), len(cards))
+        card_flags = ((FLAG_BLACK if 'black' in filename else 0) |
+                      (FLAG_NSFW if filename.startswith("nsfw_") else 0))
+        for text, pick in cards:
+            flags.append(card_flags)
+            picks.append(pick)
+            keys += card_key(text)
+            strings += text.encode('utf-8')
+            offsets.append(len(strings))
+    header += struct.pack('<I', len(picks))
+
+    # Write to a temporary file first so a running bot never maps a partial pack
+    tmp_path = output + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(flags)
+        f.write(picks)
+        f.write(keys)
+        f.write(struct.pack(f'<{len(offsets)}I', *offsets))
+        f.write(strings)
+    os.replace(tmp_path, output)
+
+    stats = {'cards': len(picks), 'duplicates': duplicates,
+             'bytes': os.path.getsize(output)}
+    logger.info(f"Compiled {stats['cards']} cards into {output} "
+                f"({stats['duplicates']} duplicates dropped, {stats['bytes']} bytes)")
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile card JSON files into a card pack")
+    parser.add_argument('cards_dir', nargs='?', default="data/cards")
+    parser.add_argument('output', nargs='?', default=None,
+                        help=f"defaults to <cards_dir>/{PACK_FILE}")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    output = args.output or os.path.join(args.cards_dir, PACK_FILE)
+    try:
+        compile_pack(args.cards_dir, output)
+    except (OSError, ValueError) as e:
+        logger.error(f"Failed to compile card pack: {str(e)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
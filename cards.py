@@ -1,102 +1,602 @@
 import json
 import os
-from typing import List, Dict, Any
+import threading
+import time
+from array import array
+from typing import List, Dict, Any, Optional, Tuple
 import logging
+from card_pack import PACK_FILE, CardPack, FLAG_NSFW, card_key
+from dedupe import DuplicateIndex
 
 logger = logging.getLogger(__name__)
 
+CARD_FILES = ("sfw_black_cards.json", "sfw_white_cards.json",
+              "nsfw_black_cards.json", "nsfw_white_cards.json")
+
+
+class Card:
+    """A single card, interned so each distinct card exists once per process
+
+    Cards loaded from a card pack hold their index into the pack instead of
+    their text until the text is first needed.
+    """
+    __slots__ = ('id', 'type', 'nsfw', 'pick', '_text', '_pack')
+
+    def __init__(self, card_id: int, card_type: str, text, nsfw: bool,
+                 pick: int, pack: Optional[CardPack] = None):
+        self.id = card_id
+        self.type = card_type
+        self.nsfw = nsfw
+        self.pick = pick
+        self._text = text  # Card text, or its index in pack
+        self._pack = pack
+
+    @property
+    def text(self) -> str:
+        if self._pack is not None:
+            self._text = self._pack.text(self._text)
+            self._pack = None
+        return self._text
+
+    # Cards are interned, so copies of game state share them
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __repr__(self) -> str:
+        return f"Card({self.id}, {self.type!r}, {self.text!r})"
+
+
+# Every card ever loaded, indexed by ID. IDs are never reused, so an ID held
+# in a hand stays valid across catalog rebuilds.
+_cards: List[Card] = []
+_card_ids: Dict[Tuple[str, bytes], int] = {}  # (type, card_key(text)): card ID
+_card_keys: List[bytes] = []  # card_key(text) by card ID
+_registry_lock = threading.Lock()
+
+
+def _intern(card_type: str, key: bytes, text, nsfw: bool, pick: int,
+            pack: Optional[CardPack] = None) -> Card:
+    card_id = _card_ids.get((card_type, key))
+    if card_id is not None:
+        return _cards[card_id]
+
+    with _registry_lock:
+        card_id = _card_ids.get((card_type, key))
+        if card_id is None:
+            card_id = len(_cards)
+            _cards.append(Card(card_id, card_type, text, nsfw, pick, pack))
+            _card_keys.append(key)
+            _card_ids[(card_type, key)] = card_id
+        return _cards[card_id]
+
+
+def intern_card(card_type: str, text: str, nsfw: bool = False,
+                pick: int = 1) -> Card:
+    """Get the shared Card for a type and text, creating it on first sight"""
+    return _intern(card_type, card_key(text), text, nsfw, pick)
+
+
+def get_card(card_id: int) -> Card:
+    """Look up a card by ID"""
+    return _cards[card_id]
+
+
+def get_card_key(card_id: int) -> bytes:
+    """A card's text fingerprint, which unlike its ID is stable across restarts"""
+    return _card_keys[card_id]
+
+
+def find_card(card_type: str, key: bytes) -> Optional[int]:
+    """Look up a loaded card's ID by type and text fingerprint"""
+    return _card_ids.get((card_type, key))
+
+
+# Per-card flags in CardCatalog.flags
+NOT_IN_CATALOG = 0
+SFW = 1
+NSFW = 2
+
+
+CUSTOM_SOURCES = ("custom_black", "custom_white")
+
+
+def _source_segment(source: str) -> Tuple[str, bool]:
+    """Map a card source (file name or custom set) to its (type, nsfw) segment"""
+    return ('black' if 'black' in source else 'white', source.startswith("nsfw_"))
+
+
+class CatalogDelta:
+    """Cards added to and removed from the catalog between two versions"""
+
+    def __init__(self, added: Dict[Tuple[str, bool], List[int]],
+                 removed: List[int]):
+        self.added = added  # (type, nsfw): new card IDs in that segment
+        self.removed = removed
+
+    def __bool__(self) -> bool:
+        return bool(self.removed) or any(self.added.values())
+
+    def __repr__(self) -> str:
+        added = sum(len(ids) for ids in self.added.values())
+        return f"CatalogDelta(+{added}, -{len(self.removed)})"
+
+
+class CardCatalog:
+    """Immutable set of every loaded card, shared by reference across games
+
+    Cards are referred to by integer ID; decks, hands and played cards only
+    ever hold IDs and resolve them to text when a message is rendered.
+
+    Each card type is split into an SFW and an NSFW segment, and ``flags``
+    maps every card ID to NOT_IN_CATALOG, SFW or NSFW, so changing a game's
+    NSFW setting never needs to touch the card files or the database.
+
+    A catalog is never modified after it is built. When the card data
+    changes a new catalog with a higher ``version`` replaces it, and running
+    games move over with ``delta_from`` at their next round.
+    """
+
+    def __init__(self, sources: Dict[str, Tuple[Card, ...]],
+                 cards_dir: str = "data/cards",
+                 files: Optional[Dict[str, Tuple]] = None, version: int = 0,
+                 custom_generation: int = 0, removed_ids: frozenset = frozenset(),
+                 removed_generation: int = 0):
+        self.sources = sources
+        self.cards_dir = cards_dir
+        self.files = files or {}
+        self.version = version
+        self.custom_generation = custom_generation
+        self.removed_generation = removed_generation
+        self._deltas = {}
+        size = max((card.id for cards in sources.values() for card in cards),
+                   default=-1) + 1
+        self.flags = bytearray(size)
+        self._segments = {(card_type, nsfw): array('I')
+                          for card_type in ('black', 'white')
+                          for nsfw in (False, True)}
+        # SFW sources are filled first so a card listed in both files stays SFW
+        for source in sorted(sources, key=lambda name: _source_segment(name)[1]):
+            card_type, nsfw = _source_segment(source)
+            ids = self._segments[(card_type, nsfw)]
+            flag = NSFW if nsfw else SFW
+            for card in sources[source]:
+                if not self.flags[card.id] and card.id not in removed_ids:
+                    self.flags[card.id] = flag
+                    ids.append(card.id)
+
+    def segment(self, card_type: str, nsfw: bool) -> array:
+        """Get the IDs of the SFW or NSFW cards of one type"""
+        return self._segments[(card_type, bool(nsfw))]
+
+    def black_ids(self, allow_nsfw: bool) -> array:
+        """Get the IDs of the black cards available under an NSFW setting"""
+        if not allow_nsfw:
+            return self.segment('black', False)
+        return self.segment('black', False) + self.segment('black', True)
+
+    def white_ids(self, allow_nsfw: bool) -> array:
+        """Get the IDs of the white cards available under an NSFW setting"""
+        if not allow_nsfw:
+            return self.segment('white', False)
+        return self.segment('white', False) + self.segment('white', True)
+
+    def flag(self, card_id: int) -> int:
+        """Get a card's flag: NOT_IN_CATALOG, SFW or NSFW"""
+        if 0 <= card_id < len(self.flags):
+            return self.flags[card_id]
+        return NOT_IN_CATALOG
+
+    def is_allowed(self, card_id: int, allow_nsfw: bool) -> bool:
+        """Check whether a card is in the catalog and allowed by an NSFW setting"""
+        flag = self.flag(card_id)
+        return flag == SFW or (allow_nsfw and flag == NSFW)
+
+    def delta_from(self, old: 'CardCatalog') -> CatalogDelta:
+        """Work out which cards were added or removed since an older catalog"""
+        delta = self._deltas.get(old.version)
+        if delta is None:
+            added = {}
+            for (card_type, nsfw), ids in self._segments.items():
+                flag = NSFW if nsfw else SFW
+                added[(card_type, nsfw)] = [
+                    card_id for card_id in ids if old.flag(card_id) != flag
+                ]
+            removed = [
+                card_id for card_id in range(len(old.flags))
+                if old.flags[card_id] and not self.flag(card_id)
+            ]
+            delta = self._deltas[old.version] = CatalogDelta(added, removed)
+        return delta
+
+
+class CustomCardCache:
+    """Process-level cache of approved custom cards
+
+    Database bumps ``custom_cards_version`` whenever this process approves
+    a card, which makes the cache outdated straight away. New cards wait for
+    approval and removals don't change the approved set, so neither makes
+    the cache stale. Writes from other workers are picked up when the
+    CardWatcher thread refreshes an expired cache, so game creation itself
+    never waits on Mongo.
+    """
+
+    def __init__(self):
+        self.generation = 0  # Bumped whenever the cached cards change
+        self._sources = {source: () for source in CUSTOM_SOURCES}
+        self._version = None  # database.custom_cards_version at last load
+        self._loaded_at = None
+
+    def is_outdated(self, database) -> bool:
+        """Check whether this process changed custom cards since the last load"""
+        return (self._version is None or
+                self._version != getattr(database, 'custom_cards_version', 0))
+
+    def is_expired(self, ttl: float) -> bool:
+        """Check whether the cache is older than ttl seconds"""
+        return (self._loaded_at is None or
+                time.monotonic() - self._loaded_at > ttl)
+
+    def invalidate(self):
+        self._version = None
+
+    def refresh(self, database) -> bool:
+        """Reload approved custom cards, returning True if they changed"""
+        version = getattr(database, 'custom_cards_version', 0)
+        sources = {}
+        for source in CUSTOM_SOURCES:
+            card_type, _ = _source_segment(source)
+            texts = database.get_custom_cards(card_type, only_approved=True)
+            # Custom cards are always SFW
+            sources[source] = _intern_cards(card_type,
+                                            [{'text': text} for text in texts],
+                                            False)
+        self._version = version
+        self._loaded_at = time.monotonic()
+        if sources == self._sources:
+            return False
+        self._sources = sources
+        self.generation += 1
+        return True
+
+    def sources(self) -> Dict[str, Tuple[Card, ...]]:
+        return self._sources
+
+
+class RemovedCardIndex:
+    """Every card a moderator removed, loaded from the database in one query
+
+    Cards are keyed by (type, card_key(text)) so packed cards can be checked
+    without decoding their text. Removals made through this process are
+    added as they happen; the set is exact, so there are no false positives.
+    """
+
+    def __init__(self):
+        self.generation = 0  # Bumped whenever the set of removed cards changes
+        self.loaded = False
+        self._keys = set()
+
+    def load(self, database) -> bool:
+        """Bulk-load all removed cards, returning True if the set changed"""
+        keys = {(card_type, card_key(text))
+                for card_type, text in database.get_removed_cards()}
+        self.loaded = True
+        if keys == self._keys:
+            return False
+        self._keys = keys
+        self.generation += 1
+        return True
+
+    def add(self, card_type: str, text: str) -> bool:
+        """Record a new removal, returning True if it was not already removed"""
+        key = (card_type, card_key(text))
+        if key in self._keys:
+            return False
+        self._keys = self._keys | {key}
+        self.generation += 1
+        return True
+
+    def __contains__(self, card: Tuple[str, str]) -> bool:
+        card_type, text = card
+        return (card_type, card_key(text)) in self._keys
+
+    def card_ids(self) -> frozenset:
+        """Get the IDs of all removed cards that have been interned"""
+        return frozenset(_card_ids[key] for key in self._keys if key in _card_ids)
+
+
+_catalog: Optional[CardCatalog] = None
+_catalog_lock = threading.Lock()
+_custom_cards = CustomCardCache()
+_removed_cards = RemovedCardIndex()
+
+
+def _files_signature(cards_dir: str) -> Dict[str, Tuple]:
+    """Cheap fingerprint of the card files, used to detect changes on disk"""
+    signature = {}
+    for filename in CARD_FILES:
+        try:
+            stat = os.stat(os.path.join(cards_dir, filename))
+            signature[filename] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature[filename] = (None, None)
+    return signature
+
+
+def _read_card_file(cards_dir: str, filename: str) -> List[Dict[str, Any]]:
+    """Load cards from a JSON file if it exists"""
+    file_path = os.path.join(cards_dir, filename)
+    try:
+        if os.path.exists(file_path):
+            with open(file_path, 'r') as f:
+                return json.load(f)['cards']
+    except Exception as e:
+        logger.error(f"Error loading cards from {filename}: {str(e)}")
+    return []
+
+
+def _intern_cards(card_type: str, card_data: List[Dict[str, Any]],
+                  nsfw: bool) -> Tuple[Card, ...]:
+    """Intern raw card dicts, dropping duplicates within the set"""
+    cards = {}
+    for data in card_data:
+        card = intern_card(card_type, data['text'], nsfw, data.get('pick', 1))
+        cards.setdefault(card.id, card)
+    return tuple(cards.values())
+
+
+_packs: Dict[str, Tuple[Tuple, CardPack]] = {}  # path: (file signature, pack)
+
+
+def _load_pack(cards_dir: str) -> Optional[CardPack]:
+    """Memory-map the compiled card pack in cards_dir, if there is one"""
+    path = os.path.join(cards_dir, PACK_FILE)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _packs.get(path)
+    if cached and cached[0] == signature:
+        return cached[1]
+    try:
+        pack = CardPack(path)
+    except (OSError, ValueError) as e:
+        logger.error(f"Error loading card pack {path}, using JSON: {str(e)}")
+        return None
+    # Older packs stay mapped; cards interned from them still read their text
+    _packs[path] = (signature, pack)
+    logger.info(f"Mapped card pack {path} with {len(pack)} cards")
+    return pack
+
+
+def _pack_cards(pack: CardPack, filename: str) -> Tuple[Card, ...]:
+    """Intern one source's cards from a card pack without decoding their text"""
+    card_type, _ = _source_segment(filename)
+    _, first, count = pack.sources[filename]
+    cards = []
+    for index in range(first, first + count):
+        cards.append(_intern(card_type, pack.key(index), index,
+                             bool(pack.flags(index) & FLAG_NSFW),
+                             pack.pick(index), pack))
+    return tuple(cards)
+
+
+def _build_catalog(cards_dir: str, files: Dict[str, Tuple],
+                   previous: Optional[CardCatalog] = None) -> CardCatalog:
+    """Build a new catalog, re-parsing only the sources that changed"""
+    sources = {}
+    changed = []
+    pack = None
+    for filename in CARD_FILES:
+        if (previous is not None and filename in previous.sources
+                and previous.files.get(filename) == files[filename]):
+            sources[filename] = previous.sources[filename]
+            continue
+
+        # Prefer the compiled pack, unless the JSON file changed since it was built
+        pack = pack or _load_pack(cards_dir)
+        if pack and filename in pack.sources and pack.sources[filename][0] == files[filename]:
+            sources[filename] = _pack_cards(pack, filename)
+            changed.append(f"{filename} (packed)")
+            continue
+
+        card_type, nsfw = _source_segment(filename)
+        sources[filename] = _intern_cards(card_type,
+                                          _read_card_file(cards_dir, filename),
+                                          nsfw)
+        changed.append(filename)
+
+    # Approved custom cards come from the process-level cache
+    sources.update(_custom_cards.sources())
+    if previous is None or previous.custom_generation != _custom_cards.generation:
+        changed.extend(CUSTOM_SOURCES)
+
+    # Removed cards stay in their sources but are left out of every segment
+    removed_ids = _removed_cards.card_ids()
+    if previous is None or previous.removed_generation != _removed_cards.generation:
+        changed.append("removed cards")
+
+    version = previous.version + 1 if previous is not None else 1
+    catalog = CardCatalog(sources, cards_dir, files, version,
+                          _custom_cards.generation, removed_ids,
+                          _removed_cards.generation)
+    logger.info(
+        f"Built card catalog v{version} ({', '.join(changed) or 'no changes'}): "
+        f"{len(catalog.black_ids(True))} black cards and "
+        f"{len(catalog.white_ids(True))} white cards")
+    return catalog
+
+
+def get_catalog(cards_dir: str = "data/cards", database=None,
+                refresh_custom: bool = False) -> CardCatalog:
+    """Get the shared card catalog, rebuilding it only if the card data changed
+
+    Custom cards are reloaded from the database only if this process changed
+    them since the last load, or if refresh_custom is set.
+    """
+    global _catalog
+    files = _files_signature(cards_dir)
+    catalog = _catalog
+    custom_due = database is not None and (
+        refresh_custom or _custom_cards.is_outdated(database))
+    removed_due = database is not None and (refresh_custom or
+                                            not _removed_cards.loaded)
+    if (catalog is not None and not custom_due and not removed_due
+            and catalog.cards_dir == cards_dir and catalog.files == files
+            and catalog.custom_generation == _custom_cards.generation
+            and catalog.removed_generation == _removed_cards.generation):
+        return catalog
+
+    with _catalog_lock:
+        if database is not None and (refresh_custom or
+                                     _custom_cards.is_outdated(database)):
+            try:
+                _custom_cards.refresh(database)
+            except Exception as e:
+                logger.error(f"Error loading custom cards, keeping cached ones: {str(e)}")
+        if database is not None and (refresh_custom or
+                                     not _removed_cards.loaded):
+            try:
+                _removed_cards.load(database)
+            except Exception as e:
+                logger.error(f"Error loading removed cards, keeping cached ones: {str(e)}")
+
+        previous = _catalog
+        if previous is not None and previous.cards_dir != cards_dir:
+            previous = None
+        if (previous is None or previous.files != files or
+                previous.custom_generation != _custom_cards.generation or
+                previous.removed_generation != _removed_cards.generation):
+            # Swapping the module reference is atomic; games holding the old
+            # catalog keep using it until they pick up the delta themselves
+            _catalog = _build_catalog(cards_dir, files, previous)
+        return _catalog
+
+
+def current_catalog() -> Optional[CardCatalog]:
+    """Get the latest built catalog without checking the card files"""
+    return _catalog
+
+
+def custom_cards_expired(ttl: float) -> bool:
+    """Check whether the cached custom cards are older than ttl seconds"""
+    return _custom_cards.is_expired(ttl)
+
+
+def mark_card_removed(card_type: str, text: str) -> bool:
+    """Record a removal so the next get_catalog call leaves the card out"""
+    return _removed_cards.add(card_type, text)
+
+
+_duplicates: Optional[DuplicateIndex] = None
+_duplicates_catalog: Optional[CardCatalog] = None  # Catalog the index is current with
+_duplicates_lock = threading.Lock()
+
+
+def _duplicate_index(database=None) -> DuplicateIndex:
+    """Get the duplicate index, building it on first use and catching up on catalog changes"""
+    global _duplicates, _duplicates_catalog
+    catalog = _catalog
+    with _duplicates_lock:
+        if _duplicates is None:
+            index = DuplicateIndex()
+            # Pending custom cards count too, so the same joke can't queue up twice
+            if database is not None:
+                for card_type in ('black', 'white'):
+                    for text in database.get_custom_cards(card_type,
+                                                          only_approved=False):
+                        index.add(card_type, text)
+            if catalog is not None:
+                for card_id in catalog.black_ids(True) + catalog.white_ids(True):
+                    card = get_card(card_id)
+                    index.add(card.type, card.text)
+            _duplicates, _duplicates_catalog = index, catalog
+            logger.info(f"Built duplicate index over {len(index)} cards")
+        elif catalog is not None and catalog is not _duplicates_catalog:
+            if _duplicates_catalog is not None:
+                added = catalog.delta_from(_duplicates_catalog).added.values()
+            else:
+                added = [catalog.black_ids(True), catalog.white_ids(True)]
+            for card_ids in added:
+                for card_id in card_ids:
+                    card = get_card(card_id)
+                    _duplicates.add(card.type, card.text)
+            _duplicates_catalog = catalog
+        return _duplicates
+
+
+def find_duplicate_card(card_type: str, text: str,
+                        database=None) -> Optional[Dict[str, Any]]:
+    """Find an existing or pending card that duplicates or nearly duplicates the text"""
+    return _duplicate_index(database).find(card_type, text)
+
+
+def index_custom_card(card_type: str, text: str):
+    """Add a newly submitted or approved custom card to the duplicate index"""
+    with _duplicates_lock:
+        if _duplicates is not None:
+            _duplicates.add(card_type, text)
+
+
+def invalidate_catalog():
+    """Force the next get_catalog call to reload custom cards, e.g. after an approval"""
+    _custom_cards.invalidate()
+
 
 class CardManager:
 
     def __init__(self, allow_nsfw: bool = False, database=None):
         self.allow_nsfw = allow_nsfw
         self.cards_dir = "data/cards"
-        self.black_cards = []
-        self.white_cards = []
         self.database = database
+        self.catalog = None
         self._load_cards()
 
     def _load_cards(self):
-        """Load and filter cards based on NSFW setting"""
-        self.black_cards = []  # Clear existing cards
-        self.white_cards = []  # Clear existing cards
-
-        # Load SFW cards
-        self._load_card_set("sfw_black_cards.json", self.black_cards)
-        self._load_card_set("sfw_white_cards.json", self.white_cards)
-
-        # Load NSFW cards if enabled
-        if self.allow_nsfw:
-            self._load_card_set("nsfw_black_cards.json", self.black_cards)
-            self._load_card_set("nsfw_white_cards.json", self.white_cards)
-
-        # Load approved custom cards if database is available
-        if self.database:
-            custom_black = self.database.get_custom_cards('black',
-                                                          only_approved=True)
-            custom_white = self.database.get_custom_cards('white',
-                                                          only_approved=True)
-
-            # Add custom cards to the deck
-            self.black_cards.extend([{
-                'text': text,
-                'nsfw': False,
-                'pick': 1
-            } for text in custom_black])
-            self.white_cards.extend([{
-                'text': text,
-                'nsfw': False
-            } for text in custom_white])
-
-        # Remove any cards that have been marked as removed
-        # if self.database:
-        #     self.black_cards = [card for card in self.black_cards
-        #                       if not self.database.is_card_removed(card['text'], 'black')]
-        #     self.white_cards = [card for card in self.white_cards
-        #                       if not self.database.is_card_removed(card['text'], 'white')]
+        """Attach to the shared catalog for the current card data"""
+        self.catalog = get_catalog(self.cards_dir, self.database)
 
         logger.info(
-            f"Loaded {len(self.black_cards)} black cards and {len(self.white_cards)} white cards"
+            f"Using {len(self.black_ids)} black cards and {len(self.white_ids)} white cards"
         )
         if self.allow_nsfw:
             logger.info("NSFW content is enabled")
         else:
             logger.info("NSFW content is disabled")
 
-    def _load_card_set(self, filename: str, card_list: List[Dict[str, Any]]):
-        """Load cards from a JSON file if it exists"""
-        file_path = os.path.join(self.cards_dir, filename)
-        try:
-            if os.path.exists(file_path):
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-                    card_list.extend(data['cards'])
-        except Exception as e:
-            logger.error(f"Error loading cards from {filename}: {str(e)}")
-
-    def get_black_cards(self) -> List[Dict[str, Any]]:
+    @property
+    def black_ids(self) -> array:
+        return self.catalog.black_ids(self.allow_nsfw)
+
+    @property
+    def white_ids(self) -> array:
+        return self.catalog.white_ids(self.allow_nsfw)
+
+    def get_black_cards(self) -> List[Card]:
         """Get all available black cards"""
-        return self.black_cards.copy()
+        return [get_card(card_id) for card_id in self.black_ids]
 
-    def get_white_cards(self) -> List[Dict[str, Any]]:
+    def get_white_cards(self) -> List[Card]:
         """Get all available white cards"""
-        return self.white_cards.copy()
+        return [get_card(card_id) for card_id in self.white_ids]
 
     def update_nsfw_setting(self, allow_nsfw: bool) -> bool:
-        """Update NSFW setting and reload cards"""
+        """Update NSFW setting; the catalog already holds both segments"""
         if self.allow_nsfw == allow_nsfw:
             return False
 
         self.allow_nsfw = allow_nsfw
-        self._load_cards()
         return True
 
-    def filter_cards(self, cards: List[str]) -> List[str]:
-        """Filter a list of cards based on current NSFW setting"""
-        # Get all current valid card texts
-        valid_texts = {card['text'] for card in self.white_cards}
-        # Filter and return only cards that exist in current deck
-        return [card for card in cards if card in valid_texts]
+    def filter_cards(self, card_ids: List[int]) -> List[int]:
+        """Filter a list of card IDs based on current NSFW setting"""
+        is_allowed = self.catalog.is_allowed
+        return [card_id for card_id in card_ids
+                if is_allowed(card_id, self.allow_nsfw)]
 
     def add_custom_card(self, card_text: str, card_type: str,
                         added_by_id: int) -> bool:
@@ -104,10 +604,18 @@ class CardManager:
         if not self.database:
             return False
 
+        duplicate = find_duplicate_card(card_type, card_text, self.database)
+        if duplicate:
+            logger.info(
+                f"Rejected custom {card_type} card {card_text!r}: "
+                f"{'same as' if duplicate['exact'] else 'too close to'} {duplicate['text']!r}")
+            return False
+
         success = self.database.add_custom_card(card_text, card_type,
                                                 added_by_id)
         if success:
             logger.info(f"Added new custom {card_type} card: {card_text}")
+            index_custom_card(card_type, card_text)
         return success
 
     def remove_card(self, card_text: str, card_type: str,
@@ -120,7 +628,10 @@ class CardManager:
                                             removed_by_id)
         if success:
             logger.info(f"Removed {card_type} card: {card_text}")
-            self._load_cards()  # Reload cards to apply removal
+            mark_card_removed(card_type, card_text)
+            # Rebuild the shared catalog; games, this one included, move onto
+            # it and its delta at their next round (Game._sync_catalog)
+            get_catalog(self.cards_dir, self.database)
         return success
 
     def approve_custom_card(self, card_text: str, card_type: str,
@@ -133,7 +644,9 @@ class CardManager:
                                                     moderator_id)
         if success:
             logger.info(f"Approved custom {card_type} card: {card_text}")
-            self._load_cards()  # Reload cards to include newly approved card
+            index_custom_card(card_type, card_text)
+            invalidate_catalog()
+            get_catalog(self.cards_dir, self.database)  # Games pick it up next round
         return success
 
 
@@ -17,6 +17,8 @@ class Database:
         self.logs = self.db['game_logs']
         self.custom_cards = self.db['custom_cards']
         self.removed_cards = self.db['removed_cards']
+        # Bumped on writes that change the approved cards, so cached custom cards know to reload
+        self.custom_cards_version = 0
         logging.getLogger("pymongo").setLevel(logging.WARNING)
 
     def get_custom_cards(self, card_type: str, only_approved=True):
@@ -35,11 +37,15 @@ class Database:
             "added_at": time.time(),
             "approved": False
         }
+        # Pending cards aren't in the catalog, so cached cards stay current
         self.custom_cards.insert_one(card)
+        return True
 
-    def approve_custom_card(self, card_text: str, moderator_id: int):
-        self.custom_cards.update_one({
+    def approve_custom_card(self, card_text: str, card_type: str,
+                            moderator_id: int):
+        result = self.custom_cards.update_one({
             "text": card_text,
+            "type": card_type,
             "approved": False
         }, {
             "$set": {
@@ -48,6 +54,10 @@ class Database:
                 "approved_at": time.time()
             }
         })
+        if result.modified_count > 0:
+            self.custom_cards_version += 1
+            return True
+        return False
 
     def is_card_removed(self, card_text: str, card_type: str):
         return self.removed_cards.find_one({
@@ -55,6 +65,23 @@ class Database:
             "type": card_type
         }) is not None
 
+    def get_removed_cards(self):
+        """Get (type, text) for every removed card in a single query"""
+        cards = self.removed_cards.find({}, {"_id": 0, "text": 1, "type": 1})
+        return [(card["type"], card["text"]) for card in cards]
+
+    def remove_card(self, card_text: str, card_type: str,
+                    removed_by_id: int):
+        if self.is_card_removed(card_text, card_type):
+            return False
+        self.removed_cards.insert_one({
+            "text": card_text,
+            "type": card_type,
+            "removed_by": removed_by_id,
+            "removed_at": time.time()
+        })
+        return True
+
     def log_game_start(self, channel_id, creator_id):
         self.games.insert_one({
             "channel_id": channel_id,
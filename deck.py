@@ -0,0 +1,106 @@
+import random
+from array import array
+from typing import Dict, Hashable, Iterable, List, Optional
+
+
+class Deck:
+    """A shuffled draw pile of card IDs
+
+    The deck never copies or compares cards. It holds a shuffled array of
+    card IDs and a cursor; everything before the cursor has been dealt,
+    everything after it is still in the pile.
+    """
+
+    def __init__(self, card_ids: Iterable[int], rng: Optional[random.Random] = None,
+                 shuffle: bool = True):
+        self.rng = rng or random.Random()
+        self.order = array('I', card_ids)
+        if shuffle:
+            self.rng.shuffle(self.order)
+        self.cursor = 0
+
+    def __len__(self) -> int:
+        return len(self.order) - self.cursor
+
+    def __bool__(self) -> bool:
+        return self.cursor < len(self.order)
+
+    def draw(self) -> Optional[int]:
+        """Draw the top card, or None if the deck is empty"""
+        if self.cursor >= len(self.order):
+            return None
+        card_id = self.order[self.cursor]
+        self.cursor += 1
+        return card_id
+
+    def deal(self, count: int) -> List[int]:
+        """Draw up to ``count`` cards in one slice"""
+        start = self.cursor
+        self.cursor = min(start + max(count, 0), len(self.order))
+        return self.order[start:self.cursor].tolist()
+
+    def peek(self, count: int = 1) -> List[int]:
+        """Look at up to ``count`` cards from the top without drawing them"""
+        return self.order[self.cursor:self.cursor + count].tolist()
+
+    def add(self, card_ids: Iterable[int]):
+        """Shuffle new cards into the undrawn part of the pile"""
+        order = self.order
+        for card_id in card_ids:
+            order.append(card_id)
+            swap = self.rng.randrange(self.cursor, len(order))
+            order[-1], order[swap] = order[swap], order[-1]
+
+
+class SegmentedDeck:
+    """Draws uniformly from whichever of several Decks are currently enabled
+
+    Used to keep SFW and NSFW cards in separate piles, so flipping a game's
+    NSFW setting only toggles a segment instead of rebuilding the deck.
+    """
+
+    def __init__(self, segments: Dict[Hashable, Deck],
+                 enabled: Iterable[Hashable] = (),
+                 rng: Optional[random.Random] = None):
+        self.segments = segments
+        self.enabled = set(enabled)
+        self.rng = rng or random.Random()
+
+    def enable(self, name: Hashable, on: bool = True):
+        """Start or stop drawing from a segment"""
+        if on:
+            self.enabled.add(name)
+        else:
+            self.enabled.discard(name)
+
+    def __len__(self) -> int:
+        return sum(len(self.segments[name]) for name in self.enabled)
+
+    def __bool__(self) -> bool:
+        return any(self.segments[name] for name in self.enabled)
+
+    def draw(self) -> Optional[int]:
+        """Draw one card, picking a segment in proportion to its size"""
+        remaining = len(self)
+        if not remaining:
+            return None
+        pick = self.rng.randrange(remaining)
+        for name in self.enabled:
+            deck = self.segments[name]
+            if pick < len(deck):
+                return deck.draw()
+            pick -= len(deck)
+        return None
+
+    def deal(self, count: int) -> List[int]:
+        """Draw up to ``count`` cards"""
+        if len(self.enabled) == 1:
+            (name,) = self.enabled
+            return self.segments[name].deal(count)
+        cards = []
+        for _ in range(count):
+            card = self.draw()
+            if card is None:
+                break
+            cards.append(card)
+        return cards
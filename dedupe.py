@@ -0,0 +1,133 @@
+import hashlib
+import re
+import struct
+import unicodedata
+from array import array
+from typing import Any, Dict, List, Optional
+
+_BLANK = re.compile(r"_+")
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+# Each 64-byte blake2b digest yields 16 of the MinHash hash functions
+_HASHES_PER_DIGEST = 16
+_unpack_digest = struct.Struct(f'<{_HASHES_PER_DIGEST}I').unpack
+
+
+def normalize(text: str) -> str:
+    """Reduce card text to what matters for duplicate checks
+
+    Case, accents, punctuation, extra whitespace and blank length are all
+    ignored, so "Achhe Din!" and "achhe  din" normalize the same.
+    """
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    text = _BLANK.sub(" _ ", text.casefold())
+    text = _PUNCTUATION.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class DuplicateIndex:
+    """Exact and near-duplicate lookup over card texts
+
+    Exact duplicates are found by hashing normalized text. Near duplicates
+    are found with MinHash signatures over character shingles, bucketed by
+    locality-sensitive hashing so a lookup only compares against the few
+    cards that share a band, not the whole index. Cards can be added one at
+    a time as they are submitted or approved.
+    """
+
+    def __init__(self, num_perm: int = 32, bands: int = 8, shingle_size: int = 3,
+                 threshold: float = 0.7):
+        if num_perm % bands or num_perm % _HASHES_PER_DIGEST:
+            raise ValueError(
+                f"num_perm must be a multiple of bands and of {_HASHES_PER_DIGEST}")
+        # Salting blake2b gives independent hash functions, 16 per digest
+        self._salts = [i.to_bytes(2, 'little')
+                       for i in range(num_perm // _HASHES_PER_DIGEST)]
+        self.rows = num_perm // bands
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self._texts: List[str] = []
+        self._signatures: List[array] = []
+        self._exact: Dict[tuple, int] = {}  # (type, normalized text): entry
+        self._buckets: Dict[tuple, Any] = {}  # (type, band, band hash): entry or [entries]
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def _signature(self, normalized: str) -> array:
+        size = self.shingle_size
+        if len(normalized) <= size:
+            shingles = {normalized}
+        else:
+            shingles = {normalized[i:i + size]
+                        for i in range(len(normalized) - size + 1)}
+        rows = []
+        for shingle in shingles:
+            data = shingle.encode('utf-8')
+            row = ()
+            for salt in self._salts:
+                row += _unpack_digest(
+                    hashlib.blake2b(data, digest_size=64, salt=salt).digest())
+            rows.append(row)
+        # Column-wise minimum over all shingles is the MinHash signature
+        return array('I', map(min, zip(*rows)))
+
+    def _band_keys(self, card_type: str, signature: array):
+        rows = self.rows
+        for band in range(self.bands):
+            yield (card_type, band,
+                   hash(tuple(signature[band * rows:(band + 1) * rows])))
+
+    def add(self, card_type: str, text: str) -> bool:
+        """Index a card, returning False if its normalized text is already indexed"""
+        normalized = normalize(text)
+        if (card_type, normalized) in self._exact:
+            return False
+
+        entry = len(self._texts)
+        signature = self._signature(normalized)
+        self._texts.append(text)
+        self._signatures.append(signature)
+        self._exact[(card_type, normalized)] = entry
+        buckets = self._buckets
+        for key in self._band_keys(card_type, signature):
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = entry
+            elif isinstance(bucket, list):
+                bucket.append(entry)
+            else:
+                buckets[key] = [bucket, entry]
+        return True
+
+    def find(self, card_type: str, text: str) -> Optional[Dict[str, Any]]:
+        """Find an indexed card that duplicates or nearly duplicates the text"""
+        normalized = normalize(text)
+        entry = self._exact.get((card_type, normalized))
+        if entry is not None:
+            return {'text': self._texts[entry], 'similarity': 1.0, 'exact': True}
+
+        signature = self._signature(normalized)
+        candidates = set()
+        for key in self._band_keys(card_type, signature):
+            bucket = self._buckets.get(key)
+            if isinstance(bucket, list):
+                candidates.update(bucket)
+            elif bucket is not None:
+                candidates.add(bucket)
+
+        best = None
+        best_similarity = self.threshold
+        for candidate in candidates:
+            other = self._signatures[candidate]
+            same = sum(1 for x, y in zip(signature, other) if x == y)
+            similarity = same / len(signature)
+            if similarity >= best_similarity:
+                best, best_similarity = candidate, similarity
+        if best is None:
+            return None
+        return {'text': self._texts[best], 'similarity': best_similarity,
+                'exact': False}
@@ -0,0 +1,376 @@
+"""
+Game events and the fold that applies them.
+
+Every change to a game's state is recorded as one of the small immutable
+events below and applied with apply(). Game applies each event to itself
+as it happens; a GameLog keeps the recent events in order so the same
+state can be rebuilt, diffed or consumed elsewhere without touching the
+database.
+"""
+
+import copy
+import logging
+from array import array
+from bisect import bisect_right
+from typing import Dict, Hashable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from cards import Card, get_card
+from leaderboard import Leaderboard
+from rotation import PlayerRing
+
+logger = logging.getLogger(__name__)
+
+# Stands in for a card ID in played_cards when the player wrote their own answer
+CUSTOM_ANSWER = -1
+
+
+class Player:
+    """One player's state in a game"""
+
+    __slots__ = ('id', 'name', 'cards', 'score', 'dm_mode', 'needs_prompt_notification',
+                 'hand_version')
+
+    def __init__(self, player_id: int, name: str):
+        self.id = player_id
+        self.name = name
+        self.cards = array('I')  # card IDs
+        self.score = 0
+        self.dm_mode = True  # DM mode is now always enabled
+        self.needs_prompt_notification = False  # Flag for prompt drawer notification
+        self.hand_version = 0  # bumped whenever cards changes, so displays know to re-render
+
+
+class RoundState:
+    """The black card and answers of the current round"""
+
+    __slots__ = ('black_card', 'played_cards', 'custom_answers', 'in_progress', 'all_played',
+                 'version')
+
+    def __init__(self, black_card: Optional[Card] = None, version: int = 0):
+        self.black_card = black_card
+        self.played_cards: Dict[int, int] = {}  # player_id: card ID or CUSTOM_ANSWER
+        self.custom_answers: Dict[int, str] = {}  # player_id: custom answer
+        self.in_progress = black_card is not None
+        self.all_played = False  # answers are closed and the drawer is judging
+        # Bumped by every change to the round or who is answering it, and
+        # carried over to the next round, so displays know to re-render
+        self.version = version
+
+
+class PlayerJoined(NamedTuple):
+    player_id: int
+    name: str
+
+
+class PlayerLeft(NamedTuple):
+    player_id: int
+
+
+class DmModeChanged(NamedTuple):
+    player_id: int
+    enabled: bool
+
+
+class CardsDealt(NamedTuple):
+    player_id: int
+    card_ids: Tuple[int, ...]
+
+
+class HandReplaced(NamedTuple):
+    player_id: int
+    card_ids: Tuple[int, ...]
+
+
+class RoundStarted(NamedTuple):
+    black_card_id: int
+
+
+class RoundCancelled(NamedTuple):
+    pass
+
+
+class CardPlayed(NamedTuple):
+    player_id: int
+    card_id: int
+
+
+class CustomAnswerPlayed(NamedTuple):
+    player_id: int
+    text: str
+
+
+class PlayWithdrawn(NamedTuple):
+    player_id: int
+
+
+class AllPlayed(NamedTuple):
+    pass
+
+
+class WinnerSelected(NamedTuple):
+    player_id: int
+
+
+class RoundSkipped(NamedTuple):
+    pass
+
+
+class NsfwChanged(NamedTuple):
+    allow_nsfw: bool
+
+
+Event = Union[PlayerJoined, PlayerLeft, DmModeChanged, CardsDealt, HandReplaced,
+              RoundStarted, RoundCancelled, CardPlayed, CustomAnswerPlayed,
+              PlayWithdrawn, AllPlayed, WinnerSelected, RoundSkipped, NsfwChanged]
+
+
+class GameState:
+    """Everything about a game that events change, without its decks
+
+    Game carries the same attributes, so apply() works on either.
+    """
+
+    __slots__ = ('players', 'player_order', 'current_prompt_drawer', 'round',
+                 'leaderboard', 'allow_nsfw')
+
+    def __init__(self, allow_nsfw: bool = False):
+        self.players: Dict[int, Player] = {}
+        self.player_order = PlayerRing()  # prompt drawer rotation, in join order
+        self.current_prompt_drawer = None
+        self.round = RoundState()
+        self.leaderboard = Leaderboard()
+        self.allow_nsfw = allow_nsfw
+
+    @classmethod
+    def capture(cls, game) -> 'GameState':
+        """Deep copy of a Game's or GameState's event-driven state"""
+        state = cls.__new__(cls)
+        for name in cls.__slots__:
+            setattr(state, name, copy.deepcopy(getattr(game, name)))
+        return state
+
+
+def _cycle_prompt_drawer(state):
+    """Cycle to the next player for drawing prompts"""
+    if not state.player_order:
+        state.current_prompt_drawer = None
+        return
+
+    # A drawer who left is replaced by the earliest remaining joiner
+    if state.current_prompt_drawer in state.player_order:
+        state.current_prompt_drawer = state.player_order.after(state.current_prompt_drawer)
+    else:
+        state.current_prompt_drawer = state.player_order.head
+
+    logger.debug(f"New prompt drawer: {state.players[state.current_prompt_drawer].name}")
+
+    # Flag this player as needing notification
+    state.players[state.current_prompt_drawer].needs_prompt_notification = True
+
+
+def _round_changed(state):
+    state.round.version += 1
+
+
+def _player_joined(state, event: PlayerJoined):
+    player = Player(event.player_id, event.name)
+    state.players[event.player_id] = player
+    state.leaderboard.add(event.player_id)
+    state.player_order.append(event.player_id)
+    if len(state.player_order) == 1:  # First player becomes first prompt drawer
+        state.current_prompt_drawer = event.player_id
+        player.needs_prompt_notification = True  # First player needs notification
+    _round_changed(state)
+
+
+def _player_left(state, event: PlayerLeft):
+    # Remove player's played card if any
+    state.round.played_cards.pop(event.player_id, None)
+    state.player_order.remove(event.player_id)
+    # If this was the prompt drawer, move to next player
+    if event.player_id == state.current_prompt_drawer:
+        _cycle_prompt_drawer(state)
+    del state.players[event.player_id]
+    state.leaderboard.remove(event.player_id)
+    _round_changed(state)
+
+
+def _dm_mode_changed(state, event: DmModeChanged):
+    state.players[event.player_id].dm_mode = event.enabled
+
+
+def _cards_dealt(state, event: CardsDealt):
+    player = state.players[event.player_id]
+    player.cards.extend(event.card_ids)
+    player.hand_version += 1
+
+
+def _hand_replaced(state, event: HandReplaced):
+    player = state.players[event.player_id]
+    player.cards = array('I', event.card_ids)
+    player.hand_version += 1
+
+
+def _round_started(state, event: RoundStarted):
+    # A fresh round clears the previous played cards and custom answers
+    state.round = RoundState(get_card(event.black_card_id), state.round.version + 1)
+    state.leaderboard.next_round()
+
+
+def _round_cancelled(state, event: RoundCancelled):
+    state.round.black_card = None
+    state.round.in_progress = False
+    _round_changed(state)
+
+
+def _card_played(state, event: CardPlayed):
+    player = state.players[event.player_id]
+    player.cards.remove(event.card_id)
+    player.hand_version += 1
+    state.round.played_cards[event.player_id] = event.card_id
+    _round_changed(state)
+
+
+def _custom_answer_played(state, event: CustomAnswerPlayed):
+    state.round.custom_answers[event.player_id] = event.text
+    state.round.played_cards[event.player_id] = CUSTOM_ANSWER
+    _round_changed(state)
+
+
+def _play_withdrawn(state, event: PlayWithdrawn):
+    state.round.played_cards.pop(event.player_id, None)
+    # The player has to answer again, so answers reopen until they do
+    state.round.all_played = False
+    _round_changed(state)
+
+
+def _all_played(state, event: AllPlayed):
+    state.round.all_played = True
+    _round_changed(state)
+
+
+def _winner_selected(state, event: WinnerSelected):
+    state.players[event.player_id].score = state.leaderboard.add_points(event.player_id)
+    # Move to next prompt drawer
+    _cycle_prompt_drawer(state)
+    state.round.in_progress = False
+    _round_changed(state)
+
+
+def _round_skipped(state, event: RoundSkipped):
+    # The round ends without a winner and the next player draws
+    _cycle_prompt_drawer(state)
+    state.round.in_progress = False
+    _round_changed(state)
+
+
+def _nsfw_changed(state, event: NsfwChanged):
+    state.allow_nsfw = event.allow_nsfw
+
+
+_HANDLERS = {
+    PlayerJoined: _player_joined,
+    PlayerLeft: _player_left,
+    DmModeChanged: _dm_mode_changed,
+    CardsDealt: _cards_dealt,
+    HandReplaced: _hand_replaced,
+    RoundStarted: _round_started,
+    RoundCancelled: _round_cancelled,
+    CardPlayed: _card_played,
+    CustomAnswerPlayed: _custom_answer_played,
+    PlayWithdrawn: _play_withdrawn,
+    AllPlayed: _all_played,
+    WinnerSelected: _winner_selected,
+    RoundSkipped: _round_skipped,
+    NsfwChanged: _nsfw_changed,
+}
+
+
+def apply(state, event: Event):
+    """Apply one event to a Game or GameState"""
+    _HANDLERS[type(event)](state, event)
+
+
+class GameLog:
+    """One game's recent events, from its latest snapshot onwards
+
+    Every snapshot_every events the log keeps a copy of the game's state,
+    so replaying folds at most that many events. Positions count every
+    event ever appended. Consumers that read the log open a cursor and
+    advance it with read(); once every cursor is past the latest snapshot,
+    the events and snapshots before it are dropped, so a long game holds
+    one snapshot and fewer than snapshot_every events.
+    """
+
+    def __init__(self, allow_nsfw: bool = False, snapshot_every: int = 200,
+                 initial: Optional[GameState] = None):
+        self.snapshot_every = snapshot_every
+        self.start = 0  # position of events[0]
+        self.events: List[Event] = []
+        self._snapshot_at = [0]  # position of each snapshot
+        self._snapshots = [initial or GameState(allow_nsfw)]
+        self._cursors: Dict[Hashable, int] = {}  # consumer: position read up to
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    @property
+    def position(self) -> int:
+        """Position after the last event appended"""
+        return self.start + len(self.events)
+
+    def append(self, event: Event, state=None):
+        """Record an event that has been applied to state"""
+        self.events.append(event)
+        if state is not None and self.position % self.snapshot_every == 0:
+            self._snapshot_at.append(self.position)
+            self._snapshots.append(GameState.capture(state))
+            self._compact()
+
+    def _compact(self):
+        """Drop what comes before both the latest snapshot and every cursor"""
+        keep_from = min(self._cursors.values(), default=self.position)
+        i = max(bisect_right(self._snapshot_at, keep_from) - 1, 0)
+        if i == 0:
+            return
+        del self.events[:self._snapshot_at[i] - self.start]
+        self.start = self._snapshot_at[i]
+        del self._snapshot_at[:i]
+        del self._snapshots[:i]
+
+    def open_cursor(self, consumer: Hashable):
+        """Start tracking consumer's reads from the current position"""
+        self._cursors[consumer] = self.position
+
+    def close_cursor(self, consumer: Hashable):
+        self._cursors.pop(consumer, None)
+
+    def has_cursor(self, consumer: Hashable) -> bool:
+        return consumer in self._cursors
+
+    def read(self, consumer: Hashable) -> List[Event]:
+        """Events since consumer last read, advancing its cursor past them"""
+        events = self.events[self._cursors[consumer] - self.start:]
+        self._cursors[consumer] = self.position
+        return events
+
+    def since(self, position: int) -> Iterator[Event]:
+        """Events from position onwards, which must not have been dropped yet"""
+        if position < self.start:
+            raise ValueError(f"events before {self.start} were dropped")
+        return iter(self.events[position - self.start:])
+
+    def replay(self, upto: Optional[int] = None) -> GameState:
+        """Rebuild the state at position upto, or after every event
+
+        Positions before the earliest kept snapshot can no longer be rebuilt.
+        """
+        if upto is None or upto > self.position:
+            upto = self.position
+        if upto < self._snapshot_at[0]:
+            raise ValueError(f"events before {self._snapshot_at[0]} were dropped")
+        i = bisect_right(self._snapshot_at, upto) - 1
+        state = GameState.capture(self._snapshots[i])
+        for event in self.events[self._snapshot_at[i] - self.start:upto - self.start]:
+            apply(state, event)
+        return state
@@ -1,29 +1,179 @@
+import asyncio
+import heapq
 import random
 import logging
-from cards import create_card_manager
+import time
+from collections import OrderedDict
+from cards import create_card_manager, current_catalog, get_card
+from deck import Deck, SegmentedDeck
+from events import (CUSTOM_ANSWER, AllPlayed, CardPlayed, CardsDealt, CustomAnswerPlayed,
+                    DmModeChanged, Event, GameLog, GameState, HandReplaced, NsfwChanged,
+                    Player, PlayerJoined, PlayerLeft, PlayWithdrawn, RoundCancelled,
+                    RoundSkipped, RoundStarted, WinnerSelected, apply)
 from typing import Dict, Optional, List
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.DEBUG)
 
-class Game:
-    def __init__(self, allow_nsfw: bool = False, database=None):
-        self.players = {}  # player_id: {id, name, cards, score}
-        self.card_manager = create_card_manager(allow_nsfw, database)
-        self.black_cards = self.card_manager.get_black_cards()
-        self.white_cards = self.card_manager.get_white_cards()
-        self.current_black_card = None
-        self.played_cards = {}  # player_id: card
-        self.round_in_progress = False
-        self.current_prompt_drawer = None
-        self.player_order = []
+class GameView:
+    """Read-only queries over a game's event-driven state
+
+    Shared by Game and by replicas of games that run elsewhere, which carry
+    the same GameState attributes.
+    """
+
+    @property
+    def phase(self) -> Optional[str]:
+        """'play' while answers are open, 'judge' once they are closed, None between rounds"""
+        if not self.round.in_progress:
+            return None
+        return 'judge' if self.round.all_played else 'play'
+
+    def get_hand(self, player_id) -> List[str]:
+        """Get the text of each card in a player's hand, for display"""
+        if player_id not in self.players:
+            return []
+        return [get_card(card_id).text for card_id in self.players[player_id].cards]
+
+    def _played_text(self, player_id) -> str:
+        """Resolve a played card ID or custom answer to its text"""
+        card = self.round.played_cards[player_id]
+        if card == CUSTOM_ANSWER:
+            return self.round.custom_answers[player_id]
+        return get_card(card).text
+
+    def get_played_cards(self, include_players: bool = False, include_custom: bool = False):
+        """Get all played cards for selection
+        
+        Args:
+            include_players: Add player info for each card
+            include_custom: Add flag for custom answers
+        """
+        if include_players and include_custom:
+            # Include both player info and custom flag
+            return {player_id: {
+                'card': self._played_text(player_id),
+                'player_name': self.players[player_id].name,
+                'is_custom': player_id in self.round.custom_answers
+            } for player_id in self.round.played_cards}
+        elif include_players:
+            # Include just player info
+            return {player_id: {
+                'card': self._played_text(player_id),
+                'player_name': self.players[player_id].name
+            } for player_id in self.round.played_cards}
+        elif include_custom:
+            # Include just custom flag
+            return [{'text': self._played_text(player_id), 'is_custom': player_id in self.round.custom_answers} 
+                  for player_id in self.round.played_cards]
+        else:
+            # Return only cards without player names for suspense
+            return [self._played_text(player_id) for player_id in self.round.played_cards]
+
+    def get_scores(self):
+        """Get current standings, best first
+
+        Each entry has the player's name, score and competition rank, whether
+        they share that rank, and their points and rank change this round
+        (rank_change is None for players who joined mid-round).
+        """
+        leaderboard = self.leaderboard
+        scores = {}
+        for player_id, score, rank in leaderboard.standings():
+            scores[player_id] = {
+                'name': self.players[player_id].name,
+                'score': score,
+                'rank': rank,
+                'tied': leaderboard.tie_count(score) > 1,
+                'round_points': leaderboard.round_points(player_id),
+                'rank_change': leaderboard.rank_change(player_id)
+            }
+        return scores
+
+    def get_winner(self):
+        """Get the player with the highest score
+
+        Ties go to whoever joined first, and the others on the same score
+        are listed in 'tied_with'.
+        """
+        player_id = self.leaderboard.top()
+        if player_id is None:
+            return None
+
+        score = self.leaderboard.score(player_id)
+        return {
+            'id': player_id,
+            'name': self.players[player_id].name,
+            'score': score,
+            'tied_with': [self.players[other].name
+                          for other in self.leaderboard.tie_group(score)
+                          if other != player_id]
+        }
+
+class Game(GameView):
+    # How many events the game log folds at most when replaying
+    SNAPSHOT_EVERY = 200
+
+    def __init__(self, allow_nsfw: bool = False, database=None, rng: Optional[random.Random] = None):
+        # The fields of GameState are only changed by applying events, see _emit
+        state = GameState(allow_nsfw)
+        self.players: Dict[int, Player] = state.players
+        self.player_order = state.player_order  # prompt drawer rotation, in join order
+        self.current_prompt_drawer = state.current_prompt_drawer
+        self.round = state.round
+        self.leaderboard = state.leaderboard
         self.allow_nsfw = allow_nsfw
-        self.custom_answers = {}  # player_id: custom answer
+        self.log = GameLog(allow_nsfw, self.SNAPSHOT_EVERY)
+        self.rng = rng or random.Random()
+        self.card_manager = create_card_manager(allow_nsfw, database)
+        self.black_deck = self._build_deck('black')
+        self.white_deck = self._build_deck('white')
         self.database = database  # Store database reference
-        logger.debug(f"Game initialized with {len(self.black_cards)} black cards and {len(self.white_cards)} white cards")
+        self.manager = None  # GameManager that owns this game, if any
+        self.channel_id = None
+        # Held by main.py while a command or button press runs against this game
+        self.lock = asyncio.Lock()
+        logger.debug(f"Game initialized with {len(self.black_deck)} black cards and {len(self.white_deck)} white cards")
         if allow_nsfw:
             logger.debug("NSFW content enabled")
 
+    def _build_deck(self, card_type: str) -> SegmentedDeck:
+        """Build a deck with SFW and NSFW segments over the shared catalog"""
+        catalog = self.card_manager.catalog
+        segments = {nsfw: Deck(catalog.segment(card_type, nsfw), self.rng)
+                    for nsfw in (False, True)}
+        enabled = (False, True) if self.card_manager.allow_nsfw else (False,)
+        return SegmentedDeck(segments, enabled, self.rng)
+
+    def _deal(self, deck: SegmentedDeck, count: int) -> List[int]:
+        """Deal up to count cards, skipping any the catalog no longer allows"""
+        dealt = []
+        while len(dealt) < count and deck:
+            dealt.extend(self.card_manager.filter_cards(deck.deal(count - len(dealt))))
+        return dealt
+
+    def _emit(self, event: Event):
+        """Apply an event to this game and append it to the game log"""
+        apply(self, event)
+        self.log.append(event, self)
+        if self.manager:
+            self.manager._game_changed(self.channel_id, self)
+
+    def _sync_catalog(self):
+        """Move this game onto the latest catalog, shuffling in any new cards"""
+        old = self.card_manager.catalog
+        latest = current_catalog()
+        if latest is None or latest is old or latest.cards_dir != old.cards_dir:
+            return
+
+        delta = latest.delta_from(old)
+        for (card_type, nsfw), card_ids in delta.added.items():
+            deck = self.black_deck if card_type == 'black' else self.white_deck
+            deck.segments[nsfw].add(card_ids)
+        # Removed cards stay in the piles and are skipped when dealt
+        self.card_manager.catalog = latest
+        logger.info(f"Game moved to card catalog v{latest.version}: {delta}")
+
     def add_custom_card(self, card_text: str, card_type: str, added_by_id: int) -> bool:
         """Add a custom card to the database"""
         if not self.card_manager:
@@ -42,23 +192,41 @@ class Game:
             return False
         return self.card_manager.approve_custom_card(card_text, card_type, moderator_id)
 
-    def play_custom_answer(self, player_id: int, custom_text: str) -> bool:
-        """Submit a custom answer instead of playing a card"""
-        if not self.round_in_progress or player_id not in self.players:
+    def _can_play(self, player_id) -> bool:
+        """Whether a player may still answer this round"""
+        return (self.round.in_progress and not self.round.all_played and
+                player_id in self.players and
+                player_id not in self.round.played_cards and
+                # Don't allow prompt drawer to play
+                player_id != self.current_prompt_drawer)
+
+    def _close_answers(self) -> bool:
+        """Close the round to answers once everyone but the prompt drawer has played
+
+        Returns True only for the call that closes it, so the all-played
+        transition happens exactly once per round.
+        """
+        if not self.round.in_progress or self.round.all_played:
             return False
+        active_players = len(self.players) - 1  # Exclude prompt drawer
+        answered = sum(1 for player_id in self.round.played_cards
+                       if player_id != self.current_prompt_drawer)
+        if not answered or answered < active_players:
+            return False
+        self._emit(AllPlayed())
+        logger.info("All players have played their cards/answers")
+        return True
 
-        # Don't allow prompt drawer to play
-        if player_id == self.current_prompt_drawer:
+    def play_custom_answer(self, player_id: int, custom_text: str) -> bool:
+        """Submit a custom answer instead of playing a card"""
+        if not self._can_play(player_id):
             return False
 
         # Store the custom answer
-        self.custom_answers[player_id] = custom_text
-        self.played_cards[player_id] = custom_text
+        self._emit(CustomAnswerPlayed(player_id, custom_text))
 
         # Check if all players (except prompt drawer) have played
-        active_players = len(self.players) - 1  # Exclude prompt drawer
-        if len(self.played_cards) == active_players:
-            logger.info("All players have played their cards/answers")
+        if self._close_answers():
             return "all_played"
 
         return True
@@ -66,10 +234,10 @@ class Game:
     def set_player_dm_mode(self, player_id: int, enabled: bool) -> bool:
         """Enable or disable DM mode for a player"""
         if player_id in self.players:
-            if self.players[player_id].get('dm_mode', True) == enabled: #Default to True
+            if self.players[player_id].dm_mode == enabled:
                 return False
-            self.players[player_id]['dm_mode'] = enabled
-            logger.info(f"Player {self.players[player_id]['name']} {'enabled' if enabled else 'disabled'} DM mode")
+            self._emit(DmModeChanged(player_id, enabled))
+            logger.info(f"Player {self.players[player_id].name} {'enabled' if enabled else 'disabled'} DM mode")
             return True
         return False
 
@@ -78,42 +246,26 @@ class Game:
         if player_id not in self.players:
             return False
 
-        # Remove player's played card if any
-        self.played_cards.pop(player_id, None)
-
-        # Remove from player order
-        if player_id in self.player_order:
-            self.player_order.remove(player_id)
-
-        # If this was the prompt drawer, move to next player
-        if player_id == self.current_prompt_drawer:
-            self._cycle_prompt_drawer()
-
-        # Remove player
-        player_name = self.players[player_id]['name']
-        del self.players[player_id]
+        # Remove player, their played card and their place in the rotation
+        player_name = self.players[player_id].name
+        self._emit(PlayerLeft(player_id))
+        if self.manager:
+            self.manager._unindex_player(player_id, self.channel_id)
 
         logger.info(f"Player {player_name} removed from game")
+        # A prompt drawer who left is replaced by the next player, who may
+        # already have answered: they judge now, so take their answer back
+        drawer = self.current_prompt_drawer
+        if self.round.in_progress and drawer in self.round.played_cards:
+            card = self.round.played_cards[drawer]
+            self._emit(PlayWithdrawn(drawer))
+            if card != CUSTOM_ANSWER:
+                self._emit(CardsDealt(drawer, (card,)))
+        # The player who left may have been the last one still to answer
+        if self._close_answers():
+            return "all_played"
         return True
 
-    def _cycle_prompt_drawer(self):
-        """Cycle to the next player for drawing prompts"""
-        if not self.player_order:
-            self.current_prompt_drawer = None
-            return
-
-        if self.current_prompt_drawer in self.player_order:
-            current_index = self.player_order.index(self.current_prompt_drawer)
-            next_index = (current_index + 1) % len(self.player_order)
-        else:
-            next_index = 0
-
-        self.current_prompt_drawer = self.player_order[next_index]
-        logger.debug(f"New prompt drawer: {self.players[self.current_prompt_drawer]['name']}")
-        
-        # Flag this player as needing notification
-        self.players[self.current_prompt_drawer]['needs_prompt_notification'] = True
-
     def update_nsfw_setting(self, allow_nsfw: bool) -> bool:
         """Update NSFW setting and refresh all cards"""
         try:
@@ -123,55 +275,54 @@ class Game:
 
             # Update card manager
             if self.card_manager.update_nsfw_setting(allow_nsfw):
-                self.allow_nsfw = allow_nsfw
+                self._emit(NsfwChanged(allow_nsfw))
                 logger.debug(f"Updating NSFW setting to {allow_nsfw}")
 
-                # Get new card decks
-                try:
-                    self.black_cards = self.card_manager.get_black_cards()
-                    self.white_cards = self.card_manager.get_white_cards()
-                    logger.debug(f"Loaded {len(self.black_cards)} black cards and {len(self.white_cards)} white cards")
-                except Exception as e:
-                    logger.error(f"Failed to load new card decks: {str(e)}")
-                    return False
+                # Switch the NSFW segments of the decks on or off
+                self.black_deck.enable(True, allow_nsfw)
+                self.white_deck.enable(True, allow_nsfw)
+                logger.debug(f"Now drawing from {len(self.black_deck)} black cards and {len(self.white_deck)} white cards")
+
+                # Enabling NSFW only adds cards, so there is nothing to filter
+                if allow_nsfw:
+                    logger.info(f"Updated NSFW setting to {allow_nsfw}")
+                    return True
 
                 # Filter current black card if it exists
-                if self.current_black_card:
+                if self.round.black_card:
                     try:
-                        valid_texts = {card['text'] for card in self.black_cards}
-                        if self.current_black_card['text'] not in valid_texts:
+                        if not self.card_manager.filter_cards([self.round.black_card.id]):
                             logger.info("Current black card was filtered due to NSFW setting change")
-                            self.current_black_card = None
-                            self.round_in_progress = False
+                            self._emit(RoundCancelled())
                     except Exception as e:
                         logger.error(f"Error filtering black card: {str(e)}")
-                        self.current_black_card = None
-                        self.round_in_progress = False
+                        self._emit(RoundCancelled())
 
                 # Filter each player's hand
                 for player_id, player in self.players.items():
                     try:
-                        old_card_count = len(player['cards'])
-                        filtered_cards = self.card_manager.filter_cards(player['cards'])
-                        player['cards'] = filtered_cards
+                        old_card_count = len(player.cards)
+                        filtered_cards = self.card_manager.filter_cards(player.cards)
+                        self._emit(HandReplaced(player_id, tuple(filtered_cards)))
                         # Draw new cards to replace filtered ones
-                        self.draw_cards(player['id'])
-                        logger.info(f"Player {player['name']}: {old_card_count - len(filtered_cards)} cards filtered, drew new cards")
+                        self.draw_cards(player.id)
+                        logger.info(f"Player {player.name}: {old_card_count - len(filtered_cards)} cards filtered, drew new cards")
                     except Exception as e:
-                        logger.error(f"Error updating cards for player {player['name']}: {str(e)}")
-                        player['cards'] = []  # Reset hand on error
-                        self.draw_cards(player['id'])  # Try to draw new cards
+                        logger.error(f"Error updating cards for player {player.name}: {str(e)}")
+                        self._emit(HandReplaced(player_id, ()))  # Reset hand on error
+                        self.draw_cards(player.id)  # Try to draw new cards
 
-                # Filter played cards
+                # Filter played cards, keeping custom answers
                 try:
-                    old_played_count = len(self.played_cards)
-                    valid_cards = set(self.card_manager.filter_cards([card for card in self.played_cards.values()]))
-                    self.played_cards = {pid: card for pid, card in self.played_cards.items()
-                                        if card in valid_cards}
-                    logger.info(f"Played cards: {old_played_count - len(self.played_cards)} cards filtered")
+                    filtered = [pid for pid, card in self.round.played_cards.items()
+                                if card != CUSTOM_ANSWER and not self.card_manager.filter_cards([card])]
+                    for pid in filtered:
+                        self._emit(PlayWithdrawn(pid))
+                    logger.info(f"Played cards: {len(filtered)} cards filtered")
                 except Exception as e:
                     logger.error(f"Error filtering played cards: {str(e)}")
-                    self.played_cards = {}  # Reset played cards on error
+                    for pid in list(self.round.played_cards):  # Reset played cards on error
+                        self._emit(PlayWithdrawn(pid))
 
                 logger.info(f"Updated NSFW setting to {allow_nsfw}")
                 return True
@@ -182,18 +333,7 @@ class Game:
 
     def add_player(self, player_id, player_name):
         if player_id not in self.players:
-            self.players[player_id] = {
-                'id': player_id,  # Store ID for reference
-                'name': player_name,
-                'cards': [],
-                'score': 0,
-                'dm_mode': True,  # DM mode is now always enabled
-                'needs_prompt_notification': False  # Flag for prompt drawer notification
-            }
-            self.player_order.append(player_id)
-            if len(self.player_order) == 1:  # First player becomes first prompt drawer
-                self.current_prompt_drawer = player_id
-                self.players[player_id]['needs_prompt_notification'] = True  # First player needs notification
+            self._emit(PlayerJoined(player_id, player_name))
             return True
         return False
 
@@ -204,144 +344,179 @@ class Game:
             return None
 
         player = self.players[player_id]
-        cards_needed = 7 - len(player['cards'])
+        cards_needed = 7 - len(player.cards)
         if cards_needed <= 0:
-            logger.debug(f"Player {player['name']} already has a full hand")
-            return player['cards']
-
-        cards_drawn = 0
-        while len(player['cards']) < 7:
-            if not self.white_cards:
-                logger.warning("No more white cards available in deck")
-                break
-            try:
-                card = random.choice(self.white_cards)
-                self.white_cards.remove(card)
-                player['cards'].append(card['text'])
-                cards_drawn += 1
-            except Exception as e:
-                logger.error(f"Error drawing card: {str(e)}")
-                break
+            logger.debug(f"Player {player.name} already has a full hand")
+            return player.cards
 
-        logger.info(f"Drew {cards_drawn} cards for player {player['name']}")
-        return player['cards']
+        drawn = self._deal(self.white_deck, cards_needed)
+        if drawn:
+            self._emit(CardsDealt(player_id, tuple(drawn)))
+        cards_drawn = len(drawn)
+        if cards_drawn < cards_needed:
+            logger.warning("No more white cards available in deck")
+
+        logger.info(f"Drew {cards_drawn} cards for player {player.name}")
+        return player.cards
 
     def play_card(self, player_id, card_index):
-        if player_id not in self.players:
+        if not self._can_play(player_id):
             return False
 
         player = self.players[player_id]
-        if card_index < 0 or card_index >= len(player['cards']):
-            return False
-
-        # Don't allow prompt drawer to play a card
-        if player_id == self.current_prompt_drawer:
+        if card_index < 0 or card_index >= len(player.cards):
             return False
 
-        card = player['cards'].pop(card_index)
-        self.played_cards[player_id] = card
+        self._emit(CardPlayed(player_id, player.cards[card_index]))
 
         # Check if all players (except prompt drawer) have played
-        active_players = len(self.players) - 1  # Exclude prompt drawer
-        if len(self.played_cards) == active_players:
-            logger.info("All players have played their cards")
+        if self._close_answers():
             return "all_played"
 
         return True
 
     def start_round(self):
-        if not self.black_cards:
+        # Pick up card file changes between rounds, never mid-round
+        self._sync_catalog()
+
+        drawn = self._deal(self.black_deck, 1)
+        if not drawn:
             logger.debug("No black cards remaining in deck")
             return None
 
-        self.current_black_card = random.choice(self.black_cards)
-        self.black_cards.remove(self.current_black_card)
-        self.played_cards = {}
-        self.custom_answers = {} #clear custom answers for new round
-        self.round_in_progress = True
+        # A fresh round clears the previous played cards and custom answers
+        self._emit(RoundStarted(drawn[0]))
 
-        logger.debug(f"Drew black card: {self.current_black_card['text']}")
-        logger.debug(f"Remaining black cards: {len(self.black_cards)}")
-        return self.current_black_card['text']
+        logger.debug(f"Drew black card: {self.round.black_card.text}")
+        logger.debug(f"Remaining black cards: {len(self.black_deck)}")
+        return self.round.black_card.text
 
     def select_winner(self, winning_player_id):
         """Select the winning card and award points"""
-        if not self.round_in_progress or winning_player_id not in self.played_cards:
+        if not self.round.in_progress or winning_player_id not in self.round.played_cards:
             return False
 
-        # Award point to winner
-        self.players[winning_player_id]['score'] += 1
-        logger.info(f"Player {self.players[winning_player_id]['name']} won the round! New score: {self.players[winning_player_id]['score']}")
-
         # Top up all players' cards
         for player_id in self.players:
             if player_id != self.current_prompt_drawer:  # Skip prompt drawer
                 self.draw_cards(player_id)
 
-        # Move to next prompt drawer
-        self._cycle_prompt_drawer()
-        self.round_in_progress = False
+        # Award point to winner, end the round and move to next prompt drawer
+        self._emit(WinnerSelected(winning_player_id))
+        logger.info(f"Player {self.players[winning_player_id].name} won the round! New score: {self.players[winning_player_id].score}")
         return True
 
-    def get_played_cards(self, include_players: bool = False, include_custom: bool = False):
-        """Get all played cards for selection
-        
-        Args:
-            include_players: Add player info for each card
-            include_custom: Add flag for custom answers
-        """
-        if include_players and include_custom:
-            # Include both player info and custom flag
-            return {player_id: {
-                'card': card,
-                'player_name': self.players[player_id]['name'],
-                'is_custom': player_id in self.custom_answers
-            } for player_id, card in self.played_cards.items()}
-        elif include_players:
-            # Include just player info
-            return {player_id: {
-                'card': card,
-                'player_name': self.players[player_id]['name']
-            } for player_id, card in self.played_cards.items()}
-        elif include_custom:
-            # Include just custom flag
-            return [{'text': card, 'is_custom': player_id in self.custom_answers} 
-                  for player_id, card in self.played_cards.items()]
-        else:
-            # Return only cards without player names for suspense
-            return list(self.played_cards.values())
-
-    def get_scores(self):
-        """Get current scores for all players"""
-        return {player_id: {
-            'name': player['name'],
-            'score': player['score']
-        } for player_id, player in self.players.items()}
+    def auto_play(self) -> List[int]:
+        """Play a random card for everyone who hasn't answered, when the play phase times out
 
-    def get_winner(self):
-        """Get the player with the highest score"""
-        if not self.players:
+        Returns the IDs of the players played for. Answers are closed even if
+        a player had no cards to play, and a round nobody answered is skipped.
+        """
+        if self.phase != 'play':
+            return []
+
+        auto_played = []
+        for player_id in self.player_order:
+            if self._can_play(player_id) and self.players[player_id].cards:
+                hand = self.players[player_id].cards
+                self._emit(CardPlayed(player_id, hand[self.rng.randrange(len(hand))]))
+                auto_played.append(player_id)
+
+        if not self.round.played_cards:
+            self.skip_round()
+        elif not self._close_answers():
+            self._emit(AllPlayed())
+        logger.info(f"Play phase timed out, played for {len(auto_played)} player(s)")
+        return auto_played
+
+    def auto_select_winner(self) -> Optional[int]:
+        """Pick a random winner when the judging phase times out, returning their ID"""
+        if self.phase != 'judge' or not self.round.played_cards:
+            return None
+        winning_player_id = self.rng.choice(list(self.round.played_cards))
+        if not self.select_winner(winning_player_id):
             return None
+        return winning_player_id
 
-        # Handle tie by selecting the first player with highest score
-        max_score = max(player['score'] for player in self.players.values())
-        for player_id, player in self.players.items():
-            if player['score'] == max_score:
-                return {
-                    'id': player_id,
-                    'name': player['name'],
-                    'score': max_score
-                }
-        return None
+    def skip_round(self) -> bool:
+        """End the round without a winner and move to the next prompt drawer"""
+        if not self.round.in_progress:
+            return False
+
+        for player_id in self.players:
+            if player_id != self.current_prompt_drawer:
+                self.draw_cards(player_id)
+        self._emit(RoundSkipped())
+        logger.info("Round skipped")
+        return True
 
 class GameManager:
-    def __init__(self, database=None):
+    """Tracks the active game in each channel
+
+    Games idle for longer than idle_ttl seconds are ended by reap_idle, and
+    once more than max_games are active, creating a game ends the least
+    recently active one. A game is active whenever its state changes.
+    """
+
+    def __init__(self, database=None, idle_ttl: Optional[float] = None,
+                 max_games: Optional[int] = None):
         self.games = {}  # channel_id: Game
         self.database = database
-
-    def create_game(self, channel_id, allow_nsfw: bool = False):
-        """Create a new game with NSFW setting"""
-        self.games[channel_id] = Game(allow_nsfw, self.database)
+        self.idle_ttl = idle_ttl
+        self.max_games = max_games
+        # channel_id: last activity time, least recently active first
+        self.last_active: "OrderedDict[int, float]" = OrderedDict()
+        # (expiry time, channel_id), at most one entry per channel. An entry
+        # can be stale: reap_idle checks last_active before ending a game.
+        self._expiry_heap: List[tuple] = []
+        self._scheduled = set()  # channels with an entry in the expiry heap
+        # player_id: [channel_id, ...] in join order. A player should only
+        # be in one game, but if they are in several the latest one wins.
+        self.player_channels: Dict[int, List[int]] = {}
+        # Channels whose game was created, changed or ended since the last snapshot
+        self.dirty_channels = set()
+
+    def create_game(self, channel_id, allow_nsfw: bool = False,
+                    rng: Optional[random.Random] = None) -> List[int]:
+        """Create a new game with NSFW setting, returning the channel IDs of games evicted for it"""
+        return self.add_game(channel_id, Game(allow_nsfw, self.database, rng))
+
+    def add_game(self, channel_id, game: Game) -> List[int]:
+        """Start tracking a game, such as one restored from a snapshot
+
+        Returns the channel IDs of games ended to stay within max_games.
+        """
+        game.manager = self
+        game.channel_id = channel_id
+        self.games[channel_id] = game
+        for player_id in game.players:
+            self.player_channels.setdefault(player_id, []).append(channel_id)
+        self._game_changed(channel_id, game)
+
+        evicted = []
+        if self.max_games is not None:
+            while len(self.games) > self.max_games:
+                oldest = next(iter(self.last_active))
+                logger.info(f"Too many active games, ending least recently active game in channel {oldest}")
+                if self.evict(oldest):
+                    evicted.append(oldest)
+                else:
+                    # Not a tracked game, so its entry can only be stale
+                    del self.last_active[oldest]
+        return evicted
+
+    def _game_changed(self, channel_id, game: Game):
+        """Mark a game as active and due for a snapshot"""
+        # A game that already ended can still be changed through old references
+        if self.games.get(channel_id) is not game:
+            return
+        self.dirty_channels.add(channel_id)
+        now = time.monotonic()
+        self.last_active[channel_id] = now
+        self.last_active.move_to_end(channel_id)
+        if self.idle_ttl is not None and channel_id not in self._scheduled:
+            self._scheduled.add(channel_id)
+            heapq.heappush(self._expiry_heap, (now + self.idle_ttl, channel_id))
 
     def get_game(self, channel_id):
         return self.games.get(channel_id)
@@ -351,12 +526,69 @@ class GameManager:
 
     def end_game(self, channel_id):
         if channel_id in self.games:
-            del self.games[channel_id]
+            game = self.games.pop(channel_id)
+            for player_id in game.players:
+                self._unindex_player(player_id, channel_id)
+            self.last_active.pop(channel_id, None)
+            self.dirty_channels.add(channel_id)
             return True
         return False
 
+    def evict(self, channel_id) -> bool:
+        """End a game that nobody ended, logging the end to the database"""
+        if not self.end_game(channel_id):
+            return False
+        if self.database:
+            try:
+                self.database.log_game_end(channel_id)
+            except Exception as e:
+                logger.error(f"Failed to log end of evicted game in channel {channel_id}: {str(e)}")
+        return True
+
+    def reap_idle(self, now: Optional[float] = None) -> List[int]:
+        """End games idle for longer than idle_ttl, returning their channel IDs
+
+        Only expiry heap entries that are due are looked at. An entry for a
+        game that has been active since is pushed back with its new expiry.
+        """
+        if self.idle_ttl is None:
+            return []
+        now = time.monotonic() if now is None else now
+        reaped = []
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            _, channel_id = heapq.heappop(heap)
+            last_active = self.last_active.get(channel_id)
+            if last_active is None:
+                # Game already ended
+                self._scheduled.discard(channel_id)
+            elif last_active + self.idle_ttl > now:
+                heapq.heappush(heap, (last_active + self.idle_ttl, channel_id))
+            else:
+                self._scheduled.discard(channel_id)
+                logger.info(f"Ending game in channel {channel_id} after {self.idle_ttl:.0f}s idle")
+                if self.evict(channel_id):
+                    reaped.append(channel_id)
+        return reaped
+
     def add_player(self, channel_id, player_id, player_name):
         game = self.get_game(channel_id)
-        if game:
-            return game.add_player(player_id, player_name)
-        return False
\ No newline at end of file
+        if game and game.add_player(player_id, player_name):
+            self.player_channels.setdefault(player_id, []).append(channel_id)
+            return True
+        return False
+
+    def _unindex_player(self, player_id, channel_id):
+        channels = self.player_channels.get(player_id)
+        if channels and channel_id in channels:
+            channels.remove(channel_id)
+            if not channels:
+                del self.player_channels[player_id]
+
+    def find_player_game(self, player_id):
+        """Get (channel_id, game) for the game a player most recently joined, or (None, None)"""
+        channels = self.player_channels.get(player_id)
+        if not channels:
+            return None, None
+        channel_id = channels[-1]
+        return channel_id, self.games[channel_id]
@@ -0,0 +1,119 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
+
+
+class Leaderboard:
+    """Players sorted by score, kept up to date one point at a time
+
+    Entries are (-score, join order, player_id) in a sorted list, so the
+    leader is always entries[0], ties go to whoever joined first, and a
+    player's rank or tie group is a binary search away. Ranks are
+    competition ranks: two players tied for first are both rank 1 and the
+    next player is rank 3.
+
+    next_round() remembers the standings, so score embeds can show each
+    player's points and rank change since the round started.
+    """
+
+    def __init__(self):
+        self._entries: List[Tuple[int, int, Hashable]] = []
+        self._scores: Dict[Hashable, int] = {}
+        self._joined: Dict[Hashable, int] = {}
+        self._join_order = 0
+        self._last_entries: List[Tuple[int, int, Hashable]] = []
+        self._round_points: Dict[Hashable, int] = {}  # player_id: points this round
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, player_id) -> bool:
+        return player_id in self._scores
+
+    def __iter__(self) -> Iterator[Hashable]:
+        """Player IDs from first place to last"""
+        return (player_id for _, _, player_id in self._entries)
+
+    def _entry(self, player_id) -> Tuple[int, int, Hashable]:
+        return (-self._scores[player_id], self._joined[player_id], player_id)
+
+    def add(self, player_id: Hashable, score: int = 0):
+        """Add a player, placed after everyone who joined before them on the same score"""
+        if player_id in self._scores:
+            return
+        self._scores[player_id] = score
+        self._joined[player_id] = self._join_order
+        self._join_order += 1
+        insort(self._entries, self._entry(player_id))
+
+    def remove(self, player_id: Hashable) -> bool:
+        if player_id not in self._scores:
+            return False
+        entry = self._entry(player_id)
+        del self._entries[bisect_left(self._entries, entry)]
+        del self._scores[player_id]
+        del self._joined[player_id]
+        self._round_points.pop(player_id, None)
+        return True
+
+    def add_points(self, player_id: Hashable, points: int = 1) -> int:
+        """Change a player's score, returning the new score"""
+        entry = self._entry(player_id)
+        del self._entries[bisect_left(self._entries, entry)]
+        self._scores[player_id] += points
+        self._round_points[player_id] = self._round_points.get(player_id, 0) + points
+        insort(self._entries, self._entry(player_id))
+        return self._scores[player_id]
+
+    def next_round(self):
+        """Start counting points and rank changes from the current standings"""
+        self._last_entries = list(self._entries)
+        self._round_points = {}
+
+    def top(self) -> Optional[Hashable]:
+        """The leading player, earliest joiner first on a tie"""
+        return self._entries[0][2] if self._entries else None
+
+    def score(self, player_id: Hashable) -> int:
+        return self._scores[player_id]
+
+    def rank(self, player_id: Hashable) -> int:
+        """1-based competition rank"""
+        return bisect_left(self._entries, (-self._scores[player_id],)) + 1
+
+    def _score_range(self, score: int) -> Tuple[int, int]:
+        return (bisect_left(self._entries, (-score,)),
+                bisect_right(self._entries, (-score, float('inf'))))
+
+    def tie_count(self, score: int) -> int:
+        """How many players are on exactly this score"""
+        start, end = self._score_range(score)
+        return end - start
+
+    def tie_group(self, score: int) -> List[Hashable]:
+        """Players on exactly this score, in join order"""
+        start, end = self._score_range(score)
+        return [player_id for _, _, player_id in self._entries[start:end]]
+
+    def round_points(self, player_id: Hashable) -> int:
+        """Points a player gained since next_round was last called"""
+        return self._round_points.get(player_id, 0)
+
+    def rank_change(self, player_id: Hashable) -> Optional[int]:
+        """Places gained (positive) or lost since next_round, or None for a new player"""
+        last_score = self._scores[player_id] - self._round_points.get(player_id, 0)
+        last = self._last_entries
+        entry = (-last_score, self._joined[player_id], player_id)
+        i = bisect_left(last, entry)
+        if i == len(last) or last[i] != entry:
+            return None
+        last_rank = bisect_left(last, (-last_score,)) + 1
+        return last_rank - self.rank(player_id)
+
+    def standings(self) -> Iterator[Tuple[Hashable, int, int]]:
+        """(player_id, score, rank) from first place to last"""
+        rank = 0
+        last_score = None
+        for position, (negative_score, _, player_id) in enumerate(self._entries, 1):
+            if negative_score != last_score:
+                rank, last_score = position, negative_score
+            yield player_id, -negative_score, rank
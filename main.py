@@ -13,13 +13,23 @@ https://discord.com/api/oauth2/authorize?client_id=YOUR_CLIENT_ID&permissions=10
 """
 
 import os
+import asyncio
+import functools
+import signal
 import discord
 from discord.ext import commands
 from discord import app_commands, Embed, Color, ButtonStyle
 from discord.ui import Button, View
 import logging
 from game import GameManager
+from shard import ShardedGameManager, ShardRouter
 from database import Database
+from watcher import CardWatcher
+from snapshot import SnapshotStore
+from timers import TimerScheduler
+from users import UserCache
+from messaging import EDITED, UNCHANGED, LiveMessages, fan_out
+from outbound import OutboundScheduler
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -35,15 +45,486 @@ intents.message_content = True
 intents.members = True  # Privileged intent
 intents.voice_states = True  # Privileged intent
 bot = commands.Bot(command_prefix=['.cas ', '!cas '], intents=intents)
+user_cache = UserCache(bot,
+                       max_size=int(os.getenv("USER_CACHE_SIZE", "10000")),
+                       ttl=float(os.getenv("USER_CACHE_TTL", "600")))
 
 # Initialize game manager and database
-game_manager = GameManager()
 db = Database()
+GAME_IDLE_TTL = float(os.getenv("GAME_IDLE_TTL", "3600"))
+MAX_ACTIVE_GAMES = int(os.getenv("MAX_ACTIVE_GAMES", "1000"))
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "data/snapshots")
+card_watcher_options = {
+    'interval': float(os.getenv("CARD_RELOAD_INTERVAL", "5")),
+    'custom_card_ttl': float(os.getenv("CUSTOM_CARD_TTL", "300")),
+}
+# Run games in this many worker processes, partitioned by channel; 0 keeps them here
+SHARD_WORKERS = int(os.getenv("SHARD_WORKERS", "0"))
+if SHARD_WORKERS:
+    # Forked now, before the bot starts, so workers don't run this module again.
+    # Each worker caps, reaps, snapshots and reloads cards for its own games.
+    game_manager = ShardedGameManager(ShardRouter(
+        SHARD_WORKERS,
+        database_factory=Database,
+        start_method='fork',
+        manager_options={'idle_ttl': GAME_IDLE_TTL,
+                         'max_games': max(1, MAX_ACTIVE_GAMES // SHARD_WORKERS)},
+        snapshot_dir=SNAPSHOT_DIR,
+        watch_cards=card_watcher_options), db)
+    snapshot_store = None
+else:
+    game_manager = GameManager(db, idle_ttl=GAME_IDLE_TTL, max_games=MAX_ACTIVE_GAMES)
+    snapshot_store = SnapshotStore(game_manager, SNAPSHOT_DIR)
+card_watcher = CardWatcher(database=db, **card_watcher_options)
+SNAPSHOT_INTERVAL = float(os.getenv("SNAPSHOT_INTERVAL", "30"))
+REAP_INTERVAL = float(os.getenv("REAP_INTERVAL", "60"))
+outbound = OutboundScheduler(
+    max_attempts=int(os.getenv("DM_MAX_ATTEMPTS", "4")),
+    backoff=float(os.getenv("DM_RETRY_BACKOFF", "1")),
+    # Retrying can't get past blocked DMs or deleted users
+    permanent_errors=(discord.Forbidden, discord.NotFound))
+# Each player's hand DM, edited as the hand changes: (channel_id, player_id)
+live_hands = LiveMessages(max_size=int(os.getenv("LIVE_HAND_MESSAGES", "10000")))
+# Most DMs a broadcast sends at once
+FAN_OUT_LIMIT = int(os.getenv("FAN_OUT_LIMIT", "10"))
+# Seconds before a round auto-advances; 0 disables the timeout
+PLAY_TIMEOUT = float(os.getenv("PLAY_TIMEOUT", "180"))
+JUDGE_TIMEOUT = float(os.getenv("JUDGE_TIMEOUT", "180"))
+# What happens when the prompt drawer doesn't pick: 'pick' a random winner or 'skip' the round
+JUDGE_TIMEOUT_ACTION = os.getenv("JUDGE_TIMEOUT_ACTION", "pick")
+if JUDGE_TIMEOUT_ACTION not in ('pick', 'skip'):
+    raise ValueError(
+        f"JUDGE_TIMEOUT_ACTION must be 'pick' or 'skip', not {JUDGE_TIMEOUT_ACTION!r}")
+round_timers = TimerScheduler()
+# channel_id: (RoundState, phase) the channel's round timer was set for
+round_timer_phases = {}
+background_tasks = []
+background_sends = set()  # sends nobody waits for, kept so they aren't garbage collected
+
+
+async def game_call(game, method, *args):
+    """Run a Game method that changes the game, in its shard worker when games are sharded"""
+    if SHARD_WORKERS:
+        return await game_manager.run(game.channel_id, method, *args)
+    return getattr(game, method)(*args)
+
+
+async def manager_call(method, channel_id, *args):
+    """Run a GameManager method for a channel, in its shard worker when games are sharded"""
+    if SHARD_WORKERS:
+        return await game_manager.run(channel_id, method, *args)
+    return getattr(game_manager, method)(channel_id, *args)
+
+
+async def save_snapshots():
+    """Periodically write games that changed to their snapshot files"""
+    while not bot.is_closed():
+        await asyncio.sleep(SNAPSHOT_INTERVAL)
+        if SHARD_WORKERS:
+            await game_manager.save_snapshots()
+            continue
+        # Serialize on the event loop, where games are changed, and write off it
+        entries = snapshot_store.collect()
+        if entries:
+            failed = await asyncio.get_running_loop().run_in_executor(
+                None, snapshot_store.write, entries)
+            snapshot_store.requeue(failed)
+
+
+async def close_ended_game(channel_id, announcement):
+    """Clean up after a game GameManager ended by itself, and say why in its channel"""
+    round_timers.cancel(channel_id)
+    round_timer_phases.pop(channel_id, None)
+    live_hands.forget_group(channel_id)
+    channel = bot.get_channel(channel_id)
+    if channel:
+        outbound.reset_status(channel, 'played')
+        try:
+            await outbound.send_channel(channel, announcement)
+        except Exception as e:
+            logger.error(
+                f"Failed to announce game end in channel {channel_id}: {str(e)}"
+            )
+
+
+async def reap_idle_games():
+    """Periodically end games nobody has played for GAME_IDLE_TTL seconds"""
+    while not bot.is_closed():
+        await asyncio.sleep(REAP_INTERVAL)
+        reaped = (await game_manager.reap_idle() if SHARD_WORKERS
+                  else game_manager.reap_idle())
+        for channel_id in reaped:
+            await close_ended_game(
+                channel_id,
+                "This game was ended because nobody played for a while. Start a new one with `.cas s`!")
+
+
+def sync_round_timer(game):
+    """Start the timeout for a game's current phase, if it just changed
+
+    Called after every locked command, so the timer follows the round from
+    play to judging to finished without each command managing it.
+    """
+    channel_id = game.channel_id
+    if game_manager.get_game(channel_id) is not game:
+        round_timers.cancel(channel_id)
+        round_timer_phases.pop(channel_id, None)
+        return
+
+    phase = game.phase
+    last = round_timer_phases.get(channel_id)
+    if last and last[0] is game.round and last[1] == phase:
+        return
+    round_timer_phases[channel_id] = (game.round, phase)
+
+    timeout = {'play': PLAY_TIMEOUT, 'judge': JUDGE_TIMEOUT}.get(phase)
+    if timeout:
+        round_timers.schedule(channel_id, timeout, on_round_timeout,
+                              channel_id, game.round, phase)
+    else:
+        round_timers.cancel(channel_id)
+
+
+async def on_round_timeout(channel_id, round_state, phase):
+    """Auto-advance a round whose players or prompt drawer didn't act in time"""
+    game = game_manager.get_game(channel_id)
+    if game is None:
+        return
+    async with game.lock:
+        # A command may have ended the game or moved the round on while this waited for the lock
+        if game_manager.get_game(channel_id) is not game:
+            return
+        if game.round is not round_state or game.phase != phase:
+            return
+        channel = bot.get_channel(channel_id)
+
+        if phase == 'play':
+            auto_played = await game_call(game, 'auto_play')
+            names = [game.players[player_id].name for player_id in auto_played]
+            post_round_status(game)
+
+            # Their hand DMs still show the cards played for them
+            async def refresh_hand(player_id):
+                user = await user_cache.get(player_id)
+                await show_hand(game, player_id, user, send_new=False)
+
+            send_in_background(fan_out(auto_played, refresh_hand, FAN_OUT_LIMIT,
+                                       "refresh hand of player"), "refresh hands")
+            if channel and names:
+                await outbound.send_channel(
+                    channel, f"⏰ Time's up! Played a random card for {', '.join(names)}.")
+            if game.phase == 'judge':
+                await send_answers_to_drawer(
+                    game,
+                    "Waiting for the prompt drawer to read the answers and select a winner...")
+            elif channel:
+                await outbound.send_channel(channel, "⏰ Nobody answered in time, so this round was skipped.")
+        elif JUDGE_TIMEOUT_ACTION == 'pick':
+            played_cards = game.get_played_cards(include_players=True)
+            winner_id = await game_call(game, 'auto_select_winner')
+            if winner_id is not None and channel:
+                await outbound.send_channel(
+                    channel, "⏰ The prompt drawer didn't pick a winner in time, so a random answer wins!")
+                # Scores, the next prompt drawer's DM and topped-up hands, as for a picked winner
+                await announce_winner(game, winner_id, played_cards,
+                                      functools.partial(outbound.send_channel, channel))
+                sync_round_timer(game)
+                return
+            if winner_id is None:
+                # Every answer was withdrawn, so there is nothing to pick from
+                await game_call(game, 'skip_round')
+                if channel:
+                    await outbound.send_channel(
+                        channel, "⏰ There were no answers left to pick from, so this round was skipped.")
+            send_all_topped_up_cards(game)
+        else:
+            await game_call(game, 'skip_round')
+            if channel:
+                await outbound.send_channel(
+                    channel, "⏰ The prompt drawer didn't pick a winner in time, so this round was skipped.")
+            send_all_topped_up_cards(game)
+
+        if game.phase is None and game.current_prompt_drawer is not None:
+            try:
+                user = await user_cache.get(game.current_prompt_drawer)
+                await notify_prompt_drawer(user, channel_id, channel.name if channel else None)
+            except Exception as e:
+                logger.error(
+                    f"Failed to notify next prompt drawer {game.current_prompt_drawer}: {str(e)}")
+        sync_round_timer(game)
+
+
+def find_dm_game(ctx):
+    """(channel_id, game) for a command in a DM: the pressed button's game, else the author's latest"""
+    channel_id = getattr(ctx, 'game_channel_id', None)
+    if channel_id is None:
+        return game_manager.find_player_game(ctx.author.id)
+    return channel_id, game_manager.get_game(channel_id)
+
+
+def find_ctx_game(ctx):
+    """The game a command applies to: the channel's game, or in a DM the button's or the author's"""
+    if isinstance(ctx.channel, discord.DMChannel):
+        return find_dm_game(ctx)[1]
+    return game_manager.get_game(ctx.channel.id)
+
+
+def find_player_ctx_game(ctx):
+    """The game a command about the author applies to, wherever it was typed"""
+    return find_dm_game(ctx)[1]
+
+
+def with_game_lock(handler=None, *, find_game=find_ctx_game):
+    """Run a command handler holding its game's lock
+
+    Commands and button presses for the same game then run one at a time,
+    so a transition such as all-played or winner-selected is handled once,
+    while different games still run concurrently. find_game(ctx) must find
+    the same game the handler changes. Handlers that hold the lock must
+    not await another locked handler for the same game.
+    """
+    if handler is None:
+        return functools.partial(with_game_lock, find_game=find_game)
+
+    @functools.wraps(handler)
+    async def wrapper(ctx, *args, **kwargs):
+        while True:
+            game = find_game(ctx)
+            if game is None:
+                return await handler(ctx, *args, **kwargs)
+            async with game.lock:
+                # The game may have ended while this waited, so the command
+                # now applies to another one
+                if find_game(ctx) is not game:
+                    continue
+                try:
+                    return await handler(ctx, *args, **kwargs)
+                finally:
+                    sync_round_timer(game)
+
+    return wrapper
+
+
+def send_in_background(send, description):
+    """Run a send without waiting for it, logging it if it fails
+
+    Handlers and round timers hold their game's lock, and a DM being
+    retried with backoff must not hold up the game's other commands.
+    """
+    task = asyncio.ensure_future(send)
+    background_sends.add(task)
+    task.add_done_callback(functools.partial(sent_in_background, description))
+
+
+def sent_in_background(description, task):
+    background_sends.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Failed to {description}: {str(task.exception())}")
+
+
+# Button actions: action name: (handler, whether the button's game must still be active)
+BUTTON_ACTIONS = {}
+
+
+def button_action(name, needs_game=True):
+    """Register handler(interaction, channel_id, index) for GameButton presses of an action"""
+
+    def register(handler):
+        BUTTON_ACTIONS[name] = (handler, needs_game)
+        return handler
+
+    return register
+
+
+class GameButton(discord.ui.DynamicItem[Button],
+                 template=r'cas:(?P<action>[a-z_]+):(?P<channel_id>\d+):(?P<index>\d+)'):
+    """A button whose action, game channel and index live in its custom_id
+
+    One registered class handles presses on every message, including ones
+    sent before a restart, so no view or callback is kept per message.
+    """
+
+    def __init__(self, action, channel_id, index=0, *, label=None,
+                 style=ButtonStyle.gray, emoji=None, item=None):
+        super().__init__(item or Button(style=style, label=label, emoji=emoji,
+                                        custom_id=f"cas:{action}:{channel_id}:{index}"))
+        self.action = action
+        self.channel_id = channel_id
+        self.index = index
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        # Wrap the pressed button rather than building another
+        return cls(match['action'], int(match['channel_id']), int(match['index']),
+                   item=item)
+
+    async def callback(self, interaction):
+        handler, needs_game = BUTTON_ACTIONS.get(self.action, (None, False))
+        if handler is None:
+            await interaction.response.send_message(
+                "This button no longer does anything.", ephemeral=True)
+            return
+        if needs_game and not game_manager.is_game_active(self.channel_id):
+            await interaction.response.send_message(
+                "This game has ended! Start a new one with `.cas s`", ephemeral=True)
+            return
+        try:
+            await handler(interaction, self.channel_id, self.index)
+        except Exception as e:
+            logger.error(f"Error in {self.action} button: {str(e)}")
+            reply = (interaction.followup.send if interaction.response.is_done()
+                     else interaction.response.send_message)
+            await reply("An error occurred. Please try the typed command instead.",
+                        ephemeral=True)
+
+
+bot.add_dynamic_items(GameButton)
+
+
+def button_view(*buttons):
+    """A view of GameButtons to send with a message
+
+    The view is stopped before it is sent, so discord.py doesn't keep it
+    for the message; presses are routed by the GameButton template.
+    """
+    view = View(timeout=None)
+    for button in buttons:
+        view.add_item(button)
+    view.stop()
+    return view
+
+
+async def interaction_context(interaction, channel_id=None):
+    """A command context for a button press, as if the presser sent the message
+
+    In a DM, commands run against the game in channel_id, the one the
+    button was sent for, rather than the presser's latest game.
+    """
+    ctx = await bot.get_context(interaction.message, cls=commands.Context)
+    ctx.author = interaction.user
+    ctx.game_channel_id = channel_id
+    return ctx
+
+
+class CustomAnswerModal(discord.ui.Modal, title="Your Custom Answer"):
+    answer = discord.ui.TextInput(label="Your answer",
+                                  placeholder="Type your funny answer here...",
+                                  style=discord.TextStyle.paragraph)
+
+    def __init__(self, channel_id):
+        super().__init__()
+        self.channel_id = channel_id
+
+    async def on_submit(self, interaction):
+        try:
+            ctx = await interaction_context(interaction, self.channel_id)
+            await play_custom_answer(ctx, answer=self.answer.value)
+            await interaction.response.send_message("Custom answer submitted!",
+                                                    ephemeral=True)
+        except Exception as e:
+            logger.error(f"Error in custom answer modal: {str(e)}")
+            await interaction.response.send_message(
+                "An error occurred. Please try typing `.cas c Your answer` instead.",
+                ephemeral=True)
+
+
+async def require_voice(interaction, action):
+    """Whether the presser is in a voice channel, telling them if not"""
+    if interaction.user.voice:
+        return True
+    await interaction.response.send_message(
+        f"You need to be in a voice channel to {action}!", ephemeral=True)
+    return False
+
+
+@button_action('join')
+async def join_button(interaction, channel_id, index):
+    if await require_voice(interaction, "join the game"):
+        await interaction.response.defer()
+        await join_game(await interaction_context(interaction, channel_id))
+
+
+@button_action('rules', needs_game=False)
+async def rules_button(interaction, channel_id, index):
+    await interaction.response.defer()
+    await show_rules(await interaction_context(interaction, channel_id))
+
+
+@button_action('draw_prompt')
+async def draw_prompt_button(interaction, channel_id, index):
+    await interaction.response.defer()
+    await draw_prompt(await interaction_context(interaction, channel_id))
+
+
+@button_action('draw_cards')
+async def draw_cards_button(interaction, channel_id, index):
+    await interaction.response.defer()
+    await draw_cards(await interaction_context(interaction, channel_id))
+
+
+@button_action('play')
+async def play_button(interaction, channel_id, index):
+    await interaction.response.defer()
+    await play_card(await interaction_context(interaction, channel_id), index)
+
+
+@button_action('custom')
+async def custom_answer_button(interaction, channel_id, index):
+    await interaction.response.send_modal(CustomAnswerModal(channel_id))
+
+
+@button_action('select_winner')
+async def select_winner_button(interaction, channel_id, index):
+    await interaction.response.defer()
+    # Index 0 lists the answers to pick from
+    await select_winner(await interaction_context(interaction, channel_id), index or None)
+
+
+@button_action('view_played')
+async def view_played_button(interaction, channel_id, index):
+    game = game_manager.get_game(channel_id)
+    if interaction.user.id != game.current_prompt_drawer:
+        await interaction.response.send_message(
+            "Only the current prompt drawer can view played cards!",
+            ephemeral=True)
+        return
+
+    played_cards = game.get_played_cards(include_players=True)
+    if not played_cards:
+        await interaction.response.send_message(
+            "No cards have been played yet!", ephemeral=True)
+        return
+
+    cards_text = "\n".join([
+        f"{i+1}. {card_info['card']} (played by {card_info['player_name']})"
+        for i, (_, card_info) in enumerate(played_cards.items())
+    ])
+
+    await interaction.response.send_message(
+        f"**Played Cards**:\n{cards_text}\n\nUse `.cas win <number>` to choose the winning card!"
+    )
+
+
+@bot.event
+async def setup_hook():
+    # bot.run only stops cleanly on Ctrl+C. A deploy sends SIGTERM, which
+    # has to close the bot the same way so the shutdown snapshot is saved
+    try:
+        asyncio.get_running_loop().add_signal_handler(
+            signal.SIGTERM, lambda: asyncio.ensure_future(bot.close()))
+    except NotImplementedError:  # Windows has no loop signal handlers
+        pass
 
 
 @bot.event
 async def on_ready():
     logger.info(f'{bot.user} has connected to Discord!')
+    card_watcher.start()
+    # on_ready fires again on reconnect, so only start these once
+    if not background_tasks:
+        background_tasks.append(asyncio.create_task(save_snapshots()))
+        background_tasks.append(asyncio.create_task(reap_idle_games()))
+        background_tasks.append(asyncio.create_task(round_timers.run()))
     try:
         # Sync commands in background to avoid blocking
         synced = await bot.tree.sync()
@@ -57,22 +538,26 @@ async def on_ready():
         "Use '.cas s' to start a new game or '.cas r' to see all commands")
 
     # Check for any active games with players who need prompt notification
+    drawers = {}  # player_id: channel_id
     for channel_id, game in game_manager.games.items():
-        for player_id, player in game.players.items():
-            if player.get('needs_prompt_notification'
-                          ) and player_id == game.current_prompt_drawer:
-                try:
-                    user = await bot.fetch_user(player_id)
-                    channel = bot.get_channel(channel_id)
-                    if user and channel:
-                        await notify_prompt_drawer(user, channel.name)
-                except Exception as e:
-                    logger.error(
-                        f"Failed to send prompt notification on startup: {str(e)}"
-                    )
+        # Restored rounds get a fresh timeout
+        sync_round_timer(game)
+        drawer = game.players.get(game.current_prompt_drawer)
+        if drawer and drawer.needs_prompt_notification:
+            drawers[drawer.id] = channel_id
+
+    async def notify_drawer(player_id):
+        user = await user_cache.get(player_id)
+        channel = bot.get_channel(drawers[player_id])
+        if user and channel:
+            await notify_prompt_drawer(user, drawers[player_id], channel.name)
+
+    await fan_out(drawers, notify_drawer, FAN_OUT_LIMIT,
+                  "send prompt notification on startup to")
 
 
 @bot.command(name='config', help='Configure game settings')
+@with_game_lock
 async def configure_game(ctx, setting: str, value: str):
     """Configure game settings like NSFW content"""
     if setting.lower() != "nsfw":
@@ -93,27 +578,23 @@ async def configure_game(ctx, setting: str, value: str):
 
     # Update NSFW setting
     allow_nsfw = (value == 'on')
-    if game.update_nsfw_setting(allow_nsfw):
+    if await game_call(game, 'update_nsfw_setting', allow_nsfw):
         status = "enabled" if allow_nsfw else "disabled"
         await ctx.send(f"NSFW content {status} for the current game")
 
         # Notify players about their updated cards
-        for player_id in game.players:
-            try:
-                user = await bot.fetch_user(player_id)
-                cards = game.players[player_id]['cards']
-                cards_text = "\n".join(
-                    [f"{i+1}. {card}" for i, card in enumerate(cards)])
-                await user.send(
-                    f"Your cards have been updated due to NSFW setting change:\n{cards_text}"
-                )
-            except Exception as e:
-                logger.error(
-                    f"Failed to send updated cards to player {player_id}: {str(e)}"
-                )
+        async def send_updated_cards(player_id):
+            user = await user_cache.get(player_id)
+            await show_hand(game, player_id, user, "🃏 Cards Updated",
+                            "Your cards have been updated due to NSFW setting change:")
+
+        send_in_background(fan_out(list(game.players), send_updated_cards, FAN_OUT_LIMIT,
+                                   "send updated cards to player"), "send updated cards")
+        # Filtered answers were withdrawn, which reopens the round to them
+        post_round_status(game)
 
         # If a black card was filtered, notify channel
-        if game.current_black_card is None and game.round_in_progress:
+        if game.round.black_card is None and game.round.in_progress:
             await ctx.send(
                 "The current black card has been filtered. Please draw a new black card with `.cas p`"
             )
@@ -139,7 +620,12 @@ async def start_game(ctx, *args):
 
     # Initialize database for the game
     game_manager.database = db
-    game_manager.create_game(ctx.channel.id, allow_nsfw)
+    evicted = await manager_call('create_game', ctx.channel.id, allow_nsfw)
+    for channel_id in evicted:
+        await close_ended_game(
+            channel_id,
+            "This game was ended to make room for new ones, as it was the least recently played. "
+            "Start a new one with `.cas s`!")
     nsfw_status = "NSFW content enabled" if allow_nsfw else "NSFW content disabled"
 
     # Create a fancy embed for game start
@@ -154,51 +640,27 @@ async def start_game(ctx, *args):
     embed.set_footer(text="Join a voice channel to play!")
 
     # Create buttons for common actions
-    view = View(timeout=None)
-    join_button = Button(style=ButtonStyle.green,
-                         label="Join Game",
-                         emoji="👋",
-                         custom_id="join_game")
-    rules_button = Button(style=ButtonStyle.blurple,
-                          label="Show Rules",
-                          emoji="📜",
-                          custom_id="show_rules")
-
-    async def join_callback(interaction):
-        if not interaction.user.voice:
-            await interaction.response.send_message(
-                "You need to be in a voice channel to join!", ephemeral=True)
-            return
-
-        # Create proper context and join game
-        ctx = await bot.get_context(interaction.message, cls=commands.Context)
-        ctx.author = interaction.user  # Set correct author for voice channel check
-        await join_game(ctx)
-
-    async def rules_callback(interaction):
-        await show_rules(await bot.get_context(interaction.message,
-                                               cls=commands.Context))
-
-    join_button.callback = join_callback
-    rules_button.callback = rules_callback
-
-    view.add_item(join_button)
-    view.add_item(rules_button)
+    view = button_view(
+        GameButton('join', ctx.channel.id, label="Join Game", emoji="👋",
+                   style=ButtonStyle.green),
+        GameButton('rules', ctx.channel.id, label="Show Rules", emoji="📜",
+                   style=ButtonStyle.blurple))
 
     await ctx.send(embed=embed, view=view)
     db.log_game_start(ctx.channel.id, ctx.author.id)
 
     # Add the creator as first player
-    game_manager.add_player(ctx.channel.id, ctx.author.id,
-                            ctx.author.display_name)
+    await manager_call('add_player', ctx.channel.id, ctx.author.id,
+                       ctx.author.display_name)
 
     # Notify the first prompt drawer (which is the first player) that it's their turn
     game = game_manager.get_game(ctx.channel.id)
     if game and game.current_prompt_drawer == ctx.author.id:
-        await notify_prompt_drawer(ctx.author, ctx.channel.name)
+        await notify_prompt_drawer(ctx.author, ctx.channel.id, ctx.channel.name)
 
 
 @bot.command(name='j', help='Join the current game')
+@with_game_lock
 async def join_game(ctx):
     """Join the current game"""
     if not ctx.author.voice:
@@ -209,8 +671,8 @@ async def join_game(ctx):
         await ctx.send("No game is currently active. Start one with `.cas s`")
         return
 
-    success = game_manager.add_player(ctx.channel.id, ctx.author.id,
-                                      ctx.author.display_name)
+    success = await manager_call('add_player', ctx.channel.id, ctx.author.id,
+                                 ctx.author.display_name)
     if success:
         # Channel notification
         embed = Embed(
@@ -233,78 +695,38 @@ async def join_game(ctx):
               "Click the button below to draw your cards and begin playing!")),
             color=Color.blue())
 
-        dm_view = View(timeout=None)
-
         if is_prompt_drawer:
             # If this player is the prompt drawer, show a button to draw a black card
-            draw_prompt_button = Button(style=ButtonStyle.green,
-                                        label="Draw Black Card",
-                                        emoji="🎲",
-                                        custom_id="draw_black_card")
-
-            async def draw_prompt_callback(interaction):
-                try:
-                    ctx = await bot.get_context(interaction.message,
-                                                cls=commands.Context)
-                    ctx.author = interaction.user
-                    await draw_prompt(ctx)
-                except Exception as e:
-                    logger.error(f"Error in draw prompt button: {str(e)}")
-                    await interaction.response.send_message(
-                        "An error occurred. Please try typing `.cas p` instead.",
-                        ephemeral=True)
-
-            draw_prompt_button.callback = draw_prompt_callback
-            dm_view.add_item(draw_prompt_button)
+            dm_view = button_view(
+                GameButton('draw_prompt', ctx.channel.id, label="Draw Black Card",
+                           emoji="🎲", style=ButtonStyle.green))
 
             # Also send a separate notification
-            await notify_prompt_drawer(ctx.author, ctx.channel.name)
+            await notify_prompt_drawer(ctx.author, ctx.channel.id, ctx.channel.name)
         else:
             # Regular player gets the draw cards button
-            draw_button = Button(style=ButtonStyle.green,
-                                 label="Draw Cards",
-                                 emoji="🃏",
-                                 custom_id="draw_cards")
+            dm_view = button_view(
+                GameButton('draw_cards', ctx.channel.id, label="Draw Cards",
+                           emoji="🃏", style=ButtonStyle.green))
 
-            async def draw_callback(interaction):
-                try:
-                    # Create a proper context with the right user and channel info
-                    ctx = await bot.get_context(interaction.message,
-                                                cls=commands.Context)
-                    ctx.author = interaction.user  # Set correct author for user check
-
-                    # Call the draw_cards function with the properly set context
-                    await draw_cards(ctx)
-                except Exception as e:
-                    logger.error(f"Error in draw cards button: {str(e)}")
-                    await interaction.response.send_message(
-                        "An error occurred. Please try typing `.cas d` instead.",
-                        ephemeral=True)
-
-            draw_button.callback = draw_callback
-            dm_view.add_item(draw_button)
-
-        await ctx.author.send(embed=dm_embed, view=dm_view)
+        send_in_background(outbound.send_dm(ctx.author, embed=dm_embed, view=dm_view),
+                           "send welcome DM")
         db.log_player_join(ctx.channel.id, ctx.author.id)
     else:
         await ctx.send("You're already in the game!")
 
 
 @bot.command(name='d', help='Draw white cards')
+@with_game_lock
 async def draw_cards(ctx):
     """Draw your hand of white cards"""
     # Find the relevant game if command was sent in DM
     game = None
     if isinstance(ctx.channel, discord.DMChannel):
-        # Check all games to find one where the player is registered
-        player_found = False
-        for channel_id, g in game_manager.games.items():
-            if ctx.author.id in g.players:
-                game = g
-                player_found = True
-                break
-
-        if not player_found:
+        # Look up the game the player is registered in
+        _, game = find_dm_game(ctx)
+
+        if not game:
             await ctx.send(
                 "You're not currently in any active game! Join a game first with `.cas j` in a server channel."
             )
@@ -330,100 +752,136 @@ async def draw_cards(ctx):
 
     # At this point we have verified the game exists and player is part of it
     try:
-        cards = game.draw_cards(ctx.author.id)
-        if not cards:
+        if not await game_call(game, 'draw_cards', ctx.author.id):
             await ctx.send("You already have a full hand of cards!")
             return
+    except Exception as e:
+        logger.error(f"Error drawing cards: {str(e)}")
+        await ctx.send(f"An error occurred while drawing cards: {str(e)}")
+        return
 
-        # Create a fancy card display
-        embed = Embed(
-            title="🃏 Your Cards",
-            description=
-            "Here are your white cards. Play one with the buttons below when it's your turn.",
-            color=Color.gold())
+    async def reply_with_hand():
+        try:
+            shown = await show_hand(game, ctx.author.id, ctx.author)
+            in_dm = isinstance(ctx.channel, discord.DMChannel)
+            if shown == UNCHANGED or (shown == EDITED and in_dm):
+                # The hand DM may be far up the conversation, so point to it
+                message = live_hands.message((game.channel_id, ctx.author.id))
+                await ctx.send(f"Your hand hasn't changed: {message.jump_url}" if shown == UNCHANGED
+                               else f"Your hand has been updated: {message.jump_url}")
+                return
+
+            # If in a server channel, also send confirmation there
+            if not in_dm:
+                confirm_embed = Embed(
+                    title="Cards Drawn",
+                    description=
+                    f"Cards have been sent to {ctx.author.display_name} via DM!",
+                    color=Color.green())
+                await ctx.send(embed=confirm_embed)
+        except Exception as e:
+            logger.error(f"Error drawing cards: {str(e)}")
+            await ctx.send(f"An error occurred while drawing cards: {str(e)}")
 
+    # The hand DM can be retried with backoff, so it is sent after the game's lock is released
+    send_in_background(reply_with_hand(), "show hand")
+
+
+async def send_answers_to_drawer(game, channel_message=None):
+    """DM the prompt drawer every answer for the round, with a button to pick the winner
+
+    Sent once per round, when Game reports that everyone has played.
+    """
+    prompt_drawer = await user_cache.get(game.current_prompt_drawer)
+    played_cards = game.get_played_cards(
+        include_players=True)  # Get cards with player names
+
+    # Create an embed for the results
+    embed = Embed(
+        title="🎮 All Cards Played!",
+        description=
+        f"All players have submitted their answers to: **{game.round.black_card.text}**",
+        color=Color.blue())
+
+    # Add each card as a field
+    for i, (player_id, card_info) in enumerate(played_cards.items()):
+        prefix = "✏️ " if player_id in game.round.custom_answers else ""
+        embed.add_field(name=f"Card {i+1}",
+                        value=f"{prefix}{card_info['card']}",
+                        inline=False)
+
+    embed.add_field(
+        name="Instructions",
+        value=
+        "Read these answers aloud in voice chat, then select the winner using the button below.",
+        inline=False)
+
+    # Create a view with select winner button
+    view = button_view(
+        GameButton('select_winner', game.channel_id, label="Select Winner",
+                   emoji="🏆", style=ButtonStyle.green))
+
+    send_in_background(outbound.send_dm(prompt_drawer, embed=embed, view=view),
+                       "send answers to prompt drawer")
+
+    # Send update to game channel
+    if channel_message:
+        channel = bot.get_channel(game.channel_id)
+        if channel:
+            await outbound.send_channel(channel, channel_message)
+
+
+def hand_view(channel_id, hand_size):
+    """Buttons to play each card in a hand, or write a custom answer"""
+    return button_view(
+        *(GameButton('play', channel_id, i + 1, label=f"Play #{i+1}")
+          for i in range(hand_size)),
+        GameButton('custom', channel_id, label="Custom Answer",
+                   style=ButtonStyle.blurple))
+
+
+async def show_hand(game, player_id, user, title="🃏 Your Cards",
+                    description="Here are your white cards. Play one with the buttons below when it's your turn.",
+                    send_new=True):
+    """Show a player's hand in their live hand DM, edited in place
+
+    The embed is only rebuilt when the hand changed since it was last
+    shown. With send_new False, a player without a live hand DM gets none.
+    Returns what live_hands.show did.
+    """
+
+    def render():
+        cards = game.get_hand(player_id)
+        embed = Embed(title=title, description=description, color=Color.gold())
         # Add each card as a field for better readability
         for i, card in enumerate(cards):
             embed.add_field(name=f"Card {i+1}", value=card, inline=False)
+        return {'embed': embed, 'view': hand_view(game.channel_id, len(cards))}
 
-        # Create buttons for playing cards
-        view = View(timeout=None)
-
-        # Add buttons to play each card (up to 5 per row)
-        for i in range(len(cards)):
-            card_button = Button(style=ButtonStyle.gray,
-                                 label=f"Play #{i+1}",
-                                 custom_id=f"play_card_{i+1}")
-
-            # This is a factory function to capture the card index correctly
-            def create_callback(index):
-
-                async def play_card_callback(interaction):
-                    try:
-                        ctx = await bot.get_context(interaction.message,
-                                                    cls=commands.Context)
-                        ctx.author = interaction.user  # Ensure author is set correctly
-                        await play_card(ctx, index)
-                    except Exception as e:
-                        logger.error(f"Error in play card button: {str(e)}")
-                        await interaction.response.send_message(
-                            "An error occurred. Please try typing `.cas play {index}` instead.",
-                            ephemeral=True)
-
-                return play_card_callback
-
-            card_button.callback = create_callback(i + 1)
-            view.add_item(card_button)
-
-        # Add a custom answer button
-        custom_button = Button(style=ButtonStyle.blurple,
-                               label="Custom Answer",
-                               custom_id="custom_answer")
-
-        async def custom_callback(interaction):
-            custom_modal = discord.ui.Modal(title="Your Custom Answer")
-            custom_text = discord.ui.TextInput(
-                label="Your answer",
-                placeholder="Type your funny answer here...",
-                style=discord.TextStyle.paragraph)
-            custom_modal.add_item(custom_text)
-
-            async def modal_callback(interaction):
-                try:
-                    ctx = await bot.get_context(interaction.message,
-                                                cls=commands.Context)
-                    ctx.author = interaction.user  # Ensure author is set correctly
-                    await play_custom_answer(ctx, answer=custom_text.value)
-                    await interaction.response.send_message(
-                        "Custom answer submitted!", ephemeral=True)
-                except Exception as e:
-                    logger.error(f"Error in custom answer modal: {str(e)}")
-                    await interaction.response.send_message(
-                        "An error occurred. Please try typing `.cas c Your answer` instead.",
-                        ephemeral=True)
+    return await live_hands.show(
+        (game.channel_id, player_id), game.players[player_id].hand_version,
+        (lambda: outbound.send_dm(user, **render())) if send_new else None,
+        lambda message: outbound.edit_dm(user, message, **render()))
 
-            custom_modal.on_submit = modal_callback
-            await interaction.response.send_modal(custom_modal)
 
-        custom_button.callback = custom_callback
-        view.add_item(custom_button)
+async def send_topped_up_cards(game, player_id):
+    """DM a player their hand after it was topped up, with buttons to play it"""
+    user = await user_cache.get(player_id)
+    await show_hand(game, player_id, user, "🃏 Cards Updated",
+                    "Your cards have been topped up:")
 
-        await ctx.author.send(embed=embed, view=view)
 
-        # If in a server channel, also send confirmation there
-        if not isinstance(ctx.channel, discord.DMChannel):
-            confirm_embed = Embed(
-                title="Cards Drawn",
-                description=
-                f"Cards have been sent to {ctx.author.display_name} via DM!",
-                color=Color.green())
-            await ctx.send(embed=confirm_embed)
-    except Exception as e:
-        logger.error(f"Error drawing cards: {str(e)}")
-        await ctx.send(f"An error occurred while drawing cards: {str(e)}")
+def send_all_topped_up_cards(game):
+    """DM everyone but the next prompt drawer their hand after a round ends, in the background"""
+    send_in_background(fan_out(
+        [player_id for player_id in game.players
+         if player_id != game.current_prompt_drawer],
+        functools.partial(send_topped_up_cards, game), FAN_OUT_LIMIT,
+        "send updated cards to player"), "send updated cards")
 
 
 @bot.command(name='play', help='Play a card from your hand')
+@with_game_lock
 async def play_card(ctx, card_number: int):
     try:
         if isinstance(card_number, str):
@@ -432,10 +890,7 @@ async def play_card(ctx, card_number: int):
         # Find the relevant game
         game = None
         if isinstance(ctx.channel, discord.DMChannel):
-            for channel_id, g in game_manager.games.items():
-                if ctx.author.id in g.players:
-                    game = g
-                    break
+            _, game = find_dm_game(ctx)
         else:
             game = game_manager.get_game(ctx.channel.id)
 
@@ -443,71 +898,22 @@ async def play_card(ctx, card_number: int):
             await ctx.send("No active game found!")
             return
 
-        result = game.play_card(ctx.author.id, card_number - 1)
+        result = await game_call(game, 'play_card', ctx.author.id, card_number - 1)
+        if result:
+            # Take the played card out of their hand DM
+            send_in_background(show_hand(game, ctx.author.id, ctx.author, send_new=False),
+                               "refresh hand")
         if result == "all_played":
-            await send_game_message(
-                ctx,
-                f"{ctx.author.display_name} has played their card!",
-                game_update=True)
-
-            # Get prompt drawer and send them a DM with played cards
-            prompt_drawer = await bot.fetch_user(game.current_prompt_drawer)
-            played_cards = game.get_played_cards(
-                include_players=True)  # Get cards with player names
-
-            # Create an embed for the results
-            embed = Embed(
-                title="🎮 All Cards Played!",
-                description=
-                f"All players have submitted their answers to: **{game.current_black_card['text']}**",
-                color=Color.blue())
+            await send_play_status(ctx, game, "You've played your card!")
 
-            # Add each card as a field
-            for i, (player_id, card_info) in enumerate(played_cards.items()):
-                prefix = "✏️ " if player_id in game.custom_answers else ""
-                embed.add_field(name=f"Card {i+1}",
-                                value=f"{prefix}{card_info['card']}",
-                                inline=False)
-
-            embed.add_field(
-                name="Instructions",
-                value=
-                "Read these answers aloud in voice chat, then select the winner using the button below.",
-                inline=False)
-
-            # Create a view with select winner button
-            view = View(timeout=None)
-            select_button = Button(style=ButtonStyle.green,
-                                   label="Select Winner",
-                                   emoji="🏆",
-                                   custom_id="select_winner")
-
-            async def select_winner_callback(interaction):
-                ctx = await bot.get_context(interaction.message,
-                                            cls=commands.Context)
-                ctx.author = interaction.user
-                await select_winner(ctx)
-
-            select_button.callback = select_winner_callback
-            view.add_item(select_button)
-
-            await prompt_drawer.send(embed=embed, view=view)
-
-            # Send update to game channel
-            if isinstance(ctx.channel, discord.DMChannel):
-                for channel_id in game_manager.games:
-                    if game == game_manager.get_game(channel_id):
-                        channel = bot.get_channel(channel_id)
-                        if channel:
-                            await channel.send(
-                                "All players have played their cards! Waiting for the prompt drawer to read the answers and select a winner..."
-                            )
+            # Only tell the game channel separately when playing from a DM
+            await send_answers_to_drawer(
+                game,
+                "All players have played their cards! Waiting for the prompt drawer to read the answers and select a winner..."
+                if isinstance(ctx.channel, discord.DMChannel) else None)
 
         elif result:
-            await send_game_message(
-                ctx,
-                f"{ctx.author.display_name} has played their card!",
-                game_update=True)
+            await send_play_status(ctx, game, "You've played your card!")
         else:
             await ctx.send("Invalid card number or it's not your turn!")
 
@@ -526,10 +932,7 @@ async def show_played_cards(ctx):
     # Find the relevant game if command was sent in DM
     game = None
     if isinstance(ctx.channel, discord.DMChannel):
-        for channel_id, g in game_manager.games.items():
-            if ctx.author.id in g.players:
-                game = g
-                break
+        _, game = find_dm_game(ctx)
     else:
         # Voice check only if in a server channel
         if not ctx.author.voice:
@@ -562,6 +965,7 @@ async def show_played_cards(ctx):
 
 
 @bot.command(name='win', help='Select winning card')
+@with_game_lock
 async def select_winner(ctx, card_number: int = None):
     """Select the winning card for the round"""
     try:
@@ -572,11 +976,7 @@ async def select_winner(ctx, card_number: int = None):
         game = None
         channel_id = None
         if isinstance(ctx.channel, discord.DMChannel):
-            for c_id, g in game_manager.games.items():
-                if ctx.author.id in g.players:
-                    game = g
-                    channel_id = c_id
-                    break
+            channel_id, game = find_dm_game(ctx)
         else:
             # Voice check only if in a server channel
             if not ctx.author.voice:
@@ -607,38 +1007,21 @@ async def select_winner(ctx, card_number: int = None):
             embed = Embed(
                 title="🎮 Select Winner",
                 description=
-                f"Select the best answer to: **{game.current_black_card['text']}**",
+                f"Select the best answer to: **{game.round.black_card.text}**",
                 color=Color.blue())
 
             # Show all cards
             for i, (_, card_info) in enumerate(played_cards_list):
-                prefix = "✏️ " if _ in game.custom_answers else ""
+                prefix = "✏️ " if _ in game.round.custom_answers else ""
                 embed.add_field(name=f"Card {i+1}",
                                 value=f"{prefix}{card_info['card']}",
                                 inline=False)
 
-            # Create selection buttons
-            view = View(timeout=None)
-
-            # Add buttons for each card (up to 5 per row)
-            for i in range(len(played_cards_list)):
-                select_button = Button(style=ButtonStyle.green,
-                                       label=f"Select #{i+1}",
-                                       custom_id=f"select_winner_{i+1}")
-
-                # Factory to capture card number correctly
-                def create_callback(num):
-
-                    async def select_callback(interaction):
-                        ctx = await bot.get_context(interaction.message,
-                                                    cls=commands.Context)
-                        ctx.author = interaction.user
-                        await select_winner(ctx, num)
-
-                    return select_callback
-
-                select_button.callback = create_callback(i + 1)
-                view.add_item(select_button)
+            # Create selection buttons, one for each card
+            view = button_view(
+                *(GameButton('select_winner', game.channel_id, i + 1,
+                             label=f"Select #{i+1}", style=ButtonStyle.green)
+                  for i in range(len(played_cards_list))))
 
             await ctx.send(embed=embed, view=view)
             return
@@ -653,187 +1036,11 @@ async def select_winner(ctx, card_number: int = None):
             return
 
         winning_player_id = played_cards_list[card_number - 1][0]
-        winning_card = played_cards_list[card_number - 1][1]
-
-        if game.select_winner(winning_player_id):
-            # Create winner announcement embed
-            winner_embed = Embed(
-                title="🎉 Round Winner!",
-                description=
-                f"**{winning_card['player_name']}** wins this round!",
-                color=Color.gold())
-
-            # Add the black card and winning answer
-            winner_embed.add_field(name="Black Card",
-                                   value=game.current_black_card['text'],
-                                   inline=False)
-
-            # Check if it was a custom answer
-            prefix = "✏️ " if winning_player_id in game.custom_answers else ""
-            winner_embed.add_field(name="Winning Answer",
-                                   value=f"{prefix}{winning_card['card']}",
-                                   inline=False)
-
-            # First announce the winner
-            await ctx.send(embed=winner_embed)
-
-            # Also announce to the game channel if command was in DM
-            if isinstance(ctx.channel, discord.DMChannel) and channel_id:
-                try:
-                    game_channel = bot.get_channel(channel_id)
-                    if game_channel:
-                        await game_channel.send(embed=winner_embed)
-                except Exception as e:
-                    logger.error(
-                        f"Failed to send winner announcement to game channel: {str(e)}"
-                    )
-
-            # Create an embed for all played cards
-            cards_embed = Embed(
-                title="📝 All Played Cards",
-                description=
-                "Here are all the cards that were played this round:",
-                color=Color.blue())
-
-            # Add each card as a field
-            for player_id, info in played_cards.items():
-                prefix = "✏️ " if player_id in game.custom_answers else ""
-                cards_embed.add_field(name=info['player_name'],
-                                      value=f"{prefix}{info['card']}",
-                                      inline=False)
-
-            await ctx.send(embed=cards_embed)
-
-            # Create an embed for scores
-            scores = game.get_scores()
-            scores_embed = Embed(title="🏆 Current Scores",
-                                 description="Here are the current standings:",
-                                 color=Color.teal())
-
-            # Add each player's score
-            for player_id, info in scores.items():
-                scores_embed.add_field(name=info['name'],
-                                       value=f"{info['score']} points",
-                                       inline=True)
-
-            await ctx.send(embed=scores_embed)
-
-            # Announce next prompt drawer with a button
-            next_drawer = game.players[game.current_prompt_drawer]['name']
-            next_drawer_embed = Embed(
-                title="Next Round",
-                description=
-                f"👉 **{next_drawer}** will draw the next black card!",
-                color=Color.purple())
-
-            # Notify in the channel
-            await ctx.send(embed=next_drawer_embed)
-
-            # Send DM to next prompt drawer
-            try:
-                user = await bot.fetch_user(game.current_prompt_drawer)
-                prompt_embed = Embed(
-                    title="🎲 Your Turn!",
-                    description="It's your turn to draw the next black card!",
-                    color=Color.purple())
-
-                # Add button to draw card
-                prompt_view = View(timeout=None)
-                draw_button = Button(style=ButtonStyle.green,
-                                     label="Draw Black Card",
-                                     custom_id="draw_black_card")
-
-                async def draw_callback(interaction):
-                    ctx = await bot.get_context(interaction.message,
-                                                cls=commands.Context)
-                    ctx.author = interaction.user
-                    await draw_prompt(ctx)
-
-                draw_button.callback = draw_callback
-                prompt_view.add_item(draw_button)
-
-                await user.send(embed=prompt_embed, view=prompt_view)
-            except Exception as e:
-                logger.error(
-                    f"Failed to notify next prompt drawer {game.current_prompt_drawer}: {str(e)}"
-                )
 
-            # Notify players about their topped-up cards via DM
-            for player_id in game.players:
-                if player_id != game.current_prompt_drawer:
-                    try:
-                        user = await bot.fetch_user(player_id)
-                        cards = game.players[player_id]['cards']
-
-                        cards_embed = Embed(
-                            title="🃏 Cards Updated",
-                            description="Your cards have been topped up:",
-                            color=Color.gold())
-
-                        # Add each card as a field
-                        for i, card in enumerate(cards):
-                            cards_embed.add_field(name=f"Card {i+1}",
-                                                  value=card,
-                                                  inline=False)
-
-                        # Create buttons for playing cards
-                        cards_view = View(timeout=None)
-
-                        # Add buttons to play each card (up to 5 per row)
-                        for i in range(len(cards)):
-                            card_button = Button(style=ButtonStyle.gray,
-                                                 label=f"Play #{i+1}",
-                                                 custom_id=f"play_card_{i+1}")
-
-                            # This is a factory function to capture the card index correctly
-                            def create_callback(index):
-
-                                async def play_card_callback(interaction):
-                                    ctx = await bot.get_context(
-                                        interaction.message,
-                                        cls=commands.Context)
-                                    ctx.author = interaction.user
-                                    await play_card(ctx, index)
-
-                                return play_card_callback
-
-                            card_button.callback = create_callback(i + 1)
-                            cards_view.add_item(card_button)
-
-                        # Add a custom answer button
-                        custom_button = Button(style=ButtonStyle.blurple,
-                                               label="Custom Answer",
-                                               custom_id="custom_answer")
-
-                        async def custom_callback(interaction):
-                            custom_modal = discord.ui.Modal(
-                                title="Your Custom Answer")
-                            custom_text = discord.ui.TextInput(
-                                label="Your answer",
-                                placeholder="Type your funny answer here...",
-                                style=discord.TextStyle.paragraph)
-                            custom_modal.add_item(custom_text)
-
-                            async def modal_callback(interaction):
-                                ctx = await bot.get_context(
-                                    interaction.message, cls=commands.Context)
-                                ctx.author = interaction.user
-                                await play_custom_answer(
-                                    ctx, answer=custom_text.value)
-                                await interaction.response.send_message(
-                                    "Custom answer submitted!", ephemeral=True)
-
-                            custom_modal.on_submit = modal_callback
-                            await interaction.response.send_modal(custom_modal)
-
-                        custom_button.callback = custom_callback
-                        cards_view.add_item(custom_button)
-
-                        await user.send(embed=cards_embed, view=cards_view)
-                    except Exception as e:
-                        logger.error(
-                            f"Failed to send updated cards to player {player_id}: {str(e)}"
-                        )
+        if await game_call(game, 'select_winner', winning_player_id):
+            await announce_winner(
+                game, winning_player_id, played_cards, ctx.send,
+                channel_id if isinstance(ctx.channel, discord.DMChannel) else None)
         else:
             logger.error(f"Failed to select winner for card {card_number}")
             await ctx.send("Error selecting winner!")
@@ -847,7 +1054,112 @@ async def select_winner(ctx, card_number: int = None):
             "An error occurred while selecting the winner. Please try again.")
 
 
-async def notify_prompt_drawer(user, channel_name=None):
+async def announce_winner(game, winning_player_id, played_cards, send, channel_id=None):
+    """Announce a round's winner, every answer and the scores, and DM the next round's players
+
+    send posts where the winner was picked. With channel_id, the winner is
+    announced in that game channel as well.
+    """
+    winning_card = played_cards[winning_player_id]
+
+    # Create winner announcement embed
+    winner_embed = Embed(
+        title="🎉 Round Winner!",
+        description=
+        f"**{winning_card['player_name']}** wins this round!",
+        color=Color.gold())
+
+    # Add the black card and winning answer
+    winner_embed.add_field(name="Black Card",
+                           value=game.round.black_card.text,
+                           inline=False)
+
+    # Check if it was a custom answer
+    prefix = "✏️ " if winning_player_id in game.round.custom_answers else ""
+    winner_embed.add_field(name="Winning Answer",
+                           value=f"{prefix}{winning_card['card']}",
+                           inline=False)
+
+    # First announce the winner
+    await send(embed=winner_embed)
+
+    # Also announce to the game channel if picked somewhere else
+    if channel_id:
+        try:
+            game_channel = bot.get_channel(channel_id)
+            if game_channel:
+                await outbound.send_channel(game_channel, embed=winner_embed)
+        except Exception as e:
+            logger.error(
+                f"Failed to send winner announcement to game channel: {str(e)}"
+            )
+
+    # Create an embed for all played cards
+    cards_embed = Embed(
+        title="📝 All Played Cards",
+        description=
+        "Here are all the cards that were played this round:",
+        color=Color.blue())
+
+    # Add each card as a field
+    for player_id, info in played_cards.items():
+        prefix = "✏️ " if player_id in game.round.custom_answers else ""
+        cards_embed.add_field(name=info['player_name'],
+                              value=f"{prefix}{info['card']}",
+                              inline=False)
+
+    await send(embed=cards_embed)
+
+    # Create an embed for scores
+    scores = game.get_scores()
+    scores_embed = Embed(title="🏆 Current Scores",
+                         description="Here are the current standings:",
+                         color=Color.teal())
+
+    # Add each player's score, best first
+    for player_id, info in scores.items():
+        scores_embed.add_field(name=f"{rank_label(info)} {info['name']}",
+                               value=f"{info['score']} points{score_change(info)}",
+                               inline=True)
+
+    await send(embed=scores_embed)
+
+    # Announce next prompt drawer with a button
+    next_drawer = game.players[game.current_prompt_drawer].name
+    next_drawer_embed = Embed(
+        title="Next Round",
+        description=
+        f"👉 **{next_drawer}** will draw the next black card!",
+        color=Color.purple())
+
+    # Notify in the channel
+    await send(embed=next_drawer_embed)
+
+    # Send DM to next prompt drawer
+    try:
+        user = await user_cache.get(game.current_prompt_drawer)
+        prompt_embed = Embed(
+            title="🎲 Your Turn!",
+            description="It's your turn to draw the next black card!",
+            color=Color.purple())
+
+        # Add button to draw card
+        prompt_view = button_view(
+            GameButton('draw_prompt', game.channel_id, label="Draw Black Card",
+                       style=ButtonStyle.green))
+
+        send_in_background(outbound.send_dm(user, embed=prompt_embed, view=prompt_view),
+                           "notify next prompt drawer")
+    except Exception as e:
+        logger.error(
+            f"Failed to notify next prompt drawer {game.current_prompt_drawer}: {str(e)}"
+        )
+
+    # Notify players about their topped-up cards via DM
+    send_all_topped_up_cards(game)
+
+
+async def notify_prompt_drawer(user, channel_id, channel_name=None):
     """Send a reminder to the prompt drawer that it's their turn"""
     # Create an attractive embed
     embed = Embed(
@@ -864,70 +1176,19 @@ async def notify_prompt_drawer(user, channel_name=None):
                     value="Click the button below to draw a black card!",
                     inline=False)
 
-    # Create a view with a button to draw the black card
-    view = View(timeout=None)
-    draw_button = Button(style=ButtonStyle.green,
-                         label="Draw Black Card",
-                         emoji="🎲",
-                         custom_id="draw_black_card")
-
-    async def draw_callback(interaction):
-        ctx = await bot.get_context(interaction.message, cls=commands.Context)
-        ctx.author = interaction.user
-        await draw_prompt(ctx)
-
-    draw_button.callback = draw_callback
-    view.add_item(draw_button)
-
-    # Add a button to view played cards
-    view_cards_button = Button(style=ButtonStyle.blurple,
-                               label="View Played Cards",
-                               emoji="👀",
-                               custom_id="view_played_cards")
-
-    async def view_cards_callback(interaction):
-        # Find the relevant game
-        game = None
-        channel_id = None
-        for c_id, g in game_manager.games.items():
-            if interaction.user.id in g.players:
-                game = g
-                channel_id = c_id
-                break
-
-        if not game:
-            await interaction.response.send_message("No active game found!",
-                                                    ephemeral=True)
-            return
-
-        if interaction.user.id != game.current_prompt_drawer:
-            await interaction.response.send_message(
-                "Only the current prompt drawer can view played cards!",
-                ephemeral=True)
-            return
-
-        played_cards = game.get_played_cards(include_players=True)
-        if not played_cards:
-            await interaction.response.send_message(
-                "No cards have been played yet!", ephemeral=True)
-            return
-
-        cards_text = "\n".join([
-            f"{i+1}. {card_info['card']} (played by {card_info['player_name']})"
-            for i, (_, card_info) in enumerate(played_cards.items())
-        ])
+    # Buttons to draw the black card and to view played cards
+    view = button_view(
+        GameButton('draw_prompt', channel_id, label="Draw Black Card", emoji="🎲",
+                   style=ButtonStyle.green),
+        GameButton('view_played', channel_id, label="View Played Cards", emoji="👀",
+                   style=ButtonStyle.blurple))
 
-        await interaction.response.send_message(
-            f"**Played Cards**:\n{cards_text}\n\nUse `.cas win <number>` to choose the winning card!"
-        )
-
-    view_cards_button.callback = view_cards_callback
-    view.add_item(view_cards_button)
-
-    await user.send(embed=embed, view=view)
-    logger.info(f"Sent prompt drawer notification to {user.name}")
+    send_in_background(outbound.send_dm(user, embed=embed, view=view),
+                       f"send prompt drawer notification to {user.name}")
+    logger.info(f"Queued prompt drawer notification to {user.name}")
 
 
+@with_game_lock
 async def select_winner(ctx, card_number: int = None):
     """Select the winning card for the round"""
     try:
@@ -938,11 +1199,7 @@ async def select_winner(ctx, card_number: int = None):
         game = None
         channel_id = None
         if isinstance(ctx.channel, discord.DMChannel):
-            for c_id, g in game_manager.games.items():
-                if ctx.author.id in g.players:
-                    game = g
-                    channel_id = c_id
-                    break
+            channel_id, game = find_dm_game(ctx)
         else:
             # Voice check only if in a server channel
             if not ctx.author.voice:
@@ -973,38 +1230,21 @@ async def select_winner(ctx, card_number: int = None):
             embed = Embed(
                 title="🎮 Select Winner",
                 description=
-                f"Select the best answer to: **{game.current_black_card['text']}**",
+                f"Select the best answer to: **{game.round.black_card.text}**",
                 color=Color.blue())
 
             # Show all cards
             for i, (_, card_info) in enumerate(played_cards_list):
-                prefix = "✏️ " if _ in game.custom_answers else ""
+                prefix = "✏️ " if _ in game.round.custom_answers else ""
                 embed.add_field(name=f"Card {i+1}",
                                 value=f"{prefix}{card_info['card']}",
                                 inline=False)
 
-            # Create selection buttons
-            view = View(timeout=None)
-
-            # Add buttons for each card (up to 5 per row)
-            for i in range(len(played_cards_list)):
-                select_button = Button(style=ButtonStyle.green,
-                                       label=f"Select #{i+1}",
-                                       custom_id=f"select_winner_{i+1}")
-
-                # Factory to capture card number correctly
-                def create_callback(num):
-
-                    async def select_callback(interaction):
-                        ctx = await bot.get_context(interaction.message,
-                                                    cls=commands.Context)
-                        ctx.author = interaction.user  # Set the correct author before passing context
-                        await select_winner(ctx, num)
-
-                    return select_callback
-
-                select_button.callback = create_callback(i + 1)
-                view.add_item(select_button)
+            # Create selection buttons, one for each card
+            view = button_view(
+                *(GameButton('select_winner', game.channel_id, i + 1,
+                             label=f"Select #{i+1}", style=ButtonStyle.green)
+                  for i in range(len(played_cards_list))))
 
             await ctx.send(embed=embed, view=view)
             return
@@ -1019,185 +1259,11 @@ async def select_winner(ctx, card_number: int = None):
             return
 
         winning_player_id = played_cards_list[card_number - 1][0]
-        winning_card = played_cards_list[card_number - 1][1]
-
-        if game.select_winner(winning_player_id):
-            # Create winner announcement embed
-            winner_embed = Embed(
-                title="🎉 Round Winner!",
-                description=
-                f"**{winning_card['player_name']}** wins this round!",
-                color=Color.gold())
-
-            # Add the black card and winning answer
-            winner_embed.add_field(name="Black Card",
-                                   value=game.current_black_card['text'],
-                                   inline=False)
-
-            # Check if it was a custom answer
-            prefix = "✏️ " if winning_player_id in game.custom_answers else ""
-            winner_embed.add_field(name="Winning Answer",
-                                   value=f"{prefix}{winning_card['card']}",
-                                   inline=False)
-
-            # First announce the winner
-            await ctx.send(embed=winner_embed)
 
-            # Also announce to the game channel if command was in DM
-            if isinstance(ctx.channel, discord.DMChannel) and channel_id:
-                try:
-                    game_channel = bot.get_channel(channel_id)
-                    if game_channel:
-                        await game_channel.send(embed=winner_embed)
-                except Exception as e:
-                    logger.error(
-                        f"Failed to send winner announcement to game channel: {str(e)}"
-                    )
-
-            # Create an embed for all played cards
-            cards_embed = Embed(
-                title="📝 All Played Cards",
-                description=
-                "Here are all the cards that were played this round:",
-                color=Color.blue())
-
-            # Add each card as a field
-            for player_id, info in played_cards.items():
-                prefix = "✏️ " if player_id in game.custom_answers else ""
-                cards_embed.add_field(name=info['player_name'],
-                                      value=f"{prefix}{info['card']}",
-                                      inline=False)
-
-            await ctx.send(embed=cards_embed)
-
-            # Create an embed for scores
-            scores = game.get_scores()
-            scores_embed = Embed(title="🏆 Current Scores",
-                                 description="Here are the current standings:",
-                                 color=Color.teal())
-
-            # Add each player's score
-            for player_id, info in scores.items():
-                scores_embed.add_field(name=info['name'],
-                                       value=f"{info['score']} points",
-                                       inline=True)
-
-            await ctx.send(embed=scores_embed)
-
-            # Announce next prompt drawer with a button
-            next_drawer = game.players[game.current_prompt_drawer]['name']
-            next_drawer_embed = Embed(
-                title="Next Round",
-                description=
-                f"👉 **{next_drawer}** will draw the next black card!",
-                color=Color.purple())
-
-            # Notify in the channel
-            await ctx.send(embed=next_drawer_embed)
-
-            # Send DM to next prompt drawer
-            try:
-                user = await bot.fetch_user(game.current_prompt_drawer)
-                prompt_embed = Embed(
-                    title="🎲 Your Turn!",
-                    description="It's your turn to draw the next black card!",
-                    color=Color.purple())
-
-                # Add button to draw card
-                prompt_view = View(timeout=None)
-                draw_button = Button(style=ButtonStyle.green,
-                                     label="Draw Black Card",
-                                     custom_id="draw_black_card")
-
-                async def draw_callback(interaction):
-                    ctx = await bot.get_context(interaction.message,
-                                                cls=commands.Context)
-                    ctx.author = interaction.user  # Set the correct author before passing context
-                    await draw_prompt(ctx)
-
-                draw_button.callback = draw_callback
-                prompt_view.add_item(draw_button)
-
-                await user.send(embed=prompt_embed, view=prompt_view)
-            except Exception as e:
-                logger.error(
-                    f"Failed to notify next prompt drawer {game.current_prompt_drawer}: {str(e)}"
-                )
-
-            # Notify players about their topped-up cards via DM
-            for player_id in game.players:
-                if player_id != game.current_prompt_drawer:
-                    try:
-                        user = await bot.fetch_user(player_id)
-                        cards = game.players[player_id]['cards']
-
-                        cards_embed = Embed(
-                            title="🃏 Cards Updated",
-                            description="Your cards have been topped up:",
-                            color=Color.gold())
-
-                        # Add each card as a field
-                        for i, card in enumerate(cards):
-                            cards_embed.add_field(name=f"Card {i+1}",
-                                                  value=card,
-                                                  inline=False)
-
-                        # Create buttons for playing cards
-                        cards_view = View(timeout=None)
-
-                        # Add buttons to play each card (up to 5 per row)
-                        for i in range(len(cards)):
-                            card_button = Button(style=ButtonStyle.gray,
-                                                 label=f"Play #{i+1}",
-                                                 custom_id=f"play_card_{i+1}")
-
-                            # This is a factory function to capture the card index correctly
-                            def create_callback(index):
-
-                                async def play_card_callback(interaction):
-                                    ctx = await bot.get_context(
-                                        interaction.message,
-                                        cls=commands.Context)
-                                    await play_card(ctx, index)
-
-                                return play_card_callback
-
-                            card_button.callback = create_callback(i + 1)
-                            cards_view.add_item(card_button)
-
-                        # Add a custom answer button
-                        custom_button = Button(style=ButtonStyle.blurple,
-                                               label="Custom Answer",
-                                               custom_id="custom_answer")
-
-                        async def custom_callback(interaction):
-                            custom_modal = discord.ui.Modal(
-                                title="Your Custom Answer")
-                            custom_text = discord.ui.TextInput(
-                                label="Your answer",
-                                placeholder="Type your funny answer here...",
-                                style=discord.TextStyle.paragraph)
-                            custom_modal.add_item(custom_text)
-
-                            async def modal_callback(interaction):
-                                ctx = await bot.get_context(
-                                    interaction.message, cls=commands.Context)
-                                await play_custom_answer(
-                                    ctx, answer=custom_text.value)
-                                await interaction.response.send_message(
-                                    "Custom answer submitted!", ephemeral=True)
-
-                            custom_modal.on_submit = modal_callback
-                            await interaction.response.send_modal(custom_modal)
-
-                        custom_button.callback = custom_callback
-                        cards_view.add_item(custom_button)
-
-                        await user.send(embed=cards_embed, view=cards_view)
-                    except Exception as e:
-                        logger.error(
-                            f"Failed to send updated cards to player {player_id}: {str(e)}"
-                        )
+        if await game_call(game, 'select_winner', winning_player_id):
+            await announce_winner(
+                game, winning_player_id, played_cards, ctx.send,
+                channel_id if isinstance(ctx.channel, discord.DMChannel) else None)
         else:
             logger.error(f"Failed to select winner for card {card_number}")
             await ctx.send("Error selecting winner!")
@@ -1211,6 +1277,22 @@ async def select_winner(ctx, card_number: int = None):
             "An error occurred while selecting the winner. Please try again.")
 
 
+def rank_label(info):
+    """Rank from get_scores, marked with = when shared"""
+    return f"#{info['rank']}{'=' if info['tied'] else ''}"
+
+
+def score_change(info):
+    """Points and places gained this round, from get_scores"""
+    changes = []
+    if info['round_points']:
+        changes.append(f"+{info['round_points']}")
+    if info['rank_change']:
+        arrow = "▲" if info['rank_change'] > 0 else "▼"
+        changes.append(f"{arrow}{abs(info['rank_change'])}")
+    return f" ({', '.join(changes)})" if changes else ""
+
+
 @bot.command(name='score', help='Show current scores')
 async def show_scores(ctx):
     """Show current game scores"""
@@ -1221,12 +1303,14 @@ async def show_scores(ctx):
 
     scores = game.get_scores()
     scores_text = "\n".join([
-        f"{info['name']}: {info['score']} points" for info in scores.values()
+        f"{rank_label(info)} {info['name']}: {info['score']} points"
+        for info in scores.values()
     ])
     await ctx.send(f"**Current Scores**:\n{scores_text}")
 
 
 @bot.command(name='end', help='End the current game')
+@with_game_lock
 async def end_game(ctx):
     """End the current game"""
     game = game_manager.get_game(ctx.channel.id)
@@ -1237,38 +1321,42 @@ async def end_game(ctx):
     # Show final scores and winner
     scores = game.get_scores()
     scores_text = "\n".join([
-        f"{info['name']}: {info['score']} points" for info in scores.values()
+        f"{rank_label(info)} {info['name']}: {info['score']} points"
+        for info in scores.values()
     ])
     await ctx.send(f"**Final Scores**:\n{scores_text}")
 
     winner = game.get_winner()
     if winner:
+        tied = (f" (tied with {', '.join(winner['tied_with'])})"
+                if winner['tied_with'] else "")
         await ctx.send(
-            f"\n🎉 **WINNER**: {winner['name']} with {winner['score']} points! 🎉"
+            f"\n🎉 **WINNER**: {winner['name']} with {winner['score']} points{tied}! 🎉"
         )
 
     # Send a DM to each player with the game results
-    for player_id in game.players:
-        try:
-            user = await bot.fetch_user(player_id)
-            if user:
-                # Create an embed for the game results
-                embed = Embed(
-                    title="🏆 Game Over!",
-                    description=
-                    (f"The game in {ctx.channel.name} has ended.\n" +
-                     (f"The winner is **{winner['name']}** with a score of {winner['score']}!"
-                      if winner else "It's a tie!")),
-                    color=Color.gold())
-                embed.add_field(name="Scores:",
-                                value=scores_text,
-                                inline=False)
-                await user.send(embed=embed)
-        except Exception as e:
-            logger.error(
-                f"Failed to send game results to player {player_id}: {str(e)}")
+    async def send_results(player_id):
+        user = await user_cache.get(player_id)
+        if user:
+            # Create an embed for the game results
+            embed = Embed(
+                title="🏆 Game Over!",
+                description=
+                (f"The game in {ctx.channel.name} has ended.\n" +
+                 (f"The winner is **{winner['name']}** with a score of {winner['score']}!"
+                  if winner else "It's a tie!")),
+                color=Color.gold())
+            embed.add_field(name="Scores:",
+                            value=scores_text,
+                            inline=False)
+            await outbound.send_dm(user, embed=embed)
+
+    send_in_background(fan_out(list(game.players), send_results, FAN_OUT_LIMIT,
+                               "send game results to player"), "send game results")
 
-    if game_manager.end_game(ctx.channel.id):
+    if await manager_call('end_game', ctx.channel.id):
+        outbound.reset_status(ctx.channel, 'played')
+        live_hands.forget_group(ctx.channel.id)
         await ctx.send("Game ended! Thanks for playing!")
         db.log_game_end(ctx.channel.id)
     else:
@@ -1399,6 +1487,7 @@ async def show_rules(ctx):
 
 
 @bot.command(name='p', help='Draw a black card prompt')
+@with_game_lock
 async def draw_prompt(ctx):
     """Draw a black prompt card for the current round"""
     logger.debug(f"Prompt command requested by {ctx.author.name}")
@@ -1407,11 +1496,7 @@ async def draw_prompt(ctx):
     game = None
     channel_id = None
     if isinstance(ctx.channel, discord.DMChannel):
-        for c_id, g in game_manager.games.items():
-            if ctx.author.id in g.players:
-                game = g
-                channel_id = c_id
-                break
+        channel_id, game = find_dm_game(ctx)
 
         # In DM, check if this player is the prompt drawer
         if game and game.current_prompt_drawer != ctx.author.id:
@@ -1429,7 +1514,7 @@ async def draw_prompt(ctx):
 
         # In server channel, check if this player is the prompt drawer
         if game and game.current_prompt_drawer != ctx.author.id:
-            drawer_name = game.players[game.current_prompt_drawer]['name']
+            drawer_name = game.players[game.current_prompt_drawer].name
             prompt_embed = Embed(
                 title="Wrong Player",
                 description=
@@ -1443,19 +1528,23 @@ async def draw_prompt(ctx):
         return
 
     # Don't allow drawing a new card if a round is in progress
-    if game.round_in_progress and game.current_black_card:
+    if game.round.in_progress and game.round.black_card:
         embed = Embed(title="Round in Progress",
                       description=f"A round is already in progress!",
                       color=Color.red())
         embed.add_field(name="Current Black Card",
-                        value=game.current_black_card['text'],
+                        value=game.round.black_card.text,
                         inline=False)
         await ctx.send(embed=embed)
         return
 
-    black_card = game.start_round()
+    black_card = await game_call(game, 'start_round')
     if black_card:
         logger.info(f"Drew black card: {black_card}")
+        # This round's played count gets a message of its own
+        game_channel = bot.get_channel(channel_id)
+        if game_channel:
+            outbound.reset_status(game_channel, 'played')
 
         # Create an embed for the black card
         embed = Embed(title="🎲 New Round Started!",
@@ -1482,7 +1571,7 @@ async def draw_prompt(ctx):
             try:
                 game_channel = bot.get_channel(channel_id)
                 if game_channel:
-                    await game_channel.send(embed=embed)
+                    await outbound.send_channel(game_channel, embed=embed)
             except Exception as e:
                 logger.error(
                     f"Failed to send black card to game channel: {str(e)}")
@@ -1490,122 +1579,105 @@ async def draw_prompt(ctx):
         await ctx.send(embed=embed)
 
         # Notify all other players to play their cards
-        for player_id in game.players:
-            if player_id != game.current_prompt_drawer:
-                try:
-                    user = await bot.fetch_user(player_id)
+        lookups_before = user_cache.stats()
 
-                    player_embed = Embed(
-                        title="🎮 Your Turn to Play",
-                        description=f"A new black card has been drawn!",
-                        color=Color.dark_grey())
+        async def send_prompt(player_id):
+            user = await user_cache.get(player_id)
 
-                    player_embed.add_field(name="📜 Black Card",
-                                           value=f"**{black_card}**",
-                                           inline=False)
+            player_embed = Embed(
+                title="🎮 Your Turn to Play",
+                description=f"A new black card has been drawn!",
+                color=Color.dark_grey())
 
-                    player_embed.add_field(
-                        name="Instructions",
-                        value=
-                        "Use the buttons below your cards to play, or submit a custom answer!",
-                        inline=False)
+            player_embed.add_field(name="📜 Black Card",
+                                   value=f"**{black_card}**",
+                                   inline=False)
 
-                    # Create a view with draw cards button
-                    player_view = View(timeout=None)
-                    draw_button = Button(style=ButtonStyle.green,
-                                         label="Draw/View My Cards",
-                                         emoji="🃏",
-                                         custom_id="view_my_cards")
-
-                    custom_button = Button(style=ButtonStyle.blurple,
-                                           label="Submit Custom Answer",
-                                           emoji="✏️",
-                                           custom_id="custom_answer_direct")
-
-                    async def view_cards_callback(interaction):
-                        ctx = await bot.get_context(interaction.message,
-                                                    cls=commands.Context)
-                        ctx.author = interaction.user
-                        await draw_cards(ctx)
-
-                    async def custom_answer_callback(interaction):
-                        custom_modal = discord.ui.Modal(
-                            title="Your Custom Answer")
-                        custom_text = discord.ui.TextInput(
-                            label="Your answer",
-                            placeholder="Type your funny answer here...",
-                            style=discord.TextStyle.paragraph)
-                        custom_modal.add_item(custom_text)
-
-                        async def modal_callback(interaction):
-                            try:
-                                ctx = await bot.get_context(
-                                    interaction.message, cls=commands.Context)
-                                ctx.author = interaction.user
-                                await play_custom_answer(
-                                    ctx, answer=custom_text.value)
-                                await interaction.response.send_message(
-                                    "Custom answer submitted!", ephemeral=True)
-                            except Exception as e:
-                                logger.error(
-                                    f"Error in custom answer modal: {str(e)}")
-                                await interaction.response.send_message(
-                                    "An error occurred. Please try typing `.cas c Your answer` instead.",
-                                    ephemeral=True)
-
-                        custom_modal.on_submit = modal_callback
-                        await interaction.response.send_modal(custom_modal)
-
-                    draw_button.callback = view_cards_callback
-                    custom_button.callback = custom_answer_callback
-
-                    player_view.add_item(draw_button)
-                    player_view.add_item(custom_button)
-
-                    await user.send(embed=player_embed, view=player_view)
-                except Exception as e:
-                    logger.error(
-                        f"Failed to send notification to player {player_id}: {str(e)}"
-                    )
+            player_embed.add_field(
+                name="Instructions",
+                value=
+                "Use the buttons below your cards to play, or submit a custom answer!",
+                inline=False)
+
+            # Buttons to see their hand or answer in their own words
+            player_view = button_view(
+                GameButton('draw_cards', game.channel_id, label="Draw/View My Cards",
+                           emoji="🃏", style=ButtonStyle.green),
+                GameButton('custom', game.channel_id, label="Submit Custom Answer",
+                           emoji="✏️", style=ButtonStyle.blurple))
+
+            await outbound.send_dm(user, embed=player_embed, view=player_view)
+
+        async def send_prompts(player_ids):
+            await fan_out(player_ids, send_prompt, FAN_OUT_LIMIT,
+                          "send notification to player")
+            lookups = {name: count - lookups_before[name]
+                       for name, count in user_cache.stats().items()}
+            logger.info(f"User lookups for round in channel {channel_id}: {lookups}")
+
+        send_in_background(send_prompts([player_id for player_id in game.players
+                                         if player_id != game.current_prompt_drawer]),
+                           "send round notifications")
     else:
         logger.warning("No black cards available")
         await ctx.send("No more black cards available!")
 
 
 @bot.command(name='exit', help='Exit the current game')
+@with_game_lock(find_game=find_player_ctx_game)
 async def exit_game(ctx):
     """Exit the current game"""
-    # Check all channels where the player might be in a game
-    for channel_id, game in game_manager.games.items():
-        if ctx.author.id in game.players:
-            # Remove player from game
-            if game.remove_player(ctx.author.id):
-                # If command was sent in DM, notify the game channel
-                if isinstance(ctx.channel, discord.DMChannel):
-                    channel = bot.get_channel(channel_id)
-                    if channel:
-                        await channel.send(
-                            f"{ctx.author.display_name} has left the game!")
-                await ctx.send("You've left the game!")
-                return
+    # Look up the game the player is in, the one the wrapper locked
+    game = find_player_ctx_game(ctx)
+    if game:
+        channel_id = game.channel_id
+        # Remove player from game
+        result = await game_call(game, 'remove_player', ctx.author.id)
+        if result:
+            live_hands.forget((channel_id, ctx.author.id))
+            post_round_status(game)
+            # If command was sent in DM, notify the game channel
+            if isinstance(ctx.channel, discord.DMChannel):
+                channel = bot.get_channel(channel_id)
+                if channel:
+                    await outbound.send_channel(
+                        channel, f"{ctx.author.display_name} has left the game!")
+            await ctx.send("You've left the game!")
+            # Everyone left in the round has now answered
+            if result == "all_played":
+                await send_answers_to_drawer(
+                    game,
+                    "All remaining players have played! Waiting for the prompt drawer to read the answers and select a winner..."
+                )
+            return
 
     await ctx.send("You're not in any active games!")
 
 
-async def send_game_message(ctx, content, game_update=False):
-    """Send message to appropriate channel(s)"""
+def play_status(game, round_state):
+    """The "X/Y played" line for a round"""
+    needed = max(len(game.players) - 1, 0)  # Exclude prompt drawer
+    return f"🃏 {len(round_state.played_cards)}/{needed} players have played!"
+
+
+def post_round_status(game):
+    """Update the round's status message in the game channel
+
+    The status is one message per round, edited in place, and only
+    re-rendered when the round's version changed, so a burst of plays
+    costs a single edit instead of a message per play.
+    """
+    channel = bot.get_channel(game.channel_id)
+    if channel and game.round.in_progress:
+        outbound.update_status(channel, 'played',
+                               functools.partial(play_status, game, game.round),
+                               version=game.round.version)
+
+
+async def send_play_status(ctx, game, content):
+    """Acknowledge a play and update the round status in the game channel"""
+    post_round_status(game)
     if isinstance(ctx.channel, discord.DMChannel):
-        # Find the game channel
-        for channel_id, game in game_manager.games.items():
-            if ctx.author.id in game.players:
-                if game_update:
-                    # Send game updates to main channel
-                    channel = bot.get_channel(channel_id)
-                    if channel:
-                        await channel.send(content)
-                await ctx.send(content)
-                return
-    else:
         await ctx.send(content)
 
 
@@ -1620,24 +1692,24 @@ async def on_message(message):
     if isinstance(message.channel, discord.DMChannel):
         # Make sure we only process commands with the correct prefix
         if message.content.startswith(('.cas ', '!cas ')):
-            # Find if player is in any active games
-            for channel_id, game in game_manager.games.items():
-                if message.author.id in game.players:
-                    # Process the command
-                    ctx = await bot.get_context(message)
-                    if ctx.command is None:
-                        # Log the invalid command attempt
-                        command_name = message.content.split(' ')[1] if len(
-                            message.content.split(' ')) > 1 else 'unknown'
-                        logger.warning(
-                            f"Invalid command in DM: {command_name} by {message.author.name}"
-                        )
-                        await message.channel.send(
-                            f"Command not found. Use `.cas r` to see all available commands."
-                        )
-                    else:
-                        await bot.invoke(ctx)
-                    return
+            # Only players in an active game can use DM commands
+            _, game = game_manager.find_player_game(message.author.id)
+            if game:
+                # Process the command
+                ctx = await bot.get_context(message)
+                if ctx.command is None:
+                    # Log the invalid command attempt
+                    command_name = message.content.split(' ')[1] if len(
+                        message.content.split(' ')) > 1 else 'unknown'
+                    logger.warning(
+                        f"Invalid command in DM: {command_name} by {message.author.name}"
+                    )
+                    await message.channel.send(
+                        f"Command not found. Use `.cas r` to see all available commands."
+                    )
+                else:
+                    await bot.invoke(ctx)
+                return
 
     # Process regular commands
     await bot.process_commands(message)
@@ -1684,16 +1756,14 @@ async def on_command(ctx):
 @bot.command(name='custom',
              aliases=['c'],
              help='Play a custom answer instead of a card')
+@with_game_lock
 async def play_custom_answer(ctx, *, answer: str):
     """Play a custom answer instead of using a card from your hand"""
     try:
         # Find the relevant game
         game = None
         if isinstance(ctx.channel, discord.DMChannel):
-            for channel_id, g in game_manager.games.items():
-                if ctx.author.id in g.players:
-                    game = g
-                    break
+            _, game = find_dm_game(ctx)
         else:
             game = game_manager.get_game(ctx.channel.id)
 
@@ -1701,73 +1771,18 @@ async def play_custom_answer(ctx, *, answer: str):
             await ctx.send("No active game found!")
             return
 
-        result = game.play_custom_answer(ctx.author.id, answer)
+        result = await game_call(game, 'play_custom_answer', ctx.author.id, answer)
         if result == "all_played":
-            await send_game_message(
-                ctx,
-                f"{ctx.author.display_name} has played their custom answer!",
-                game_update=True)
-
-            # Get prompt drawer and send them a DM with played cards/answers
-            prompt_drawer = await bot.fetch_user(game.current_prompt_drawer)
-            played_cards = game.get_played_cards(include_players=True,
-                                                 include_custom=True)
-
-            # Format for the prompt drawer to display
-            # Create an embed for the results
-            embed = Embed(
-                title="🎮 All Cards Played!",
-                description=
-                f"All players have submitted their answers to: **{game.current_black_card['text']}**",
-                color=Color.blue())
-
-            # Add each card as a field
-            for i, (player_id, card_info) in enumerate(played_cards.items()):
-                prefix = "✏️ " if player_id in game.custom_answers else ""
-                embed.add_field(name=f"Card {i+1}",
-                                value=f"{prefix}{card_info['card']}",
-                                inline=False)
-
-            embed.add_field(
-                name="Instructions",
-                value=
-                "Read these answers aloud in voice chat, then select the winner using the button below.",
-                inline=False)
-
-            # Create a view with select winner button
-            view = View(timeout=None)
-            select_button = Button(style=ButtonStyle.green,
-                                   label="Select Winner",
-                                   emoji="🏆",
-                                   custom_id="select_winner")
+            await send_play_status(ctx, game, "Your custom answer has been submitted!")
 
-            async def select_winner_callback(interaction):
-                ctx = await bot.get_context(interaction.message,
-                                            cls=commands.Context)
-                ctx.author = interaction.user  # Set the correct author before passing context
-                await select_winner(ctx)
-
-            select_button.callback = select_winner_callback
-            view.add_item(select_button)
-
-            await prompt_drawer.send(embed=embed, view=view)
-
-            # Send update to game channel
-            if isinstance(ctx.channel, discord.DMChannel):
-                for channel_id in game_manager.games:
-                    if game == game_manager.get_game(channel_id):
-                        channel = bot.get_channel(channel_id)
-                        if channel:
-                            await channel.send(
-                                "All players have submitted their answers! Waiting for the prompt drawer to read them and select a winner..."
-                            )
+            # Only tell the game channel separately when playing from a DM
+            await send_answers_to_drawer(
+                game,
+                "All players have submitted their answers! Waiting for the prompt drawer to read them and select a winner..."
+                if isinstance(ctx.channel, discord.DMChannel) else None)
 
         elif result:
-            await send_game_message(
-                ctx,
-                f"{ctx.author.display_name} has played their custom answer!",
-                game_update=True)
-            await ctx.send("Your custom answer has been submitted!")
+            await send_play_status(ctx, game, "Your custom answer has been submitted!")
         else:
             await ctx.send("You can't play right now!")
 
@@ -1956,4 +1971,15 @@ if not token:
     logger.error("No Discord token found!")
     raise ValueError("Please set the DISCORD_TOKEN environment variable")
 
-bot.run(token)
+# Restore games saved before the last shutdown, so on_ready can pick them up
+if SHARD_WORKERS:
+    game_manager.load_snapshots()
+else:
+    snapshot_store.load()
+try:
+    bot.run(token)
+finally:
+    if SHARD_WORKERS:
+        game_manager.close()
+    else:
+        snapshot_store.save()
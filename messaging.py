@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FAN_OUT_LIMIT = 10
+SENT = 'sent'
+EDITED = 'edited'
+UNCHANGED = 'unchanged'
+
+
+class FanOutResult:
+    """What happened to each recipient of a fan_out"""
+
+    __slots__ = ('sent', 'failed', 'latencies', 'elapsed')
+
+    def __init__(self):
+        self.sent: List[Hashable] = []
+        self.failed: Dict[Hashable, Exception] = {}  # recipient: what send raised
+        self.latencies: Dict[Hashable, float] = {}  # recipient: seconds their send took
+        self.elapsed = 0.0  # seconds until the last send finished
+
+    def __bool__(self) -> bool:
+        return not self.failed
+
+
+async def fan_out(recipients: Iterable[Hashable],
+                  send: Callable[[Hashable], Awaitable],
+                  limit: int = DEFAULT_FAN_OUT_LIMIT,
+                  description: str = "notify") -> FanOutResult:
+    """Run send(recipient) for every recipient concurrently, at most limit at a time
+
+    A failed send is logged and recorded in the result rather than raised,
+    so one blocked DM never stops the others.
+    """
+    semaphore = asyncio.Semaphore(limit)
+    result = FanOutResult()
+    start = time.perf_counter()
+
+    async def send_one(recipient):
+        async with semaphore:
+            sent_at = time.perf_counter()
+            try:
+                await send(recipient)
+            except Exception as e:
+                result.failed[recipient] = e
+                logger.error(f"Failed to {description} {recipient}: {str(e)}")
+            else:
+                result.sent.append(recipient)
+            finally:
+                result.latencies[recipient] = time.perf_counter() - sent_at
+
+    await asyncio.gather(*map(send_one, recipients))
+    result.elapsed = time.perf_counter() - start
+    total = len(result.sent) + len(result.failed)
+    if total:
+        logger.info(f"{description}: {len(result.sent)}/{total} sent in {result.elapsed * 1000:.0f}ms")
+    return result
+
+
+class LiveMessages:
+    """One live message per key, edited in place instead of sent again
+
+    Each message remembers the version of the state it shows, so show()
+    edits it only when the version changed, and sends a new one only when
+    there is no live message or it can no longer be edited. Shows of one
+    key run one at a time, so two at once still send a single message.
+    Keys are tuples whose first element groups them, such as a game's
+    channel, so forget_group() drops a whole game. At most max_size
+    messages are kept, least recently shown dropped first.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        # key: (message, version shown), least recently shown first
+        self._messages: "OrderedDict[tuple, Tuple[object, Hashable]]" = OrderedDict()
+        self._groups: Dict[Hashable, set] = {}  # key[0]: {key}
+        self._showing: Dict[tuple, list] = {}  # key: [lock, shows holding or waiting for it]
+        self.sent = 0
+        self.edited = 0
+        self.unchanged = 0
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def message(self, key: tuple):
+        """The live message for key, if there is one"""
+        entry = self._messages.get(key)
+        return entry[0] if entry else None
+
+    async def show(self, key: tuple, version: Hashable,
+                   send: Optional[Callable[[], Awaitable]],
+                   edit: Callable[[object], Awaitable]) -> Optional[str]:
+        """Bring key's message up to version
+
+        send() posts a new message and returns it; edit(message) rewrites
+        the live one. With send None, only an existing message is updated.
+        Returns SENT, EDITED or UNCHANGED, or None if nothing was shown.
+        """
+        showing = self._showing.get(key)
+        if showing is None:
+            showing = self._showing[key] = [asyncio.Lock(), 0]
+        showing[1] += 1
+        try:
+            async with showing[0]:
+                return await self._show(key, version, send, edit)
+        finally:
+            showing[1] -= 1
+            if not showing[1]:
+                del self._showing[key]
+
+    async def _show(self, key: tuple, version: Hashable,
+                    send: Optional[Callable[[], Awaitable]],
+                    edit: Callable[[object], Awaitable]) -> Optional[str]:
+        entry = self._messages.get(key)
+        if entry is not None:
+            message, shown = entry
+            self._messages.move_to_end(key)
+            if shown == version:
+                self.unchanged += 1
+                return UNCHANGED
+            try:
+                await edit(message)
+            except Exception as e:
+                # Most likely deleted, so post a new one
+                logger.warning(f"Failed to edit live message {key}: {str(e)}")
+                self.forget(key)
+            else:
+                self._messages[key] = (message, version)
+                self.edited += 1
+                return EDITED
+
+        if send is None:
+            return None
+        message = await send()
+        self._messages[key] = (message, version)
+        self._messages.move_to_end(key)
+        self._groups.setdefault(key[0], set()).add(key)
+        while len(self._messages) > self.max_size:
+            self.forget(next(iter(self._messages)))
+        self.sent += 1
+        return SENT
+
+    def forget(self, key: tuple):
+        """Stop tracking key's message, so the next show() sends a new one"""
+        if self._messages.pop(key, None) is None:
+            return
+        group = self._groups.get(key[0])
+        if group is not None:
+            group.discard(key)
+            if not group:
+                del self._groups[key[0]]
+
+    def forget_group(self, group: Hashable):
+        """Stop tracking every message in a group"""
+        for key in self._groups.pop(group, ()):
+            self._messages.pop(key, None)
@@ -0,0 +1,239 @@
+"""
+Outbound message scheduling.
+
+Every message the bot posts to a game channel or DMs to a player goes
+through an OutboundScheduler. Each channel and each user has its own queue,
+drained by one task in order, and paced by token buckets sized to Discord's
+rate limits, so bursts wait here instead of hitting 429s. Status lines such
+as "4/7 played" are coalesced: however many updates arrive while a queue
+is busy, one message is sent or edited with the latest text. Failed DMs are
+retried with exponential backoff.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Hashable, Tuple, Type, Union
+
+logger = logging.getLogger(__name__)
+
+# Discord allows about 5 messages per 5 seconds in a channel, and 50 requests a second overall
+CHANNEL_RATE = 1.0
+CHANNEL_BURST = 5
+DM_RATE = 1.0
+DM_BURST = 5
+GLOBAL_RATE = 40.0
+GLOBAL_BURST = 40
+# Buckets kept before refilled ones are dropped
+MAX_IDLE_BUCKETS = 4096
+
+
+class TokenBucket:
+    """Allows burst sends at once and rate sends a second after that"""
+
+    __slots__ = ('rate', 'burst', 'tokens', 'updated', 'clock')
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.clock = clock
+        self.updated = clock()
+
+    def reserve(self) -> float:
+        """Take a token, returning how many seconds to wait before using it"""
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def full(self) -> bool:
+        """Whether the bucket has refilled, so dropping it loses nothing"""
+        return self.tokens + (self.clock() - self.updated) * self.rate >= self.burst
+
+
+class _Status:
+    """A coalesced status line and the message showing it"""
+
+    __slots__ = ('render', 'message', 'queued', 'version', 'shown_version')
+
+    def __init__(self):
+        self.render: Union[str, Callable[[], str], None] = None
+        self.message = None  # sent message, edited by later updates
+        self.queued = False
+        self.version = None  # version of the state render shows
+        self.shown_version = None  # version message shows
+
+
+class OutboundScheduler:
+    """Per-channel and per-user send queues, paced by rate-limit buckets
+
+    send_channel() and send_dm() return once their message has been sent,
+    with the message, or raise what the last attempt raised. DMs are tried
+    up to max_attempts times, waiting backoff, 2 * backoff, ... seconds in
+    between, or the retry_after an error carries; errors in
+    permanent_errors, such as a user who blocks DMs, are not retried.
+    """
+
+    def __init__(self, max_attempts: int = 4, backoff: float = 1.0,
+                 permanent_errors: Tuple[Type[BaseException], ...] = (),
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.permanent_errors = permanent_errors
+        self.clock = clock
+        self._queues: Dict[Hashable, Deque] = {}  # ('channel' or 'user', id): pending items
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+        self._global = TokenBucket(GLOBAL_RATE, GLOBAL_BURST, clock)
+        self._statuses: Dict[Tuple[Hashable, Hashable], _Status] = {}
+        self._workers: Dict[Hashable, asyncio.Task] = {}
+        self.sent = 0
+        self.edited = 0
+        self.coalesced = 0  # status updates folded into a later one
+        self.retries = 0
+        self.failed = 0
+
+    def _enqueue(self, queue_key: Hashable, item):
+        self._queues.setdefault(queue_key, deque()).append(item)
+        if queue_key not in self._workers:
+            self._workers[queue_key] = asyncio.create_task(self._drain(queue_key))
+
+    def _send(self, queue_key: Hashable, method: Callable, args, kwargs) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._enqueue(queue_key, (future, method, args, kwargs))
+        return future
+
+    def send_channel(self, channel, *args, **kwargs) -> asyncio.Future:
+        """Queue channel.send(*args, **kwargs) behind the channel's other messages"""
+        return self._send(('channel', channel.id), channel.send, args, kwargs)
+
+    def send_dm(self, user, *args, **kwargs) -> asyncio.Future:
+        """Queue user.send(*args, **kwargs) behind the user's other DMs, retrying failures"""
+        return self._send(('user', user.id), user.send, args, kwargs)
+
+    def edit_channel(self, channel, message, **kwargs) -> asyncio.Future:
+        """Queue message.edit(**kwargs) for a message in channel"""
+        return self._send(('channel', channel.id), message.edit, (), kwargs)
+
+    def edit_dm(self, user, message, **kwargs) -> asyncio.Future:
+        """Queue message.edit(**kwargs) for a DM to user, retrying failures"""
+        return self._send(('user', user.id), message.edit, (), kwargs)
+
+    def update_status(self, channel, key: Hashable, render: Union[str, Callable[[], str]],
+                      version: Hashable = None):
+        """Show a status line in a channel, editing the last one sent for key
+
+        render is the text or a function returning it, called when the
+        update is sent so it shows the state at that moment. Updates made
+        while one is queued replace it instead of queueing another. With a
+        version, an update of the version already shown is skipped.
+        """
+        queue_key = ('channel', channel.id)
+        status = self._statuses.get((queue_key, key))
+        if status is None:
+            status = self._statuses[(queue_key, key)] = _Status()
+        if version is not None and version == status.shown_version and status.message is not None:
+            return
+        status.render = render
+        status.version = version
+        if status.queued:
+            self.coalesced += 1
+            return
+        status.queued = True
+        self._enqueue(queue_key, (None, channel, key, status))
+
+    def reset_status(self, channel, key: Hashable):
+        """Start a new message for key's next update instead of editing the last one"""
+        status = self._statuses.pop((('channel', channel.id), key), None)
+        if status is not None:
+            # A queued update still sends, as a fresh message
+            status.message = None
+            status.shown_version = None
+
+    def _bucket(self, queue_key: Hashable) -> TokenBucket:
+        bucket = self._buckets.get(queue_key)
+        if bucket is None:
+            if len(self._buckets) >= MAX_IDLE_BUCKETS:
+                # Refilled buckets are the same as new ones
+                for key in [key for key, old in self._buckets.items() if old.full()]:
+                    del self._buckets[key]
+            rate, burst = (CHANNEL_RATE, CHANNEL_BURST) if queue_key[0] == 'channel' else (DM_RATE, DM_BURST)
+            bucket = self._buckets[queue_key] = TokenBucket(rate, burst, self.clock)
+        return bucket
+
+    async def _pace(self, queue_key: Hashable):
+        delay = max(self._bucket(queue_key).reserve(), self._global.reserve())
+        if delay:
+            await asyncio.sleep(delay)
+
+    async def _drain(self, queue_key: Hashable):
+        queue = self._queues[queue_key]
+        try:
+            while queue:
+                future, target, *rest = queue.popleft()
+                if future is None:
+                    await self._flush_status(queue_key, target, *rest)
+                elif not future.cancelled():
+                    await self._deliver(queue_key, future, target, *rest)
+        finally:
+            del self._workers[queue_key]
+            del self._queues[queue_key]
+
+    async def _deliver(self, queue_key: Hashable, future: asyncio.Future, method: Callable,
+                       args: tuple, kwargs: dict):
+        attempts = self.max_attempts if queue_key[0] == 'user' else 1
+        for attempt in range(1, attempts + 1):
+            await self._pace(queue_key)
+            try:
+                message = await method(*args, **kwargs)
+            except Exception as e:
+                if attempt == attempts or isinstance(e, self.permanent_errors):
+                    self.failed += 1
+                    if not future.cancelled():
+                        future.set_exception(e)
+                    return
+                self.retries += 1
+                delay = getattr(e, 'retry_after', None) or self.backoff * 2 ** (attempt - 1)
+                logger.warning(f"Retrying message to {queue_key[0]} {queue_key[1]} in {delay:.1f}s: {str(e)}")
+                await asyncio.sleep(delay)
+            else:
+                self.sent += 1
+                if not future.cancelled():
+                    future.set_result(message)
+                return
+
+    async def _flush_status(self, queue_key: Hashable, channel, key: Hashable, status: _Status):
+        status.queued = False
+        if (status.version is not None and status.version == status.shown_version
+                and status.message is not None):
+            self.coalesced += 1
+            return
+        render = status.render
+        text = render() if callable(render) else render
+        await self._pace(queue_key)
+        try:
+            if status.message is not None:
+                await status.message.edit(content=text)
+                self.edited += 1
+            else:
+                status.message = await channel.send(text)
+                self.sent += 1
+            status.shown_version = status.version
+        except Exception as e:
+            self.failed += 1
+            # Post a fresh message next time, in case this one was deleted
+            status.message = None
+            status.shown_version = None
+            logger.error(f"Failed to update {key} status in channel {queue_key[1]}: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'queued': sum(len(queue) for queue in self._queues.values()),
+            'sent': self.sent,
+            'edited': self.edited,
+            'coalesced': self.coalesced,
+            'retries': self.retries,
+            'failed': self.failed,
+        }
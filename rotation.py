@@ -0,0 +1,63 @@
+from typing import Dict, Hashable, Iterator, Optional
+
+
+class PlayerRing:
+    """Players in join order, as a circular doubly linked list indexed by ID
+
+    Appending a late joiner, removing a player and finding the player after
+    another are all O(1), so rotating the prompt drawer never scans the
+    table. Iteration starts from the earliest remaining joiner.
+    """
+
+    def __init__(self):
+        self.head: Optional[Hashable] = None
+        self._next: Dict[Hashable, Hashable] = {}
+        self._prev: Dict[Hashable, Hashable] = {}
+
+    def __len__(self) -> int:
+        return len(self._next)
+
+    def __bool__(self) -> bool:
+        return self.head is not None
+
+    def __contains__(self, player_id) -> bool:
+        return player_id in self._next
+
+    def __iter__(self) -> Iterator[Hashable]:
+        player_id = self.head
+        for _ in range(len(self._next)):
+            yield player_id
+            player_id = self._next[player_id]
+
+    def append(self, player_id: Hashable):
+        """Add a player at the end of the rotation"""
+        if player_id in self._next:
+            return
+        if self.head is None:
+            self.head = player_id
+            self._next[player_id] = self._prev[player_id] = player_id
+            return
+        tail = self._prev[self.head]
+        self._next[tail] = player_id
+        self._prev[player_id] = tail
+        self._next[player_id] = self.head
+        self._prev[self.head] = player_id
+
+    def remove(self, player_id: Hashable) -> bool:
+        """Take a player out of the rotation"""
+        if player_id not in self._next:
+            return False
+        after = self._next.pop(player_id)
+        before = self._prev.pop(player_id)
+        if not self._next:
+            self.head = None
+            return True
+        self._next[before] = after
+        self._prev[after] = before
+        if self.head == player_id:
+            self.head = after
+        return True
+
+    def after(self, player_id: Hashable) -> Optional[Hashable]:
+        """The player who comes after player_id, wrapping around"""
+        return self._next.get(player_id)
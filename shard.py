@@ -0,0 +1,485 @@
+"""
+Sharded game hosting: games run in worker processes, partitioned by channel.
+
+A ShardRouter, owned by one front process, starts the workers. Each
+worker process owns a GameManager for the channels that hash to it, so
+one busy guild only slows the games on its shard. Commands are routed
+over a pipe per worker and batched while a worker is busy, so IPC costs
+one round trip per batch rather than per command.
+
+Commands are (channel_id, method, args) tuples naming a GameManager or
+Game method from MANAGER_METHODS or GAME_METHODS; results come back
+pickled, so only plain values should be returned. SHARD_METHODS run on
+every worker at once.
+
+The bot runs on this when SHARD_WORKERS is set. ShardedGameManager then
+stands in for GameManager in the front process: it keeps a RemoteGame
+replica of every game, fed with the events each command produced in its
+worker, so the bot reads game state locally and only changes cross the
+pipes. Card IDs are only meaningful in the process that interned them,
+so cards travel as (type, text, nsfw, pick) and are interned again on
+arrival.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import queue
+import threading
+import zlib
+from array import array
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from cards import get_card, intern_card
+from events import (CUSTOM_ANSWER, CardPlayed, CardsDealt, Event, GameState, HandReplaced,
+                    PlayerJoined, PlayerLeft, RoundStarted, apply)
+from game import GameManager, GameView
+from snapshot import SnapshotStore
+from watcher import CardWatcher
+
+logger = logging.getLogger(__name__)
+
+# Methods called on the worker's GameManager, with channel_id as first argument
+MANAGER_METHODS = frozenset({'create_game', 'end_game', 'is_game_active', 'add_player'})
+# Methods called on the channel's Game
+GAME_METHODS = frozenset({
+    'remove_player', 'update_nsfw_setting', 'draw_cards', 'play_card',
+    'play_custom_answer', 'start_round', 'select_winner', 'get_hand',
+    'get_played_cards', 'get_scores', 'get_winner', 'auto_play',
+    'auto_select_winner', 'skip_round',
+})
+# Methods every worker runs on all of its games, see ShardRouter.broadcast
+SHARD_METHODS = frozenset({'reap_idle', 'save_snapshots', 'load_snapshots'})
+MAX_BATCH = 256
+
+# Kinds of replica update a replicated command returns, per channel it touched
+STATE = 0  # the game's whole state, for a game the front hasn't seen
+EVENTS = 1  # events since the last update
+ENDED = 2
+
+# Event fields holding card IDs, and whether they hold several
+_CARD_FIELDS = {
+    CardsDealt: ('card_ids', True),
+    HandReplaced: ('card_ids', True),
+    RoundStarted: ('black_card_id', False),
+    CardPlayed: ('card_id', False),
+}
+
+
+class ShardError(Exception):
+    """A command raised in its worker process"""
+
+
+def shard_for(channel_id: int, shards: int) -> int:
+    """Which worker owns a channel, stable across processes and restarts"""
+    return zlib.crc32(channel_id.to_bytes(8, 'little', signed=True)) % shards
+
+
+def run_command(manager: GameManager, channel_id: int, method: str, args: tuple):
+    """Run one command against a GameManager, returning a value that can be pickled"""
+    if method in MANAGER_METHODS:
+        return getattr(manager, method)(channel_id, *args)
+    if method not in GAME_METHODS:
+        raise ValueError(f"unknown command {method!r}")
+    game = manager.get_game(channel_id)
+    if game is None:
+        return None
+    result = getattr(game, method)(*args)
+    # Hands are arrays of card IDs, which are only meaningful in this process
+    if method == 'draw_cards' and result is not None:
+        return game.get_hand(args[0])
+    return result
+
+
+def _export_card(card_id: int) -> tuple:
+    card = get_card(card_id)
+    return card.type, card.text, card.nsfw, card.pick
+
+
+def _import_card(card: tuple) -> int:
+    return intern_card(*card).id
+
+
+def _convert_event(event: Event, convert: Callable) -> Event:
+    """Swap the card IDs or portable cards in an event using convert"""
+    field = _CARD_FIELDS.get(type(event))
+    if field is None:
+        return event
+    name, many = field
+    value = getattr(event, name)
+    return event._replace(**{name: tuple(map(convert, value)) if many else convert(value)})
+
+
+def _export_state(game) -> GameState:
+    state = GameState.capture(game)
+    for player in state.players.values():
+        player.cards = tuple(map(_export_card, player.cards))
+    if state.round.black_card is not None:
+        state.round.black_card = _export_card(state.round.black_card.id)
+    state.round.played_cards = {
+        player_id: card if card == CUSTOM_ANSWER else _export_card(card)
+        for player_id, card in state.round.played_cards.items()}
+    return state
+
+
+def _import_state(state: GameState) -> GameState:
+    for player in state.players.values():
+        player.cards = array('I', map(_import_card, player.cards))
+    if state.round.black_card is not None:
+        state.round.black_card = intern_card(*state.round.black_card)
+    state.round.played_cards = {
+        player_id: card if card == CUSTOM_ANSWER else _import_card(card)
+        for player_id, card in state.round.played_cards.items()}
+    return state
+
+
+class _ShardHost:
+    """A worker's games, and what changed in them since the front last heard"""
+
+    def __init__(self, manager: GameManager, owns: Callable[[int], bool],
+                 snapshots: Optional[SnapshotStore] = None):
+        self.manager = manager
+        self.owns = owns
+        self.snapshots = snapshots
+
+    def run(self, channel_id: Optional[int], method: str, args: tuple, replicate: bool):
+        if channel_id is None:
+            return self._run_on_shard(method)
+        value = run_command(self.manager, channel_id, method, args)
+        if not replicate:
+            return value
+        changed = [channel_id]
+        if method == 'create_game':
+            changed += value  # games evicted to make room
+        return value, self._updates(changed)
+
+    def _run_on_shard(self, method: str):
+        if method == 'reap_idle':
+            reaped = self.manager.reap_idle()
+            return reaped, self._updates(reaped)
+        if method == 'save_snapshots':
+            return (self.snapshots.save() if self.snapshots else 0), []
+        if method == 'load_snapshots':
+            restored = self.snapshots.load(self.owns) if self.snapshots else 0
+            return restored, self._updates(list(self.manager.games))
+        raise ValueError(f"unknown command {method!r}")
+
+    def _updates(self, channel_ids: List[int]) -> list:
+        """(channel_id, kind, payload) for each game the front's replica is behind on"""
+        updates = []
+        for channel_id in channel_ids:
+            game = self.manager.get_game(channel_id)
+            if game is None:
+                updates.append((channel_id, ENDED, None))
+            elif not game.log.has_cursor(self):
+                game.log.open_cursor(self)
+                updates.append((channel_id, STATE, _export_state(game)))
+            else:
+                events = game.log.read(self)
+                if events:
+                    updates.append((channel_id, EVENTS,
+                                    [_convert_event(event, _export_card) for event in events]))
+        return updates
+
+
+def _worker(conn, index: int, shards: int, database_factory: Optional[Callable],
+            log_level: int, manager_options: dict, snapshot_dir: Optional[str],
+            watch_cards: Optional[dict]):
+    logging.getLogger().setLevel(log_level)
+    database = database_factory() if database_factory else None
+    manager = GameManager(database, **manager_options)
+    host = _ShardHost(manager, lambda channel_id: shard_for(channel_id, shards) == index,
+                      SnapshotStore(manager, snapshot_dir) if snapshot_dir else None)
+    if watch_cards is not None:
+        CardWatcher(database=database, **watch_cards).start()
+    while True:
+        batch = conn.recv()
+        if batch is None:
+            break
+        results = []
+        for channel_id, method, args, replicate in batch:
+            try:
+                results.append((True, host.run(channel_id, method, args, replicate)))
+            except Exception as e:
+                results.append((False, f"{type(e).__name__}: {e}"))
+        conn.send(results)
+    conn.close()
+
+
+class _Shard:
+    """One worker process, fed by a thread that batches pending commands"""
+
+    def __init__(self, index: int, context, worker_args: tuple):
+        self.index = index
+        self.pending: "queue.Queue[Optional[Tuple[tuple, Future]]]" = queue.Queue()
+        self._conn, child = context.Pipe()
+        self.process = context.Process(target=_worker, args=(child, index) + worker_args,
+                                       name=f"game-shard-{index}", daemon=True)
+        self.process.start()
+        child.close()
+        self._thread = threading.Thread(target=self._run, name=f"game-shard-{index}-io",
+                                        daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+            items = [item]
+            # Everything queued while the last batch ran goes out together
+            while len(items) < MAX_BATCH:
+                try:
+                    item = self.pending.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self.pending.put(None)
+                    break
+                items.append(item)
+
+            try:
+                self._conn.send([command for command, _ in items])
+                results = self._conn.recv()
+            except (EOFError, OSError) as e:
+                for _, future in items:
+                    future.set_exception(ShardError(f"shard {self.index} is gone: {e}"))
+                continue
+            for (_, future), (ok, value) in zip(items, results):
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(ShardError(value))
+
+        try:
+            self._conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self._conn.close()
+
+    def stop(self):
+        self.pending.put(None)
+        self._thread.join()
+        self.process.join(timeout=5)
+
+
+class ShardRouter:
+    """Routes game commands to worker processes by channel
+
+    Also keeps which channel each player joined, so DM commands can be
+    routed without asking every shard. submit() returns a
+    concurrent.futures.Future; wrap it with asyncio.wrap_future to await
+    it from the bot's event loop.
+
+    Each worker builds its GameManager with manager_options, saves and
+    restores its own games under snapshot_dir when given, and runs a
+    CardWatcher with the watch_cards options when given.
+    """
+
+    def __init__(self, workers: int = 4, database_factory: Optional[Callable] = None,
+                 log_level: int = logging.INFO, start_method: str = 'spawn',
+                 manager_options: Optional[dict] = None, snapshot_dir: Optional[str] = None,
+                 watch_cards: Optional[dict] = None):
+        context = multiprocessing.get_context(start_method)
+        worker_args = (workers, database_factory, log_level, manager_options or {},
+                       snapshot_dir, watch_cards)
+        self.shards = [_Shard(i, context, worker_args) for i in range(workers)]
+        # Only once every worker exists, so none is forked with IO threads running
+        for shard in self.shards:
+            shard.start()
+        self.player_channels: Dict[int, int] = {}  # player_id: channel_id
+        self._channel_players: Dict[int, set] = {}  # channel_id: {player_id}
+        # Results arrive on each shard's IO thread
+        self._players_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.shards)
+
+    def submit(self, channel_id: int, method: str, *args, replicate: bool = False) -> Future:
+        """Queue a command for the shard that owns channel_id
+
+        With replicate, the result is (value, updates) for ShardedGameManager.
+        """
+        if method not in MANAGER_METHODS and method not in GAME_METHODS:
+            raise ValueError(f"unknown command {method!r}")
+        future = Future()
+        shard = self.shards[shard_for(channel_id, len(self.shards))]
+        shard.pending.put(((channel_id, method, args, replicate), future))
+        if method in ('add_player', 'remove_player', 'end_game'):
+            future.add_done_callback(
+                lambda done: self._track_player(done, channel_id, method, args))
+        return future
+
+    def call(self, channel_id: int, method: str, *args) -> Any:
+        """Run a command and wait for its result"""
+        return self.submit(channel_id, method, *args).result()
+
+    def broadcast(self, method: str) -> List[Future]:
+        """Queue a SHARD_METHODS command on every worker, each resolving to (value, updates)"""
+        if method not in SHARD_METHODS:
+            raise ValueError(f"unknown command {method!r}")
+        futures = []
+        for shard in self.shards:
+            future = Future()
+            shard.pending.put(((None, method, (), True), future))
+            futures.append(future)
+        return futures
+
+    def _track_player(self, future: Future, channel_id: int, method: str, args: tuple):
+        if future.exception() is not None or not future.result():
+            return
+        with self._players_lock:
+            if method == 'add_player':
+                self.player_channels[args[0]] = channel_id
+                self._channel_players.setdefault(channel_id, set()).add(args[0])
+                return
+            if method == 'remove_player':
+                players = [args[0]]
+                self._channel_players.get(channel_id, set()).discard(args[0])
+            else:
+                players = self._channel_players.pop(channel_id, ())
+            for player_id in players:
+                if self.player_channels.get(player_id) == channel_id:
+                    del self.player_channels[player_id]
+
+    def find_player_channel(self, player_id: int) -> Optional[int]:
+        """The channel of the game a player most recently joined"""
+        return self.player_channels.get(player_id)
+
+    def close(self):
+        """Stop every worker, after the commands already queued"""
+        for shard in self.shards:
+            shard.stop()
+
+
+class RemoteGame(GameView):
+    """Front-process replica of a game that runs in a shard worker
+
+    Carries the game's GameState attributes, kept current by applying the
+    events its worker reports, so GameView queries and main.py's reads
+    work on it as they do on a Game. Changes go through
+    ShardedGameManager.run instead of Game's methods.
+    """
+
+    def __init__(self, channel_id: int, state: GameState):
+        for name in GameState.__slots__:
+            setattr(self, name, getattr(state, name))
+        self.channel_id = channel_id
+        # Held by main.py while a command or button press runs against this game
+        self.lock = asyncio.Lock()
+
+
+class ShardedGameManager:
+    """Stands in for GameManager in a front process whose games run in shard workers
+
+    Reads (games, get_game, is_game_active, find_player_game) answer from
+    the local replicas. Commands are coroutines that run in the game's
+    worker; the replica updates they return are applied on the event loop
+    in the order the worker ran them, before the command's caller resumes.
+    """
+
+    def __init__(self, router: ShardRouter, database=None):
+        self.router = router
+        self.database = database
+        self.games: Dict[int, RemoteGame] = {}  # channel_id: RemoteGame
+        # player_id: [channel_id, ...] in join order, as in GameManager
+        self.player_channels: Dict[int, List[int]] = {}
+
+    def get_game(self, channel_id):
+        return self.games.get(channel_id)
+
+    def is_game_active(self, channel_id):
+        return channel_id in self.games
+
+    def find_player_game(self, player_id):
+        """Get (channel_id, game) for the game a player most recently joined, or (None, None)"""
+        channels = self.player_channels.get(player_id)
+        if not channels:
+            return None, None
+        channel_id = channels[-1]
+        return channel_id, self.games[channel_id]
+
+    async def run(self, channel_id: int, method: str, *args):
+        """Run a GameManager or Game command in the channel's worker and return its value"""
+        future = self.router.submit(channel_id, method, *args, replicate=True)
+        value, _ = await self._settle(future)
+        return value
+
+    async def _settle(self, future: Future):
+        loop = asyncio.get_running_loop()
+        # Registered before wrap_future's own callback, so the updates land first
+        future.add_done_callback(lambda done: loop.call_soon_threadsafe(self._apply_result, done))
+        return await asyncio.wrap_future(future)
+
+    async def _run_on_shards(self, method: str) -> list:
+        results = await asyncio.gather(*map(self._settle, self.router.broadcast(method)))
+        return [value for value, _ in results]
+
+    async def reap_idle(self) -> List[int]:
+        """End games idle for longer than the workers' idle_ttl, returning their channel IDs"""
+        return [channel_id for reaped in await self._run_on_shards('reap_idle')
+                for channel_id in reaped]
+
+    async def save_snapshots(self) -> int:
+        """Have every worker save its changed games, returning how many were saved"""
+        return sum(await self._run_on_shards('save_snapshots'))
+
+    def load_snapshots(self) -> int:
+        """Restore every worker's saved games and replicate them, before the event loop runs"""
+        restored = 0
+        for future in self.router.broadcast('load_snapshots'):
+            count, updates = future.result()
+            self._apply(updates)
+            restored += count
+        logger.info(f"Restored {restored} game(s) across {len(self.router)} shard(s)")
+        return restored
+
+    def close(self):
+        """Save every worker's changed games and stop the workers"""
+        for future in self.router.broadcast('save_snapshots'):
+            try:
+                future.result()
+            except ShardError as e:
+                logger.error(f"Failed to save snapshots on shutdown: {str(e)}")
+        self.router.close()
+
+    def _apply_result(self, future: Future):
+        if not future.cancelled() and future.exception() is None:
+            self._apply(future.result()[1])
+
+    def _apply(self, updates: list):
+        for channel_id, kind, payload in updates:
+            if kind == STATE:
+                self._drop(channel_id)
+                game = self.games[channel_id] = RemoteGame(channel_id, _import_state(payload))
+                for player_id in game.player_order:
+                    self.player_channels.setdefault(player_id, []).append(channel_id)
+            elif kind == EVENTS:
+                game = self.games.get(channel_id)
+                if game is None:
+                    continue
+                for event in payload:
+                    event = _convert_event(event, _import_card)
+                    apply(game, event)
+                    if isinstance(event, PlayerJoined):
+                        self.player_channels.setdefault(event.player_id, []).append(channel_id)
+                    elif isinstance(event, PlayerLeft):
+                        self._unindex_player(event.player_id, channel_id)
+            else:
+                self._drop(channel_id)
+
+    def _drop(self, channel_id: int):
+        game = self.games.pop(channel_id, None)
+        if game is not None:
+            for player_id in game.players:
+                self._unindex_player(player_id, channel_id)
+
+    def _unindex_player(self, player_id, channel_id):
+        channels = self.player_channels.get(player_id)
+        if channels and channel_id in channels:
+            channels.remove(channel_id)
+            if not channels:
+                del self.player_channels[player_id]
@@ -0,0 +1,227 @@
+"""
+Headless game simulator and load generator.
+
+Drives GameManager and Game through many games without Discord or Mongo
+and reports throughput, per-operation latency percentiles and peak memory:
+
+    python simulator.py --games 200 --players 6 --rounds 20 --seed 1
+
+Each game gets its own RNG for its decks and its own RNG for the players'
+choices, both derived from --seed and the channel ID, so a run is
+reproducible however games are interleaved. The printed checksum covers
+every game's final scores, to compare runs of the same seed.
+"""
+
+import argparse
+import hashlib
+import logging
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from game import GameManager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MIN_PLAYERS = 3
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Simulator:
+    """Plays games round by round, interleaved the way channels would be
+
+    In 'scripted' mode every player plays their first card and the first
+    answer wins, so only the deck shuffles vary with the seed. In 'random'
+    mode players pick cards at random, sometimes write custom answers,
+    sometimes leave (and are replaced), and games toggle NSFW.
+    """
+
+    def __init__(self, games: int = 100, players: int = 6, rounds: int = 10,
+                 seed: int = 0, mode: str = 'random', nsfw_toggle_rate: float = 0.05,
+                 custom_answer_rate: float = 0.1, leave_rate: float = 0.02):
+        if mode not in ('random', 'scripted'):
+            raise ValueError(f"unknown mode {mode!r}")
+        self.games = games
+        self.players = max(players, MIN_PLAYERS)
+        self.rounds = rounds
+        self.seed = seed
+        self.mode = mode
+        self.nsfw_toggle_rate = nsfw_toggle_rate
+        self.custom_answer_rate = custom_answer_rate
+        self.leave_rate = leave_rate
+        self.manager = GameManager()
+        self.latencies: Dict[str, List[float]] = {}  # operation: seconds per call
+        self._choices: Dict[int, random.Random] = {}  # channel_id: players' RNG
+        self._next_player: Dict[int, int] = {}
+
+    def _rng(self, channel_id: int, stream: int) -> random.Random:
+        return random.Random(f"{self.seed}:{channel_id}:{stream}")
+
+    def _timed(self, operation: str, fn: Callable, *args) -> Any:
+        start = time.perf_counter()
+        result = fn(*args)
+        self.latencies.setdefault(operation, []).append(time.perf_counter() - start)
+        return result
+
+    def _join(self, channel_id: int):
+        player_id = channel_id * 1000 + self._next_player[channel_id]
+        self._next_player[channel_id] += 1
+        self._timed('add_player', self.manager.add_player, channel_id, player_id,
+                    f"Player {player_id}")
+
+    def _start_game(self, channel_id: int):
+        self._choices[channel_id] = self._rng(channel_id, 1)
+        self._next_player[channel_id] = 0
+        self._timed('create_game', self.manager.create_game, channel_id, False,
+                    self._rng(channel_id, 0))
+        for _ in range(self.players):
+            self._join(channel_id)
+
+    def _play_round(self, channel_id: int) -> bool:
+        """Play one round, returning False once the game has run out of cards"""
+        game = self.manager.get_game(channel_id)
+        rng = self._choices[channel_id]
+        randomized = self.mode == 'random'
+
+        for player_id in list(game.players):
+            self._timed('draw_cards', game.draw_cards, player_id)
+        if randomized and rng.random() < self.nsfw_toggle_rate:
+            self._timed('update_nsfw_setting', game.update_nsfw_setting, not game.allow_nsfw)
+        if self._timed('start_round', game.start_round) is None:
+            return False
+
+        for player_id in list(game.players):
+            if player_id == game.current_prompt_drawer:
+                continue
+            if randomized and rng.random() < self.custom_answer_rate:
+                self._timed('play_custom_answer', game.play_custom_answer, player_id,
+                            f"Custom answer {rng.randrange(1_000_000)}")
+                continue
+            hand = len(game.players[player_id].cards)
+            if hand:
+                self._timed('play_card', game.play_card, player_id,
+                            rng.randrange(hand) if randomized else 0)
+
+        if randomized and rng.random() < self.leave_rate:
+            leaver = rng.choice(sorted(game.players))
+            self._timed('remove_player', game.remove_player, leaver)
+            if len(game.players) < MIN_PLAYERS:
+                self._join(channel_id)
+
+        played = list(game.round.played_cards)
+        if played:
+            self._timed('get_played_cards', game.get_played_cards, True, True)
+            self._timed('select_winner', game.select_winner,
+                        rng.choice(played) if randomized else played[0])
+        self._timed('get_scores', game.get_scores)
+        return True
+
+    def run(self) -> Dict[str, Any]:
+        """Play every game to the end and return the report"""
+        self.latencies = {}
+        start = time.perf_counter()
+        channels = list(range(1, self.games + 1))
+        for channel_id in channels:
+            self._start_game(channel_id)
+
+        active = channels
+        for _ in range(self.rounds):
+            still_active = []
+            for channel_id in active:
+                if self._play_round(channel_id):
+                    still_active.append(channel_id)
+            active = still_active
+
+        checksum = hashlib.blake2b(digest_size=8)
+        for channel_id in channels:
+            game = self.manager.get_game(channel_id)
+            for player_id, info in game.get_scores().items():
+                checksum.update(f"{channel_id}:{player_id}:{info['score']};".encode())
+            self._timed('end_game', self.manager.end_game, channel_id)
+        elapsed = time.perf_counter() - start
+
+        operations = {}
+        for operation, samples in sorted(self.latencies.items()):
+            ordered = sorted(samples)
+            operations[operation] = {
+                'count': len(ordered),
+                'p50': _percentile(ordered, 0.50),
+                'p95': _percentile(ordered, 0.95),
+                'p99': _percentile(ordered, 0.99),
+                'max': ordered[-1],
+            }
+        total = sum(stats['count'] for stats in operations.values())
+        return {
+            'games': self.games,
+            'operations': operations,
+            'total': total,
+            'seconds': elapsed,
+            'ops_per_second': total / elapsed if elapsed else 0.0,
+            'checksum': checksum.hexdigest(),
+        }
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def print_report(report: Dict[str, Any], traced_peak: Optional[int] = None):
+    print(f"{report['games']} games, {report['total']} operations in "
+          f"{report['seconds']:.2f}s: {report['ops_per_second']:.0f} ops/s")
+    print(f"{'operation':<20} {'count':>8} {'p50 us':>9} {'p95 us':>9} "
+          f"{'p99 us':>9} {'max us':>9}")
+    for operation, stats in report['operations'].items():
+        print(f"{operation:<20} {stats['count']:>8} {stats['p50'] * 1e6:>9.1f} "
+              f"{stats['p95'] * 1e6:>9.1f} {stats['p99'] * 1e6:>9.1f} "
+              f"{stats['max'] * 1e6:>9.1f}")
+    if traced_peak is not None:
+        print(f"Peak traced memory: {traced_peak / 2 ** 20:.1f} MiB")
+    peak_rss = _peak_rss_bytes()
+    if peak_rss is not None:
+        print(f"Peak RSS: {peak_rss / 2 ** 20:.1f} MiB")
+    print(f"Checksum: {report['checksum']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate games without Discord or Mongo")
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--players', type=int, default=6)
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--mode', choices=('random', 'scripted'), default='random')
+    parser.add_argument('--nsfw-toggle-rate', type=float, default=0.05)
+    parser.add_argument('--custom-answer-rate', type=float, default=0.1)
+    parser.add_argument('--leave-rate', type=float, default=0.02)
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="report peak Python allocations with tracemalloc (slows the run)")
+    args = parser.parse_args(argv)
+
+    # Per-operation game logging would dominate the timings
+    logging.disable(logging.INFO)
+    simulator = Simulator(args.games, args.players, args.rounds, args.seed, args.mode,
+                          args.nsfw_toggle_rate, args.custom_answer_rate, args.leave_rate)
+    if args.trace_memory:
+        tracemalloc.start()
+    report = simulator.run()
+    traced_peak = None
+    if args.trace_memory:
+        traced_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    print_report(report, traced_peak)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
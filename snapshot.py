@@ -0,0 +1,327 @@
+"""
+Game snapshots for warm restarts.
+
+Each game is saved to <directory>/<channel_id>.snap when it changed since
+the last save, and all saved games are restored at startup. Card IDs are
+only stable within one process, so cards are saved by type and text
+fingerprint (card_pack.card_key) and mapped back to IDs on load. Cards
+that are no longer in the catalog are dropped.
+
+Layout (little-endian):
+
+    magic               8 bytes, SNAPSHOT_MAGIC
+    channel id          q
+    allow nsfw          B
+    card table          I count, per card B is_black and KEY_SIZE key
+    players             I count, in join order; per player
+                        q id, I name length, name, i score, i round points,
+                        B flags (DM_MODE | NEEDS_PROMPT_NOTIFICATION),
+                        I hand size, I card table index per card
+    prompt drawer       B present, q player id
+    round               B flags (IN_PROGRESS | HAS_BLACK_CARD | ALL_PLAYED),
+                        I black card,
+                        I play count, per play q player id, i card or -1,
+                        I answer count, per answer q player id, I length, text
+    decks               black then white; per deck B enabled segments
+                        (SFW_SEGMENT | NSFW_SEGMENT), then the SFW and NSFW
+                        undrawn piles as I count, I card per card
+"""
+
+import logging
+import os
+import struct
+from array import array
+from typing import Callable, List, Optional, Tuple
+
+from card_pack import KEY_SIZE
+from cards import find_card, get_card, get_card_key
+from deck import Deck
+from events import CUSTOM_ANSWER, GameLog, GameState, Player, RoundState
+from game import Game
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"CASSNAP\x01"
+SNAPSHOT_SUFFIX = ".snap"
+
+DM_MODE = 1
+NEEDS_PROMPT_NOTIFICATION = 2
+IN_PROGRESS = 1
+HAS_BLACK_CARD = 2
+ALL_PLAYED = 4
+SFW_SEGMENT = 1
+NSFW_SEGMENT = 2
+
+
+class _Writer:
+    def __init__(self):
+        self.body = bytearray()
+        self.table = bytearray()
+        self._indexes = {}  # card ID: card table index
+
+    def pack(self, fmt: str, *values):
+        self.body += struct.pack('<' + fmt, *values)
+
+    def text(self, text: str):
+        data = text.encode('utf-8')
+        self.pack('I', len(data))
+        self.body += data
+
+    def card(self, card_id: int) -> int:
+        index = self._indexes.get(card_id)
+        if index is None:
+            index = self._indexes[card_id] = len(self._indexes)
+            self.table += struct.pack('<B', get_card(card_id).type == 'black')
+            self.table += get_card_key(card_id)
+        return index
+
+    def cards(self, card_ids):
+        self.pack('I', len(card_ids))
+        self.pack(f'{len(card_ids)}I', *map(self.card, card_ids))
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+        self.table: List[Optional[int]] = []  # card table index: card ID, if still loaded
+
+    def unpack(self, fmt: str):
+        values = struct.unpack_from('<' + fmt, self.data, self.pos)
+        self.pos += struct.calcsize('<' + fmt)
+        return values
+
+    def text(self) -> str:
+        (length,) = self.unpack('I')
+        self.pos += length
+        return self.data[self.pos - length:self.pos].decode('utf-8')
+
+    def card(self, index: int) -> Optional[int]:
+        return self.table[index]
+
+    def cards(self) -> List[int]:
+        (count,) = self.unpack('I')
+        return [card_id for card_id in map(self.card, self.unpack(f'{count}I'))
+                if card_id is not None]
+
+
+def dump_game(channel_id: int, game: Game) -> bytes:
+    """Serialize a game's state and undrawn piles"""
+    out = _Writer()
+    out.pack('I', len(game.players))
+    for player_id in game.player_order:
+        player = game.players[player_id]
+        out.pack('q', player_id)
+        out.text(player.name)
+        out.pack('ii', player.score, game.leaderboard.round_points(player_id))
+        out.pack('B', (DM_MODE if player.dm_mode else 0) |
+                 (NEEDS_PROMPT_NOTIFICATION if player.needs_prompt_notification else 0))
+        out.cards(player.cards)
+
+    drawer = game.current_prompt_drawer
+    out.pack('Bq', drawer is not None, drawer or 0)
+
+    black_card = game.round.black_card
+    out.pack('B', (IN_PROGRESS if game.round.in_progress else 0) |
+             (HAS_BLACK_CARD if black_card else 0) |
+             (ALL_PLAYED if game.round.all_played else 0))
+    out.pack('I', out.card(black_card.id) if black_card else 0)
+    out.pack('I', len(game.round.played_cards))
+    for player_id, card in game.round.played_cards.items():
+        out.pack('qi', player_id, CUSTOM_ANSWER if card == CUSTOM_ANSWER else out.card(card))
+    out.pack('I', len(game.round.custom_answers))
+    for player_id, text in game.round.custom_answers.items():
+        out.pack('q', player_id)
+        out.text(text)
+
+    for deck in (game.black_deck, game.white_deck):
+        out.pack('B', (SFW_SEGMENT if False in deck.enabled else 0) |
+                 (NSFW_SEGMENT if True in deck.enabled else 0))
+        for nsfw in (False, True):
+            segment = deck.segments[nsfw]
+            out.cards(segment.order[segment.cursor:])
+
+    header = SNAPSHOT_MAGIC + struct.pack('<qB', channel_id, game.allow_nsfw)
+    table = struct.pack('<I', len(out.table) // (KEY_SIZE + 1)) + out.table
+    return header + table + out.body
+
+
+def load_game(data: bytes, database=None) -> Tuple[int, Game]:
+    """Rebuild a game from dump_game output, returning (channel_id, game)"""
+    if data[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+        raise ValueError("not a game snapshot")
+    r = _Reader(data)
+    r.pos = len(SNAPSHOT_MAGIC)
+    channel_id, allow_nsfw = r.unpack('qB')
+
+    # Building the game loads the catalog, which card keys are looked up in
+    game = Game(bool(allow_nsfw), database)
+    (card_count,) = r.unpack('I')
+    for _ in range(card_count):
+        (is_black,) = r.unpack('B')
+        key = bytes(r.unpack(f'{KEY_SIZE}s')[0])
+        r.table.append(find_card('black' if is_black else 'white', key))
+
+    state = GameState(game.allow_nsfw)
+    round_points = {}
+    (player_count,) = r.unpack('I')
+    for _ in range(player_count):
+        (player_id,) = r.unpack('q')
+        player = Player(player_id, r.text())
+        player.score, round_points[player_id] = r.unpack('ii')
+        (flags,) = r.unpack('B')
+        player.dm_mode = bool(flags & DM_MODE)
+        player.needs_prompt_notification = bool(flags & NEEDS_PROMPT_NOTIFICATION)
+        player.cards = array('I', r.cards())
+        state.players[player_id] = player
+        state.player_order.append(player_id)
+        state.leaderboard.add(player_id, player.score - round_points[player_id])
+    # Replay this round's points so rank changes survive the restart
+    state.leaderboard.next_round()
+    for player_id, points in round_points.items():
+        if points:
+            state.leaderboard.add_points(player_id, points)
+
+    has_drawer, drawer = r.unpack('Bq')
+    state.current_prompt_drawer = drawer if has_drawer else None
+
+    flags, black_index = r.unpack('BI')
+    black_card = r.card(black_index) if flags & HAS_BLACK_CARD else None
+    state.round = RoundState(get_card(black_card) if black_card is not None else None)
+    (play_count,) = r.unpack('I')
+    for _ in range(play_count):
+        player_id, index = r.unpack('qi')
+        card = CUSTOM_ANSWER if index == CUSTOM_ANSWER else r.card(index)
+        if card is not None:
+            state.round.played_cards[player_id] = card
+    (answer_count,) = r.unpack('I')
+    for _ in range(answer_count):
+        (player_id,) = r.unpack('q')
+        state.round.custom_answers[player_id] = r.text()
+    # A round whose black card left the catalog can't continue
+    state.round.in_progress = bool(flags & IN_PROGRESS) and state.round.black_card is not None
+    state.round.all_played = bool(flags & ALL_PLAYED)
+
+    for deck in (game.black_deck, game.white_deck):
+        (enabled,) = r.unpack('B')
+        deck.enabled = {nsfw for nsfw, bit in ((False, SFW_SEGMENT), (True, NSFW_SEGMENT))
+                        if enabled & bit}
+        for nsfw in (False, True):
+            deck.segments[nsfw] = Deck(r.cards(), game.rng, shuffle=False)
+
+    for name in GameState.__slots__:
+        setattr(game, name, getattr(state, name))
+    game.log = GameLog(snapshot_every=game.SNAPSHOT_EVERY, initial=GameState.capture(state))
+    return channel_id, game
+
+
+class SnapshotStore:
+    """Saves changed games to per-channel files and restores them at startup
+
+    Only channels in GameManager.dirty_channels are written, so a save
+    costs as much as the games that changed since the last one. collect()
+    must run on the thread that owns the games; write() can run anywhere,
+    and the channels it failed to write go back with requeue() on the
+    owning thread so the next save retries them.
+    """
+
+    def __init__(self, game_manager, directory: str = "data/snapshots"):
+        self.game_manager = game_manager
+        self.directory = directory
+
+    def _path(self, channel_id: int) -> str:
+        return os.path.join(self.directory, f"{channel_id}{SNAPSHOT_SUFFIX}")
+
+    def collect(self) -> List[Tuple[int, Optional[bytes]]]:
+        """Serialize every game that changed since the last collect
+
+        Returns (channel_id, data) pairs, with data None for games that ended.
+        """
+        manager = self.game_manager
+        dirty, manager.dirty_channels = manager.dirty_channels, set()
+        entries = []
+        for channel_id in dirty:
+            game = manager.get_game(channel_id)
+            try:
+                entries.append((channel_id, dump_game(channel_id, game) if game else None))
+            except Exception as e:
+                logger.error(f"Failed to snapshot game in channel {channel_id}: {str(e)}")
+        return entries
+
+    def write(self, entries: List[Tuple[int, Optional[bytes]]]) -> List[int]:
+        """Write collected snapshots, each atomically, and delete ended games
+
+        Returns the channels whose snapshot could not be written.
+        """
+        failed = []
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+        except OSError as e:
+            logger.error(f"Failed to create snapshot directory {self.directory}: {str(e)}")
+            return [channel_id for channel_id, _ in entries]
+        for channel_id, data in entries:
+            path = self._path(channel_id)
+            try:
+                if data is None:
+                    if os.path.exists(path):
+                        os.remove(path)
+                    continue
+                # Write to a temporary file first so a crash never leaves a partial snapshot
+                tmp_path = path + ".tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.error(f"Failed to write snapshot {path}: {str(e)}")
+                failed.append(channel_id)
+        return failed
+
+    def requeue(self, channel_ids: List[int]):
+        """Mark channels whose write failed as changed again, so the next save retries them"""
+        self.game_manager.dirty_channels.update(channel_ids)
+
+    def save(self) -> int:
+        """Collect and write changed games, returning how many were saved or deleted"""
+        entries = self.collect()
+        if not entries:
+            return 0
+        failed = self.write(entries)
+        self.requeue(failed)
+        return len(entries) - len(failed)
+
+    def load(self, owns: Optional[Callable[[int], bool]] = None) -> int:
+        """Restore saved games into the game manager, returning how many were restored
+
+        With owns, only the channels it accepts are restored, so shard
+        workers sharing a directory each load their own games.
+        """
+        if not os.path.isdir(self.directory):
+            return 0
+
+        manager = self.game_manager
+        restored = 0
+        for filename in sorted(os.listdir(self.directory)):
+            if not filename.endswith(SNAPSHOT_SUFFIX):
+                continue
+            if owns is not None:
+                try:
+                    if not owns(int(filename[:-len(SNAPSHOT_SUFFIX)])):
+                        continue
+                except ValueError:
+                    continue
+            path = os.path.join(self.directory, filename)
+            try:
+                with open(path, 'rb') as f:
+                    channel_id, game = load_game(f.read(), manager.database)
+            except (OSError, ValueError, IndexError, struct.error) as e:
+                logger.error(f"Failed to restore snapshot {path}: {str(e)}")
+                continue
+            manager.add_game(channel_id, game)
+            # Already on disk as restored
+            manager.dirty_channels.discard(channel_id)
+            restored += 1
+
+        logger.info(f"Restored {restored} game(s) from {self.directory}")
+        return restored
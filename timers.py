@@ -0,0 +1,99 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TimerScheduler:
+    """One heap of deadlines for every timer in the process
+
+    Each timer has a key, such as a channel ID, and at most one pending
+    deadline per key: scheduling a key again replaces its timer. Replaced
+    and cancelled timers stay in the heap and are skipped when they come
+    due, so both are O(log n) and ten thousand games cost one task
+    sleeping until the earliest deadline.
+
+    Callbacks are coroutine functions; run() starts each one as its own
+    task, so a slow callback never delays the next timer.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        # (deadline, sequence, key, callback, args); the sequence breaks ties
+        # and tells a key's current timer from the ones it replaced
+        self._heap: List[tuple] = []
+        self._current: Dict[Hashable, int] = {}  # key: sequence of its live timer
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks = set()  # callbacks still running, so they aren't garbage collected
+
+    def __len__(self) -> int:
+        return len(self._current)
+
+    def __contains__(self, key) -> bool:
+        return key in self._current
+
+    def schedule(self, key: Hashable, delay: float, callback: Callable, *args):
+        """Call callback(*args) in delay seconds, replacing any timer for key"""
+        sequence = next(self._sequence)
+        self._current[key] = sequence
+        deadline = self.clock() + delay
+        heapq.heappush(self._heap, (deadline, sequence, key, callback, args))
+        # A new earliest deadline has to cut run()'s sleep short
+        if self._wakeup is not None and self._heap[0][1] == sequence:
+            self._wakeup.set()
+
+    def cancel(self, key: Hashable) -> bool:
+        """Drop the timer for key, returning whether there was one"""
+        return self._current.pop(key, None) is not None
+
+    def _discard_stale(self):
+        heap = self._heap
+        while heap and self._current.get(heap[0][2]) != heap[0][1]:
+            heapq.heappop(heap)
+
+    def next_deadline(self) -> Optional[float]:
+        """Clock time of the earliest live timer, or None"""
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: Optional[float] = None) -> List[Tuple[Callable, tuple]]:
+        """Remove and return (callback, args) for every live timer that is due"""
+        now = self.clock() if now is None else now
+        due = []
+        heap = self._heap
+        while True:
+            self._discard_stale()
+            if not heap or heap[0][0] > now:
+                return due
+            _, _, key, callback, args = heapq.heappop(heap)
+            del self._current[key]
+            due.append((callback, args))
+
+    async def run(self):
+        """Fire timers as they come due, until cancelled"""
+        self._wakeup = asyncio.Event()
+        while True:
+            self._wakeup.clear()
+            deadline = self.next_deadline()
+            timeout = None if deadline is None else max(0.0, deadline - self.clock())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+            for callback, args in self.pop_due():
+                task = asyncio.create_task(self._fire(callback, args))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    async def _fire(callback: Callable, args: tuple) -> Any:
+        try:
+            return await callback(*args)
+        except Exception as e:
+            logger.error(f"Timer callback {getattr(callback, '__name__', callback)} failed: {str(e)}")
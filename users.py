@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class UserCache:
+    """Resolves user IDs to users with as few REST calls as possible
+
+    A lookup tries the client's gateway cache (get_user) first, then users
+    fetched in the last ttl seconds, kept in an LRU of at most max_size.
+    Only then does it call fetch_user, and concurrent lookups of the same
+    ID share that one request.
+    """
+
+    def __init__(self, client, max_size: int = 10000, ttl: float = 600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.client = client
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        # user_id: (expiry time, user), least recently used first
+        self._users: "OrderedDict[Hashable, Tuple[float, object]]" = OrderedDict()
+        self._pending: Dict[Hashable, asyncio.Task] = {}  # user_id: fetch in flight
+        self.gateway_hits = 0
+        self.hits = 0
+        self.misses = 0  # lookups that called fetch_user
+        self.coalesced = 0  # lookups that waited on another's fetch_user
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    async def get(self, user_id):
+        """The user with this ID, fetching it only if no cache has it"""
+        user = self.client.get_user(user_id)
+        if user is not None:
+            self.gateway_hits += 1
+            return user
+
+        entry = self._users.get(user_id)
+        if entry is not None:
+            if entry[0] > self.clock():
+                self._users.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            del self._users[user_id]
+
+        task = self._pending.get(user_id)
+        if task is None:
+            self.misses += 1
+            task = self._pending[user_id] = asyncio.ensure_future(self._fetch(user_id))
+        else:
+            self.coalesced += 1
+        # One caller giving up must not cancel the fetch for the others
+        return await asyncio.shield(task)
+
+    async def _fetch(self, user_id):
+        try:
+            user = await self.client.fetch_user(user_id)
+        finally:
+            del self._pending[user_id]
+        self._users[user_id] = (self.clock() + self.ttl, user)
+        self._users.move_to_end(user_id)
+        while len(self._users) > self.max_size:
+            self._users.popitem(last=False)
+        return user
+
+    def discard(self, user_id):
+        """Forget a fetched user, so the next lookup fetches them again"""
+        self._users.pop(user_id, None)
+
+    def stats(self, reset: bool = False) -> Dict[str, int]:
+        """Lookup counters, optionally starting them again from zero"""
+        stats = {
+            'gateway_hits': self.gateway_hits,
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+        }
+        if reset:
+            self.gateway_hits = self.hits = self.misses = self.coalesced = 0
+        return stats
@@ -0,0 +1,68 @@
+import logging
+import threading
+from typing import Optional
+
+from cards import CatalogDelta, current_catalog, custom_cards_expired, get_catalog
+
+logger = logging.getLogger(__name__)
+
+
+class CardWatcher:
+    """Polls the card files and swaps in a new catalog when they change
+
+    Only the files whose mtime or size changed are re-parsed. Running games
+    keep their catalog snapshot and pick up the delta at their next round.
+    Approved custom cards are also refreshed from the database every
+    custom_card_ttl seconds, to see approvals made by other workers.
+    """
+
+    def __init__(self, cards_dir: str = "data/cards", database=None,
+                 interval: float = 5.0, custom_card_ttl: float = 300.0):
+        self.cards_dir = cards_dir
+        self.database = database
+        self.interval = interval
+        self.custom_card_ttl = custom_card_ttl
+        self._stop = threading.Event()
+        self._thread = None
+
+    def check(self) -> Optional[CatalogDelta]:
+        """Reload the catalog if the card files changed, returning the delta"""
+        old = current_catalog()
+        refresh_custom = (self.database is not None and
+                          custom_cards_expired(self.custom_card_ttl))
+        try:
+            new = get_catalog(self.cards_dir, self.database, refresh_custom)
+        except Exception as e:
+            logger.error(f"Failed to reload card catalog: {str(e)}")
+            return None
+
+        if old is None or new is old or old.cards_dir != new.cards_dir:
+            return None
+
+        delta = new.delta_from(old)
+        logger.info(f"Card catalog reloaded to v{new.version}: {delta}")
+        return delta
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self):
+        """Start polling in a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self.check()
+        self._thread = threading.Thread(target=self._run,
+                                        name="card-watcher",
+                                        daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Watching {self.cards_dir} for card changes every {self.interval}s")
+
+    def stop(self):
+        """Stop polling"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None